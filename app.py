@@ -1,19 +1,32 @@
-from flask import Flask, request, render_template, jsonify, session, send_from_directory, Response, stream_with_context
+from flask import Flask, request, render_template, jsonify, session, send_from_directory, send_file, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from flask_cors import CORS 
 import openai
 import requests
+import requests.adapters
 import os
 import re
 from difflib import SequenceMatcher
 from gtts import gTTS
-import whisper  
 import json
+import io
+import csv
+import zipfile
+import zlib
+import struct
+import heapq
+import copy
+import hashlib
+import threading
+import numpy as np
 import warnings
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 try:
     from pydub import AudioSegment
+    from pydub.silence import detect_leading_silence, detect_silence
+    PYDUB_AVAILABLE = True
 except ImportError as e:
+    PYDUB_AVAILABLE = False
     import warnings
     warnings.filterwarnings("ignore")
     
@@ -36,21 +49,33 @@ except ImportError as e:
     AudioSegment = MockAudioSegment
     print("Warning: Using mock AudioSegment due to audioop compatibility issues")
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
 from tempfile import NamedTemporaryFile
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import logging
 import gc
 import time
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
+import queue
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from functools import wraps
+from itertools import groupby, islice
+from urllib.parse import quote
 import shutil
 import tempfile
 import atexit
 import signal
-from functools import lru_cache
 from dotenv import load_dotenv
-from database import db, Participant, Session, Interaction, Recording, UserEvent
+from database import db, Participant, Session, Interaction, Recording, UserEvent, run_migrations
+from whisper_worker import WhisperWorkerPool, WhisperUnavailable
+from sqlalchemy import insert, func, case
+from sqlalchemy.exc import IntegrityError, DataError
 import uuid
 
 load_dotenv()
@@ -66,9 +91,10 @@ except Exception:
 
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'connect_args': {'sslmode': 'require'}
-}
+if (os.environ.get('DATABASE_URL') or '').startswith('postgres'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'connect_args': {'sslmode': 'require'}
+    }
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
 app.secret_key = os.environ.get('SECRET_KEY', 'fallback-secret-key')
 
@@ -78,49 +104,202 @@ db.init_app(app)
 
 with app.app_context():
     db.create_all()
+    run_migrations()
+
+class WriteBehindBuffer:
+    """Groups Interaction and Recording rows into bulk inserts.
+
+    Rows are flushed by a background thread once `max_rows` are pending or every
+    `interval` seconds, and explicitly on /finalize_session and at shutdown. If the
+    database rejects the batch's data (a constraint or value error), it is retried in
+    halves until the offending rows are isolated, and those rows alone are logged and
+    dropped. Any other failure puts the unwritten rows back at the front of the
+    buffer for the next attempt.
+    """
+
+    def __init__(self, models, max_rows=100, interval=1.0, max_pending=50000):
+        self.models = models
+        self.max_rows = max_rows
+        self.interval = interval
+        self.max_pending = max_pending
+        self.flushes = 0
+        self.rows_written = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.rejected_rows = 0
+        self._pending = {model: [] for model in models}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def add(self, model, row):
+        with self._lock:
+            self._pending[model].append(row)
+            pending = sum(len(rows) for rows in self._pending.values())
+        if pending >= self.max_rows:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Write-behind flush failed: {str(e)}")
+
+    def flush(self):
+        """Write every pending row in one transaction and return the number written."""
+        with self._flush_lock:
+            with self._lock:
+                batches = self._pending
+                self._pending = {model: [] for model in self.models}
+            total = sum(len(rows) for rows in batches.values())
+            if not total:
+                return 0
+
+            written_before = self.rows_written
+            try:
+                with app.app_context():
+                    try:
+                        for model in self.models:
+                            if batches[model]:
+                                db.session.execute(insert(model), batches[model])
+                        db.session.commit()
+                        self.rows_written += total
+                    except (IntegrityError, DataError) as e:
+                        db.session.rollback()
+                        print(f"Write-behind batch rejected, isolating bad rows: {str(e.orig)}")
+                        self._write_isolating(batches)
+            except Exception:
+                # The app context teardown already rolled the session back
+                self.failed_flushes += 1
+                self._requeue(batches)
+                raise
+
+            self.flushes += 1
+            return self.rows_written - written_before
+
+    def _write_isolating(self, batches):
+        """Insert `batches` in halves until each rejected row stands alone, then drop it.
+
+        Written rows are removed from `batches` as they commit, so if a non-data error
+        interrupts, `batches` holds exactly the rows still to be written.
+        """
+        for model in self.models:
+            chunks = [batches[model]] if batches[model] else []
+            while chunks:
+                rows = chunks.pop()
+                try:
+                    db.session.execute(insert(model), rows)
+                    db.session.commit()
+                except (IntegrityError, DataError) as e:
+                    db.session.rollback()
+                    if len(rows) > 1:
+                        middle = len(rows) // 2
+                        chunks += [rows[middle:], rows[:middle]]
+                    else:
+                        self.rejected_rows += 1
+                        print(f"Write-behind dropping {model.__tablename__} row rejected by the database: "
+                              f"{rows[0]} ({str(e.orig)})")
+                except Exception:
+                    batches[model] = rows + [row for chunk in reversed(chunks) for row in chunk]
+                    raise
+                else:
+                    self.rows_written += len(rows)
+            batches[model] = []
+
+    def _requeue(self, batches):
+        with self._lock:
+            for model in self.models:
+                rows = batches[model] + self._pending[model]
+                if len(rows) > self.max_pending:
+                    self.dropped_rows += len(rows) - self.max_pending
+                    print(f"Write-behind buffer full, dropping {len(rows) - self.max_pending} oldest {model.__tablename__} rows")
+                    rows = rows[-self.max_pending:]
+                self._pending[model] = rows
+
+    def close(self, timeout=10):
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Final write-behind flush failed: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            pending = {model.__tablename__: len(rows) for model, rows in self._pending.items()}
+        return {
+            'pending': pending,
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'failed_flushes': self.failed_flushes,
+            'dropped_rows': self.dropped_rows,
+            'rejected_rows': self.rejected_rows
+        }
+
+write_behind = WriteBehindBuffer(
+    [Interaction, Recording],
+    max_rows=int(os.environ.get('WRITE_BEHIND_MAX_ROWS', 100)),
+    interval=float(os.environ.get('WRITE_BEHIND_INTERVAL', 1.0))
+)
+
+def insert_interactions(rows):
+    """Queue (session_id, speaker, concept_name, message, attempt_number, timestamp) rows
+    for the next bulk insert."""
+    for session_id, speaker, concept_name, message, attempt_number, timestamp in rows:
+        write_behind.add(Interaction, {
+            'session_id': session_id,
+            'speaker': speaker,
+            'concept_name': concept_name,
+            'message': message,
+            'attempt_number': attempt_number,
+            'timestamp': timestamp or datetime.utcnow()
+        })
 
-def save_interaction_to_db(session_id, speaker, concept_name, message, attempt_number=1):
+def save_interaction_to_db(session_id, speaker, concept_name, message, attempt_number=1, timestamp=None):
     """Save interaction to database."""
     try:
-        interaction = Interaction(
-            session_id=session_id,
-            speaker=speaker,
-            concept_name=concept_name,
-            message=message,
-            attempt_number=attempt_number
-        )
-        db.session.add(interaction)
-        db.session.commit()
+        insert_interactions([(session_id, speaker, concept_name, message, attempt_number, timestamp)])
     except Exception as e:
         print(f"Error saving interaction: {str(e)}")
-        db.session.rollback()
+
+def insert_recording(session_id, recording_type, file_path, original_filename,
+                     file_size, concept_name=None, attempt_number=None):
+    """Queue one recording row for the next bulk insert."""
+    write_behind.add(Recording, {
+        'session_id': session_id,
+        'recording_type': recording_type,
+        'file_path': file_path,
+        'original_filename': original_filename,
+        'file_size': file_size,
+        'concept_name': concept_name,
+        'attempt_number': attempt_number,
+        'created_at': datetime.utcnow()
+    })
 
 def save_recording_to_db(session_id, recording_type, file_path, original_filename, 
                         file_size, concept_name=None, attempt_number=None):
-    """Save recording metadata to database."""
+    """Save recording metadata to database.
+
+    Always returns None: the row is queued on the write-behind buffer and only gets an
+    id when the buffer is next flushed.
+    """
     try:
         if not db or not os.environ.get('DATABASE_URL'):
             print('Database not configured, skipping recording save')
             return None
 
-        recording = Recording(
-            session_id=session_id,
-            recording_type=recording_type,
-            file_path=file_path,
-            original_filename=original_filename,
-            file_size=file_size,
-            concept_name=concept_name,
-            attempt_number=attempt_number
-        )
-        db.session.add(recording)
-        db.session.commit()
-        return recording.id
+        insert_recording(session_id, recording_type, file_path, original_filename,
+                         file_size, concept_name, attempt_number)
+        return None
     except Exception as e:
         print(f"Error saving recording: {str(e)}")
-        try:
-            db.session.rollback()
-        except:
-            pass
         return None
 
 def create_session_record(participant_id, trial_type, version):
@@ -153,44 +332,56 @@ def create_session_record(participant_id, trial_type, version):
             pass
         return None
 
+def register_recording_file(local_path, session_id, recording_type, concept_name=None,
+                            attempt_number=None, original_filename=None):
+    """Record metadata for an audio file that is already on disk.
+
+    The file is referenced by its path relative to the User Data folder; it is never
+    re-read or copied. Raises on failure so background jobs can retry.
+    """
+    file_size = os.path.getsize(local_path)
+
+    try:
+        db_file_path = os.path.relpath(local_path, USER_AUDIO_FOLDER)
+    except Exception:
+        db_file_path = local_path
+
+    if session_id and os.environ.get('DATABASE_URL'):
+        insert_recording(
+            session_id=session_id,
+            recording_type=recording_type,
+            file_path=db_file_path,
+            original_filename=original_filename or os.path.basename(local_path),
+            file_size=file_size,
+            concept_name=concept_name,
+            attempt_number=attempt_number
+        )
+    return local_path
+
 def save_audio_with_cloud_backup(audio_data, filename, session_id, recording_type, concept_name=None, attempt_number=None):
     """Save audio locally and record metadata in DB.
 
+    `audio_data` may be raw bytes, an uploaded file, or the path of a file that is
+    already on disk, in which case it is registered in place without another copy.
+
     Returns (local_path, None)
     """
     try:
-        local_path = os.path.join('uploads/', filename)
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-
-        if hasattr(audio_data, 'save'):
-            audio_data.save(local_path)
+        if isinstance(audio_data, (str, os.PathLike)):
+            local_path = os.fspath(audio_data)
         else:
-            with open(local_path, 'wb') as f:
-                f.write(audio_data)
+            local_path = os.path.join('uploads/', filename)
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
 
-        file_size = None
-        try:
-            file_size = os.path.getsize(local_path)
-        except Exception:
-            file_size = None
-
-        try:
-            rel = os.path.relpath(local_path, USER_AUDIO_FOLDER)
-        except Exception:
-            rel = local_path
-        db_file_path = rel
+            if hasattr(audio_data, 'save'):
+                audio_data.save(local_path)
+            else:
+                with open(local_path, 'wb') as f:
+                    f.write(audio_data)
 
         try:
-            if session_id and os.environ.get('DATABASE_URL'):
-                save_recording_to_db(
-                    session_id=session_id,
-                    recording_type=recording_type,
-                    file_path=db_file_path,
-                    original_filename=filename,
-                    file_size=file_size,
-                    concept_name=concept_name,
-                    attempt_number=attempt_number
-                )
+            register_recording_file(local_path, session_id, recording_type, concept_name,
+                                    attempt_number, original_filename=filename)
         except Exception as e:
             print(f"Failed to save recording metadata to DB: {e}")
 
@@ -228,21 +419,172 @@ def initialize_session_in_db():
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 openai.api_key = OPENAI_API_KEY
 
+OPENAI_HTTP_POOL_SIZE = int(os.environ.get('OPENAI_HTTP_POOL_SIZE', 10))
+
+class PooledHTTPSession(requests.Session):
+    """requests.Session whose connection pool outlives callers that try to close it.
+
+    openai 0.28 closes its per-thread session every few minutes; with a shared session
+    that would drop every warm keep-alive connection, so close() is a no-op and
+    shutdown() really closes the pool.
+    """
+
+    def __init__(self, pool_size):
+        super().__init__()
+        self.adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.mount('https://', self.adapter)
+        self.mount('http://', self.adapter)
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        super().close()
+
+    def stats(self):
+        """Connection reuse counters summed over all host pools."""
+        new_connections = 0
+        requests_sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            new_connections += pool.num_connections
+            requests_sent += pool.num_requests
+        return {
+            'pool_size': self.adapter._pool_maxsize,
+            'requests': requests_sent,
+            'new_connections': new_connections,
+            'reused_connections': max(requests_sent - new_connections, 0)
+        }
+
+# One keep-alive pool for STT, chat and TTS so a turn doesn't pay a TLS handshake per call
+openai_http = PooledHTTPSession(OPENAI_HTTP_POOL_SIZE)
+openai.requestssession = openai_http
+atexit.register(openai_http.shutdown)
+
 executor = ThreadPoolExecutor(max_workers=5)
 
+class BackgroundWorkQueue:
+    """Bounded queue for bookkeeping that doesn't need to finish before the response.
+
+    Jobs run on worker threads inside an app context and are retried with backoff.
+    When the queue is full a job runs inline on the caller, so a burst slows requests
+    down instead of dropping research data. flush() drains everything on shutdown.
+    """
+
+    def __init__(self, maxsize=1000, workers=2, max_retries=3, retry_delay=0.5):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.ran_inline = 0
+        self._count_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f'background-work-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, fn, *args, **kwargs):
+        job = (fn, args, kwargs)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._count('ran_inline')
+            self._run(job)
+
+    def _count(self, counter):
+        with self._count_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job):
+        fn, args, kwargs = job
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                with app.app_context():
+                    fn(*args, **kwargs)
+                self._count('completed')
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self._count('failed')
+                    print(f"Background job {getattr(fn, '__name__', fn)} failed after {attempt} attempts: {str(e)}")
+                    return
+                self._count('retried')
+                time.sleep(self.retry_delay * (2 ** (attempt - 1)))
+
+    def wait_idle(self, timeout=10):
+        """Block until every queued job has run, without stopping the workers."""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
+
+    def flush(self, timeout=30):
+        """Finish every queued job, then stop the workers."""
+        deadline = time.time() + timeout
+        for _ in self._threads:
+            try:
+                self._queue.put(None, timeout=max(deadline - time.time(), 0.1))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(deadline - time.time(), 0))
+        self._threads = [t for t in self._threads if t.is_alive()]
+
+    def stats(self):
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_depth': self._queue.maxsize,
+            'completed': self.completed,
+            'failed': self.failed,
+            'retried': self.retried,
+            'ran_inline': self.ran_inline
+        }
+
+background_work = BackgroundWorkQueue(
+    maxsize=int(os.environ.get('BACKGROUND_QUEUE_SIZE', 1000)),
+    workers=int(os.environ.get('BACKGROUND_WORKERS', 2))
+)
+
+def flush_pending_writes():
+    """Drain queued bookkeeping, then write out every buffered DB row."""
+    background_work.flush()
+    write_behind.close()
+
+atexit.register(flush_pending_writes)
+
 UPLOAD_FOLDER = 'uploads/'
 CONCEPT_AUDIO_FOLDER = os.path.join(UPLOAD_FOLDER, 'concept_audio')
 USER_AUDIO_FOLDER = os.path.join(UPLOAD_FOLDER, 'User Data')
+TTS_CACHE_FOLDER = os.path.join(UPLOAD_FOLDER, 'tts_cache')
+TTS_CACHE_MAX_BYTES = int(os.environ.get('TTS_CACHE_MAX_BYTES', 512 * 1024 * 1024))
 STATIC_FOLDER = 'static'
 ALLOWED_EXTENSIONS = {'mp3', 'wav', 'ogg', 'webm'}
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['CONCEPT_AUDIO_FOLDER'] = CONCEPT_AUDIO_FOLDER
 app.config['USER_AUDIO_FOLDER'] = USER_AUDIO_FOLDER
+app.config['TTS_CACHE_FOLDER'] = TTS_CACHE_FOLDER
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(CONCEPT_AUDIO_FOLDER, exist_ok=True)
 os.makedirs(USER_AUDIO_FOLDER, exist_ok=True)
+os.makedirs(TTS_CACHE_FOLDER, exist_ok=True)
 
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(levelname)s - %(message)s')
@@ -284,63 +626,948 @@ def allowed_file(filename):
 
 model = None
 
-whisper_model = None
-whisper_loading = False
+# Local Whisper runs in resident worker processes that load the model once at startup
+# (see whisper_worker.py); until a worker is ready the fallback fails fast instead of
+# blocking a request on the model load.
+LOCAL_WHISPER_TIMEOUT = int(os.environ.get('LOCAL_WHISPER_TIMEOUT', 120))
+
+local_whisper = WhisperWorkerPool(
+    model_name=os.environ.get('LOCAL_WHISPER_MODEL', 'small'),
+    processes=int(os.environ.get('LOCAL_WHISPER_WORKERS', 1)),
+    max_queue=int(os.environ.get('LOCAL_WHISPER_QUEUE_SIZE', 8)),
+    max_batch=int(os.environ.get('LOCAL_WHISPER_MAX_BATCH', 4)),
+    max_wait=float(os.environ.get('LOCAL_WHISPER_MAX_WAIT_MS', 50)) / 1000.0
+)
+atexit.register(local_whisper.shutdown)
+
+class TTSAudioCache:
+    """On-disk, content-addressed cache of synthesized speech.
+
+    Entries are keyed by a hash of (cleaned text, voice, format, engine, prosody), so
+    the same prompt is only sent to a TTS engine once and the cache survives restarts.
+    A file's mtime doubles as its last-used time; once the folder grows past
+    `max_bytes` the least recently used entries are evicted.
+    """
 
-def get_whisper_model():
-    global whisper_model, whisper_loading
-    if whisper_model is None and not whisper_loading:
+    def __init__(self, folder, max_bytes):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    @staticmethod
+    def make_key(clean_text, voice, fmt, engine, prosody=None):
+        """`prosody` is the (rate, pitch, break_ms) the text was SSML-wrapped with, if any."""
+        raw = json.dumps([clean_text, voice, (fmt or '').lower(), engine, prosody], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def record_miss(self):
+        with self._count_lock:
+            self.misses += 1
+
+    def path_for(self, key, fmt):
+        ext = re.sub(r'[^a-z0-9]', '', (fmt or '').lower()) or 'mp3'
+        return os.path.join(self.folder, f"{key}.{ext}")
+
+    def get(self, key, fmt):
+        """Return the cached file path for `key`, or None on a miss."""
+        path = self.path_for(key, fmt)
         try:
-            whisper_loading = True
-            print("Loading Whisper model...")
-            whisper_model = whisper.load_model("small")
-            print("Whisper model loaded successfully")
-        except Exception as e:
-            print(f"Failed to load Whisper model: {str(e)}")
-            whisper_model = None
-        finally:
-            whisper_loading = False
-    return whisper_model
-
-@lru_cache(maxsize=32)
-def get_cached_audio(text):
-    """Cache generated audio to avoid regenerating the same text."""
-    temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-    temp_path = temp_file.name
-    temp_file.close()
-    
+            os.utime(path, None)  # bump recency for LRU eviction
+        except OSError:
+            return None
+        with self._count_lock:
+            self.hits += 1
+        return path
+
+    def new_temp_path(self):
+        """Reserve a temporary file inside the cache folder (same filesystem as the entries)."""
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix='.part')
+        os.close(fd)
+        return temp_path
+
+    def put_file(self, key, fmt, src_path):
+        """Move a finished audio file into the cache and return its cached path."""
+        path = self.path_for(key, fmt)
+        os.replace(src_path, path)
+        self._account(path)
+        return path
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith('.part'):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _account(self, path):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                try:
+                    self._total_bytes += os.path.getsize(path)
+                except OSError:
+                    pass
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% of the cap so we don't rescan on every insert.
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+tts_cache = TTSAudioCache(TTS_CACHE_FOLDER, TTS_CACHE_MAX_BYTES)
+
+# SSML prosody (ssml_wrap's rate, pitch and break_ms) for tutor speech and for /synthesize
+TUTOR_PROSODY = ('0%', '0%', 250)
+SYNTHESIZE_PROSODY = ('5%', '0%', 220)
+
+# Fixed tutor prompts: identical for every participant, so they are rendered once by warm_tts_cache()
+INTRO_TEXT = "Hello, let us begin the self-explanation journey! We'll be exploring the concept of Extraneous Variables, focusing on Correlation, Confounders, and Moderators. Please go through each concept and explain what you understand about them in your own words!"
+CONCEPT_INTRO_TEMPLATE = "Now, let's explore the concept of {concept_name}. Please explain what you understand about this concept in your own words!"
+SIMILAR_ENOUGH_RESPONSE = (
+    "Excellent — your explanation is clear and accurate. "
+    "You’ve captured the main idea correctly. "
+    "You can now move on to the next concept."
+)
+NOT_CAUGHT_RESPONSE = "Sorry, I didn't catch that. Could you please record your explanation again?"
+
+def synthesize_tts_cached(text, voice='alloy', fmt='mp3', prosody=TUTOR_PROSODY):
+    """Return (cached_path, content_type) for `text`, calling a TTS engine only on a cache miss.
+
+    OpenAI TTS is tried first and gTTS is the fallback; each engine has its own cache entry.
+    `prosody` is passed to ssml_wrap() for OpenAI and is part of that cache key.
+    Returns (None, None) if nothing could be synthesized.
+    """
+    clean_text = clean_tts_text(text)
+    if not clean_text:
+        return None, None
+
+    rate, pitch, break_ms = prosody
+    key = tts_cache.make_key(clean_text, voice, fmt, 'openai', list(prosody))
+    cached_path = tts_cache.get(key, fmt)
+    if cached_path:
+        return cached_path, tts_content_type(fmt)
+
+    try:
+        tts_cache.record_miss()
+        resp, content_type = synthesize_with_openai(
+            ssml_wrap(clean_text, rate=rate, pitch=pitch, break_ms=break_ms), voice=voice, fmt=fmt, stream=True)
+        for _ in tee_tts_stream_to_cache(resp, key, fmt):
+            pass
+        cached_path = tts_cache.path_for(key, fmt)
+        if os.path.exists(cached_path):
+            return cached_path, content_type
+    except Exception as openai_err:
+        print(f"OpenAI TTS unavailable or failed: {openai_err}. Falling back to gTTS.")
+
+    cached_path = synthesize_gtts_cached(clean_text)
+    if cached_path:
+        return cached_path, 'audio/mpeg'
+    return None, None
+
+def stream_tts(text, voice='alloy', fmt='mp3', prosody=TUTOR_PROSODY):
+    """Return (chunks, content_type) for `text`, or (None, None) if nothing could be synthesized.
+
+    Cache hits are read back from disk. On a miss the OpenAI response is passed through
+    chunk by chunk as it arrives while also being written into the TTS cache, so time to
+    first audio depends on the provider's first chunk rather than the length of the text.
+    gTTS cannot stream, so the fallback is rendered fully before it is sent.
+    Uses the same cache entries as synthesize_tts_cached() for the same `prosody`.
+    """
+    clean_text = clean_tts_text(text)
+    if not clean_text:
+        return None, None
+
+    rate, pitch, break_ms = prosody
+    key = tts_cache.make_key(clean_text, voice, fmt, 'openai', list(prosody))
+    cached_path = tts_cache.get(key, fmt)
+    if cached_path:
+        return iter_file_chunks(cached_path), tts_content_type(fmt)
+
+    try:
+        tts_cache.record_miss()
+        resp, content_type = synthesize_with_openai(
+            ssml_wrap(clean_text, rate=rate, pitch=pitch, break_ms=break_ms), voice=voice, fmt=fmt, stream=True)
+        return tee_tts_stream_to_cache(resp, key, fmt), content_type
+    except Exception as openai_err:
+        print(f"OpenAI TTS unavailable or failed: {openai_err}. Falling back to gTTS.")
+
+    cached_path = synthesize_gtts_cached(clean_text)
+    if cached_path:
+        return iter_file_chunks(cached_path), 'audio/mpeg'
+    return None, None
+
+def tee_tts_stream_to_cache(resp, key, fmt, chunk_size=4096):
+    """Yield audio chunks from an open TTS response while writing them into the cache.
+
+    The cache entry is only committed once the provider has sent the whole file. If the
+    client disconnects early the download is still finished, since the audio is paid for.
+    """
+    temp_path = tts_cache.new_temp_path()
+    completed = False
+    client_gone = False
+    try:
+        with open(temp_path, 'wb') as f:
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                if not client_gone:
+                    try:
+                        yield chunk
+                    except GeneratorExit:
+                        client_gone = True
+        completed = True
+    finally:
+        resp.close()
+        if completed and os.path.getsize(temp_path) > 0:
+            tts_cache.put_file(key, fmt, temp_path)
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def iter_file_chunks(path, chunk_size=64 * 1024):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def synthesize_gtts_cached(clean_text):
+    """Render already-cleaned text with gTTS into the cache and return the cached path."""
+    # gTTS has no voices and only produces mp3
+    key = tts_cache.make_key(clean_text, None, 'mp3', 'gtts')
+    cached_path = tts_cache.get(key, 'mp3')
+    if cached_path:
+        return cached_path
+
+    temp_path = tts_cache.new_temp_path()
     try:
-        clean_text = clean_tts_text(text)
         tts = gTTS(text=clean_text, lang='en', slow=False)
         tts.save(temp_path)
-        return temp_path
+        if os.path.getsize(temp_path) > 0:
+            return tts_cache.put_file(key, 'mp3', temp_path)
     except Exception as e:
-        print(f"Error in cached audio generation: {str(e)}")
+        print(f"gTTS synthesis failed: {str(e)}")
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    return None
+
+def fixed_tutor_phrases():
+    """All tutor phrases that do not depend on the participant."""
+    phrases = [INTRO_TEXT, SIMILAR_ENOUGH_RESPONSE, NOT_CAUGHT_RESPONSE]
+    for concept_name in load_concepts():
+        phrases.append(CONCEPT_INTRO_TEMPLATE.format(concept_name=concept_name))
+    return phrases
+
+def warm_tts_cache():
+    """Render every fixed tutor phrase into the TTS cache so session start needs no TTS call."""
+    rendered = 0
+    for phrase in fixed_tutor_phrases():
+        try:
+            cached_path, _ = synthesize_tts_cached(phrase, voice='alloy', fmt='mp3')
+            if cached_path:
+                rendered += 1
+            else:
+                print(f"TTS warm-up could not render: {phrase[:60]}")
+        except Exception as e:
+            print(f"TTS warm-up failed for '{phrase[:60]}': {str(e)}")
+    logger.info(f"TTS warm-up complete: {rendered} fixed phrases cached")
+    return rendered
+
+def link_or_copy(src, dst):
+    """Place `src` at `dst` as a hardlink, falling back to a copy across filesystems."""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+STT_API_TIMEOUT = float(os.environ.get('STT_API_TIMEOUT', 20))
+STT_HEDGE_AFTER = float(os.environ.get('STT_HEDGE_AFTER', 4))
+
+class CircuitBreaker:
+    """Stop calling a dependency after repeated failures, then probe it again.
+
+    After `failure_threshold` consecutive failures the breaker opens and allow()
+    returns False for `reset_timeout` seconds. It then lets a single probe call
+    through (half-open); that call's outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self.trips = 0
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self.trips += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self):
+        return {'state': self.state, 'consecutive_failures': self._failures, 'trips': self.trips}
+
+class HedgedSpeechToText:
+    """OpenAI transcription hedged with the local Whisper workers.
+
+    The API call gets `api_timeout` seconds. If it has not answered after `hedge_after`
+    seconds (or fails), a local transcription is started too and whichever finishes
+    first wins; the loser is cancelled if still queued, otherwise its result is dropped.
+    While the breaker is open, audio goes straight to local Whisper.
+    """
+
+    def __init__(self, local, breaker, api_timeout, hedge_after, max_api_calls=8):
+        self.local = local
+        self.breaker = breaker
+        self.api_timeout = api_timeout
+        self.hedge_after = hedge_after
+        self.api_engine = 'openai:whisper-1'
+        self.local_engine = f'local-whisper:{local.model_name}'
+        self._api_pool = ThreadPoolExecutor(max_workers=max_api_calls, thread_name_prefix='stt-api')
+        self._lock = threading.Lock()
+        self._counts = {'api_wins': 0, 'local_wins': 0, 'hedged': 0, 'short_circuited': 0, 'failed': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _call_api(self, audio_file_path):
+        with open(audio_file_path, 'rb') as audio_file:
+            return openai.Audio.transcribe(
+                model='whisper-1',
+                file=audio_file,
+                request_timeout=self.api_timeout
+            )['text']
+
+    def _record_api_outcome(self, future):
+        if future.cancelled():
+            return  # lost to the local hedge before it started; says nothing about the API
+        if future.exception() is not None:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def transcribe(self, audio_file_path):
+        """Return (transcript text, engine); raises the last error if every engine failed."""
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            try:
+                text = self.local.transcribe(audio_file_path, timeout=LOCAL_WHISPER_TIMEOUT)
+            except Exception:
+                self._count('failed')
+                raise
+            self._count('local_wins')
+            return text, self.local_engine
+
+        api_future = self._api_pool.submit(self._call_api, audio_file_path)
+        api_future.add_done_callback(self._record_api_outcome)
+        pending = {api_future}
+        local_future = None
+        deadline = time.monotonic() + self.api_timeout
+        last_error = None
+
+        while pending:
+            wait_for = self.hedge_after if local_future is None else deadline - time.monotonic()
+            done, pending = wait(pending, timeout=max(wait_for, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    text = future.result()
+                except Exception as e:
+                    last_error = e
+                    print(f"{'OpenAI' if future is api_future else 'Local'} transcription failed: {str(e)}")
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                self._count('api_wins' if future is api_future else 'local_wins')
+                return text, self.api_engine if future is api_future else self.local_engine
+
+            if local_future is None:
+                # API slow or failed: start the local hedge now
+                try:
+                    local_future = self.local.submit(audio_file_path)
+                    pending.add(local_future)
+                    deadline = max(deadline, time.monotonic() + LOCAL_WHISPER_TIMEOUT)
+                    if api_future in pending:
+                        self._count('hedged')
+                except WhisperUnavailable as e:
+                    last_error = last_error or e
+                    local_future = False  # nothing to hedge with; wait out the API
+            elif time.monotonic() >= deadline:
+                for loser in pending:
+                    loser.cancel()
+                break
+
+        self._count('failed')
+        raise last_error or TimeoutError('Transcription timed out')
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+        stats['breaker'] = self.breaker.stats()
+        stats['api_timeout_seconds'] = self.api_timeout
+        stats['hedge_after_seconds'] = self.hedge_after
+        return stats
+
+stt = HedgedSpeechToText(
+    local_whisper,
+    CircuitBreaker(
+        failure_threshold=int(os.environ.get('STT_BREAKER_FAILURES', 3)),
+        reset_timeout=float(os.environ.get('STT_BREAKER_RESET', 30))
+    ),
+    api_timeout=STT_API_TIMEOUT,
+    hedge_after=STT_HEDGE_AFTER
+)
+
+class TranscriptCache:
+    """Transcripts stored beside the recordings, keyed by audio content hash and STT engine.
+
+    `<recording folder>/.transcripts/<sha256 of the audio>.json` maps engine -> transcript,
+    so a retried upload of the same clip is answered without another Whisper call.
+    Lookups prefer engines in the order given.
+    """
+
+    FOLDER = '.transcripts'
+
+    def __init__(self, engines):
+        self.engines = engines
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def audio_digest(audio_path, chunk_size=1024 * 1024):
+        digest = hashlib.sha256()
+        with open(audio_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _path(self, audio_path, digest):
+        return os.path.join(os.path.dirname(os.path.abspath(audio_path)), self.FOLDER, f"{digest}.json")
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, audio_path, digest):
+        """Return (text, engine) for a previously transcribed clip, or None."""
+        entries = self._read(self._path(audio_path, digest))
+        for engine in self.engines:
+            if engine in entries:
+                with self._lock:
+                    self.hits += 1
+                return entries[engine]['text'], engine
+        with self._lock:
+            self.misses += 1
         return None
 
-def speech_to_text(audio_file_path):
-    """Convert audio to text using OpenAI Whisper API or local fallback."""
+    def put(self, audio_path, digest, engine, text):
+        path = self._path(audio_path, digest)
+        with self._lock:
+            entries = self._read(path)
+            entries[engine] = {'text': text, 'created_at': datetime.utcnow().isoformat()}
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.part"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, path)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'engines': self.engines}
+
+transcript_cache = TranscriptCache([stt.api_engine, stt.local_engine])
+
+class AudioPreprocessor:
+    """Shrink clips before speech-to-text: downmix to mono 16 kHz and trim silence.
+
+    Leading and trailing silence is found with an energy VAD (per-chunk dBFS against
+    `silence_threshold`), keeping `padding_ms` around the speech. The result is
+    re-encoded as Opus and only used when it is smaller or shorter than the upload.
+    """
+
+    def __init__(self, sample_rate=16000, silence_threshold=-45.0, padding_ms=200, chunk_ms=10, bitrate='32k'):
+        self.sample_rate = sample_rate
+        self.silence_threshold = silence_threshold
+        self.padding_ms = padding_ms
+        self.chunk_ms = chunk_ms
+        self.bitrate = bitrate
+        self._lock = threading.Lock()
+        self._totals = {
+            'clips': 0, 'used': 0, 'failed': 0,
+            'bytes_in': 0, 'bytes_out': 0, 'seconds_in': 0.0, 'seconds_trimmed': 0.0
+        }
+
+    def speech_bounds(self, sound):
+        """Return (start_ms, end_ms) of the speech in `sound`, padded; the whole clip if none is found."""
+        start = detect_leading_silence(sound, silence_threshold=self.silence_threshold, chunk_size=self.chunk_ms)
+        if start >= len(sound):
+            return 0, len(sound)
+        end = len(sound) - detect_leading_silence(sound.reverse(), silence_threshold=self.silence_threshold, chunk_size=self.chunk_ms)
+        return max(0, start - self.padding_ms), min(len(sound), end + self.padding_ms)
+
+    def preprocess(self, audio_path, sound=None):
+        """Return (path to send to STT, report). The caller removes the path if it differs from `audio_path`.
+
+        `sound` is `audio_path` already decoded, to save decoding it again.
+        """
+        if not PYDUB_AVAILABLE:
+            return audio_path, None
+        out_path = None
+        try:
+            bytes_in = os.path.getsize(audio_path)
+            if sound is None:
+                sound = AudioSegment.from_file(audio_path)
+            start, end = self.speech_bounds(sound)
+            processed = sound[start:end].set_channels(1).set_frame_rate(self.sample_rate)
+
+            fd, out_path = tempfile.mkstemp(prefix='stt_', suffix='.webm')
+            os.close(fd)
+            processed.export(out_path, format='webm', codec='libopus', bitrate=self.bitrate)
+            bytes_out = os.path.getsize(out_path)
+            trimmed_ms = len(sound) - (end - start)
+            use_processed = bytes_out < bytes_in or trimmed_ms > 0
+
+            report = {
+                'bytes_in': bytes_in,
+                'bytes_out': bytes_out if use_processed else bytes_in,
+                'bytes_saved': bytes_in - bytes_out if use_processed else 0,
+                'seconds_in': round(len(sound) / 1000.0, 3),
+                'seconds_trimmed': round(trimmed_ms / 1000.0, 3) if use_processed else 0.0,
+                'channels_in': sound.channels,
+                'sample_rate_in': sound.frame_rate
+            }
+            with self._lock:
+                self._totals['clips'] += 1
+                self._totals['used'] += int(use_processed)
+                self._totals['bytes_in'] += report['bytes_in']
+                self._totals['bytes_out'] += report['bytes_out']
+                self._totals['seconds_in'] += report['seconds_in']
+                self._totals['seconds_trimmed'] += report['seconds_trimmed']
+
+            if not use_processed:
+                os.remove(out_path)
+                return audio_path, report
+            return out_path, report
+        except Exception as e:
+            print(f"Audio preprocessing failed, sending original: {str(e)}")
+            with self._lock:
+                self._totals['failed'] += 1
+            if out_path and os.path.exists(out_path):
+                os.remove(out_path)
+            return audio_path, None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._totals)
+        stats['bytes_saved'] = stats['bytes_in'] - stats['bytes_out']
+        stats['seconds_in'] = round(stats['seconds_in'], 3)
+        stats['seconds_trimmed'] = round(stats['seconds_trimmed'], 3)
+        return stats
+
+MIN_CLIP_SECONDS = float(os.environ.get('MIN_CLIP_SECONDS', 0.5))
+MIN_VOICED_SECONDS = float(os.environ.get('MIN_VOICED_SECONDS', 0.3))
+VOICED_FRAME_DBFS = float(os.environ.get('VOICED_FRAME_DBFS', -45))
+
+def decode_clip(audio_path):
+    """Decode a recording once for the checks and preprocessing before STT; None if it can't be."""
+    if not PYDUB_AVAILABLE or os.path.getsize(audio_path) == 0:
+        return None
     try:
-        with open(audio_file_path, "rb") as audio_file:
-            transcript = openai.Audio.transcribe(
-                model="whisper-1",
-                file=audio_file
-            )
-        return transcript["text"]
+        return AudioSegment.from_file(audio_path)
     except Exception as e:
-        print(f"Error using OpenAI Whisper API: {str(e)}")
-        print("Falling back to local Whisper model...")
-        
-        try:
-            model = get_whisper_model()
-            if model:
-                result = model.transcribe(audio_file_path)
-                return result["text"]
+        print(f"Could not decode clip: {str(e)}")
+        return None
+
+def detect_no_speech(audio_path, sound, frame_ms=30):
+    """Return a reason string if the clip is empty, too short or silent, else None.
+
+    `sound` is the clip as returned by decode_clip(). RMS is measured per `frame_ms`
+    frame with NumPy; a clip needs at least MIN_VOICED_SECONDS of frames above
+    VOICED_FRAME_DBFS to be worth transcribing. Errs on the side of transcribing when
+    the clip couldn't be decoded.
+    """
+    if os.path.getsize(audio_path) == 0:
+        return 'empty'
+    if sound is None:
+        return None
+    sound = sound.set_channels(1)
+
+    duration = len(sound) / 1000.0
+    if duration < MIN_CLIP_SECONDS:
+        return 'too_short'
+
+    samples = np.asarray(sound.get_array_of_samples(), dtype=np.float64)
+    samples /= float(1 << (8 * sound.sample_width - 1))
+    frame = max(1, int(sound.frame_rate * frame_ms / 1000))
+    frames = samples[:len(samples) // frame * frame].reshape(-1, frame)
+    if not len(frames):
+        return 'too_short'
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    voiced = np.count_nonzero(rms > 10 ** (VOICED_FRAME_DBFS / 20.0))
+    if voiced * frame_ms / 1000.0 < MIN_VOICED_SECONDS:
+        return 'silent'
+    return None
+
+audio_preprocessor = AudioPreprocessor(
+    silence_threshold=float(os.environ.get('STT_SILENCE_THRESHOLD_DBFS', -45))
+)
+
+def transcribe_clip(audio_file_path, sound=None):
+    """Transcribe a recording with the hedged engines; raises if none of them can.
+
+    Clips that were already transcribed (same bytes, e.g. a client retry) are answered
+    from the transcript cache without calling either engine. Others are downmixed and
+    silence-trimmed first, so less audio is uploaded and decoded. `sound` is the clip
+    already decoded by the caller, if it has it.
+    """
+    digest = transcript_cache.audio_digest(audio_file_path)
+    cached = transcript_cache.get(audio_file_path, digest)
+    if cached:
+        return cached[0]
+    upload_path, report = audio_preprocessor.preprocess(audio_file_path, sound)
+    if report:
+        logger.info(f"STT preprocessing {os.path.basename(audio_file_path)}: "
+                    f"{report['bytes_saved']} bytes saved, {report['seconds_trimmed']}s trimmed")
+    try:
+        text, engine = stt.transcribe(upload_path)
+    finally:
+        if upload_path != audio_file_path:
+            os.remove(upload_path)
+    try:
+        transcript_cache.put(audio_file_path, digest, engine, text)
+    except OSError as e:
+        print(f"Could not cache transcript: {str(e)}")
+    return text
+
+LIVE_TRANSCRIPTION_FOLDER = os.path.join(UPLOAD_FOLDER, 'live_transcription')
+LIVE_CHUNK_MAX_BYTES = int(os.environ.get('LIVE_CHUNK_MAX_BYTES', 4 * 1024 * 1024))
+
+class LiveTranscription:
+    """A recording that is still being captured, and what has been transcribed of it."""
+
+    def __init__(self, stream_id, path, participant_id):
+        self.stream_id = stream_id
+        self.path = path
+        self.participant_id = participant_id
+        self.lock = threading.Lock()
+        self.next_index = 0
+        self.committed_ms = 0  # audio before this point is already transcribed
+        self.texts = []
+        self.failed = False
+        self.closed = False
+        self.future = None
+        self.dirty = False
+        self.updated_at = time.time()
+        self.decoder = None  # ffmpeg process fed with the chunks as they arrive
+        self.reader = None
+        self.pcm = bytearray()  # decoded audio after committed_ms
+        self.pcm_lock = threading.Lock()
+
+class LiveTranscriptionManager:
+    """Transcribe a recording segment by segment while MediaRecorder chunks arrive.
+
+    Chunks are appended to one file per stream and piped into a per-stream ffmpeg
+    decoder, whose 16 kHz mono PCM output is collected by a reader thread, so each chunk
+    is decoded once however long the recording gets. After each chunk a worker looks for
+    a pause (energy-based silence detection) in the decoded audio not yet transcribed;
+    everything up to the middle of the last pause is a finished segment and is sent to
+    speech-to-text, then dropped from the buffer. When the recording stops only the audio
+    after the last pause is left to transcribe. If decoding or any segment fails, the
+    whole recording is transcribed instead.
+
+    A closed stream is kept until the caller discards it after a successful transcript,
+    so a submit that failed for lack of an STT engine can be retried with the same id.
+    """
+
+    SAMPLE_RATE = 16000
+    EXPIRE_INTERVAL_SECONDS = 60
+
+    def __init__(self, folder, workers=2, min_silence_ms=700, min_segment_ms=1500,
+                 silence_threshold=-45.0, ttl_seconds=3600):
+        self.folder = folder
+        self.min_silence_ms = min_silence_ms
+        self.min_segment_ms = min_segment_ms
+        self.silence_threshold = silence_threshold
+        self.ttl_seconds = ttl_seconds
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._last_expired = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='live-stt')
+        os.makedirs(folder, exist_ok=True)
+
+    def start(self, participant_id):
+        self.expire()
+        stream_id = uuid.uuid4().hex
+        stream = LiveTranscription(stream_id, os.path.join(self.folder, f"{stream_id}.webm"), participant_id)
+        open(stream.path, 'wb').close()
+        with self._lock:
+            self._streams[stream_id] = stream
+        return stream
+
+    def get(self, stream_id, participant_id):
+        if time.time() - self._last_expired >= self.EXPIRE_INTERVAL_SECONDS:
+            self.expire()
+        with self._lock:
+            stream = self._streams.get(stream_id)
+        if stream and stream.participant_id == participant_id:
+            return stream
+        return None
+
+    def append(self, stream, index, data):
+        """Append chunk `index`; returns 'ok', 'duplicate', 'conflict' or 'closed'."""
+        with stream.lock:
+            if stream.closed:
+                return 'closed'
+            if index < stream.next_index:
+                return 'duplicate'
+            if index != stream.next_index:
+                return 'conflict'
+            with open(stream.path, 'ab') as f:
+                f.write(data)
+            if PYDUB_AVAILABLE and not stream.failed:
+                try:
+                    if stream.decoder is None:
+                        self._start_decoder(stream)
+                    stream.decoder.stdin.write(data)
+                    stream.decoder.stdin.flush()
+                except (OSError, ValueError) as e:
+                    print(f"Live transcription decoder failed: {str(e)}")
+                    stream.failed = True
+            stream.next_index += 1
+            stream.updated_at = time.time()
+            if stream.future is None:
+                stream.future = self._pool.submit(self._process, stream)
             else:
-                return "Whisper model not available"
-        except Exception as e2:
-            print(f"Error using local Whisper model: {str(e2)}")
-            return "Your audio input could not be processed."
+                stream.dirty = True
+        return 'ok'
+
+    def _start_decoder(self, stream):
+        stream.decoder = subprocess.Popen(
+            [AudioSegment.converter, '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+             '-f', 's16le', '-ac', '1', '-ar', str(self.SAMPLE_RATE), 'pipe:1'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        stream.reader = threading.Thread(target=self._read_decoded, args=(stream,),
+                                         name=f'live-decode-{stream.stream_id[:8]}', daemon=True)
+        stream.reader.start()
+
+    @staticmethod
+    def _read_decoded(stream):
+        for piece in iter(lambda: stream.decoder.stdout.read1(65536), b''):
+            with stream.pcm_lock:
+                stream.pcm += piece
+
+    def _finish_decoder(self, stream, timeout=30):
+        """Close the decoder's input and wait until everything sent has been decoded."""
+        decoder = stream.decoder
+        if decoder is None or decoder.stdin.closed:
+            return
+        try:
+            decoder.stdin.close()
+        except OSError:
+            pass
+        try:
+            if decoder.wait(timeout=timeout) != 0:
+                stream.failed = True
+        except subprocess.TimeoutExpired:
+            decoder.kill()
+            stream.failed = True
+        stream.reader.join(timeout)
+
+    def _process(self, stream):
+        while True:
+            try:
+                self._transcribe_finished(stream, final=False)
+            except Exception as e:
+                print(f"Live transcription segment failed: {str(e)}")
+                stream.failed = True
+            with stream.lock:
+                if not stream.dirty or stream.failed:
+                    stream.future = None
+                    return
+                stream.dirty = False
+
+    def _transcribe_finished(self, stream, final):
+        if stream.failed or stream.decoder is None:
+            return
+        with stream.pcm_lock:
+            pcm = bytes(stream.pcm[:len(stream.pcm) - len(stream.pcm) % 2])
+        pending = AudioSegment(data=pcm, sample_width=2, frame_rate=self.SAMPLE_RATE, channels=1)
+        if final:
+            boundary = len(pending)
+        else:
+            pauses = [
+                (start, end) for start, end in detect_silence(
+                    pending, min_silence_len=self.min_silence_ms, silence_thresh=self.silence_threshold)
+                if end < len(pending) and start >= self.min_segment_ms
+            ]
+            if not pauses:
+                return
+            start, end = pauses[-1]
+            boundary = (start + end) // 2
+
+        # Segments are written beside the streams, so their transcripts are cached in this
+        # folder too and a retried submit doesn't transcribe the final segment again.
+        segment = pending[:boundary]
+        fd, segment_path = tempfile.mkstemp(prefix='live_segment_', suffix='.wav', dir=self.folder)
+        os.close(fd)
+        try:
+            segment.export(segment_path, format='wav')
+            if detect_no_speech(segment_path, segment) is None:
+                stream.texts.append(transcribe_clip(segment_path, segment).strip())
+        finally:
+            os.remove(segment_path)
+        with stream.pcm_lock:
+            del stream.pcm[:boundary * self.SAMPLE_RATE // 1000 * 2]
+        stream.committed_ms += boundary
+
+    def close(self, stream_id, participant_id, dest_path):
+        """Stop a stream: wait for in-flight segments and move its audio to `dest_path`.
+
+        Closing again (a retried submit) only moves the audio if `dest_path` changed.
+        """
+        stream = self.get(stream_id, participant_id)
+        if stream is None:
+            return None
+        with stream.lock:
+            stream.closed = True
+            stream.updated_at = time.time()
+        while True:
+            with stream.lock:
+                future = stream.future
+            if future is None:
+                break
+            future.result()
+        self._finish_decoder(stream)
+        if stream.path != dest_path:
+            os.replace(stream.path, dest_path)
+            stream.path = dest_path
+        return stream
+
+    def complete(self, stream, sound=None):
+        """Transcribe whatever is left after the last pause and return the full transcript.
+
+        `sound` is the whole recording if the caller already decoded it. Raises like
+        transcribe_clip() if the recording cannot be transcribed; the stream is kept,
+        so complete() can be called again.
+        """
+        try:
+            self._transcribe_finished(stream, final=True)
+        except Exception as e:
+            print(f"Live transcription final segment failed: {str(e)}")
+            stream.failed = True
+        if stream.failed or stream.decoder is None:
+            return transcribe_clip(stream.path, sound)
+        return ' '.join(text for text in stream.texts if text)
+
+    def discard(self, stream):
+        """Forget a stream whose recording has been answered; its audio stays where close() put it."""
+        with self._lock:
+            self._streams.pop(stream.stream_id, None)
+
+    def expire(self):
+        """Forget streams that stopped receiving chunks without being submitted."""
+        now = time.time()
+        cutoff = now - self.ttl_seconds
+        with self._lock:
+            self._last_expired = now
+            stale = [stream for stream in self._streams.values() if stream.updated_at < cutoff]
+            for stream in stale:
+                self._streams.pop(stream.stream_id, None)
+        for stream in stale:
+            if stream.decoder is not None and stream.decoder.poll() is None:
+                stream.decoder.kill()
+            if not stream.closed:  # a closed stream's audio is the participant's recording now
+                try:
+                    os.remove(stream.path)
+                except OSError:
+                    pass
+        transcripts = os.path.join(self.folder, TranscriptCache.FOLDER)
+        if os.path.isdir(transcripts):
+            for name in os.listdir(transcripts):
+                path = os.path.join(transcripts, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+live_transcriptions = LiveTranscriptionManager(
+    LIVE_TRANSCRIPTION_FOLDER,
+    silence_threshold=float(os.environ.get('STT_SILENCE_THRESHOLD_DBFS', -45))
+)
 
 def get_interaction_id(participant_id=None):
     """Generate a unique interaction ID based on timestamp."""
@@ -376,6 +1603,17 @@ def initialize_log_file(interaction_id, participant_id=None, trial_type="Trial_1
         print(f"Error initializing log file: {str(e)}")
         return False
     
+def write_log_lines(participant_id, trial_type, entries):
+    """Append (speaker, concept_name, message, timestamp) entries to a participant's
+    conversation log, raising on failure."""
+    folders = get_participant_folder(participant_id, trial_type)
+    log_file_path = os.path.join(folders['participant_folder'], f"conversation_log_{participant_id}.txt")
+
+    with open(log_file_path, "a", encoding="utf-8") as file:
+        for speaker, concept_name, message, timestamp in entries:
+            timestamp = (timestamp or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+            file.write(f"[{timestamp}] {speaker} ({concept_name}): {message}\n")
+
 def log_interaction(speaker, concept_name, message):
     """Log an interaction to the current log file."""
     try:
@@ -386,12 +1624,7 @@ def log_interaction(speaker, concept_name, message):
             print(f"Skipping file logging - session not fully initialized (participant_id: {participant_id}, trial_type: {trial_type})")
             return True  
             
-        folders = get_participant_folder(participant_id, trial_type)
-        log_file_path = os.path.join(folders['participant_folder'], f"conversation_log_{participant_id}.txt")
-        
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_file_path, "a", encoding="utf-8") as file:
-            file.write(f"[{timestamp}] {speaker} ({concept_name}): {message}\n")
+        write_log_lines(participant_id, trial_type, [(speaker, concept_name, message, None)])
         return True
     except Exception as e:
         print(f"Error logging interaction: {str(e)}")
@@ -406,35 +1639,15 @@ def get_audio_filename(prefix, participant_id, interaction_number, extension='.m
     return f"{prefix}{concept_part}_{interaction_number}_{participant_id}{extension}"
 
 def generate_audio(text, file_path):
-    """Generate speech (audio) from the provided text using gTTS with proper file handling."""
+    """Generate speech (audio) for the provided text at file_path, served from the TTS cache when possible."""
     try:
-        try:
-            # Clean text for TTS before constructing SSML or using gTTS fallback
-            clean_text = clean_tts_text(text)
-            audio_bytes, content_type = synthesize_with_openai(ssml_wrap(clean_text), voice='alloy', fmt='mp3')
-            if audio_bytes:
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                with open(file_path, 'wb') as f:
-                    f.write(audio_bytes)
-                print(f"V1: Audio file (OpenAI TTS) saved: {file_path}")
-                return True
-        except Exception as openai_err:
-            print(f"V1: OpenAI TTS unavailable or failed: {openai_err}. Falling back to gTTS.")
-
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-            temp_path = temp_file.name
-
-        tts = gTTS(text=clean_text, lang='en', slow=False)
-        tts.save(temp_path)
-
-        if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            shutil.move(temp_path, file_path)
-            return True
+        cached_path, _ = synthesize_tts_cached(text, voice='alloy', fmt='mp3')
+        if not cached_path:
+            return False
 
-        return False
+        link_or_copy(cached_path, file_path)
+        print(f"V1: Audio file saved: {file_path}")
+        return True
     except Exception as e:
         print(f"V1: Error generating audio: {str(e)}")
         return False
@@ -447,7 +1660,8 @@ def list_recent_recordings():
         n = int(request.args.get('n', 20))
         recs = Recording.query.order_by(Recording.created_at.desc()).limit(n).all()
         out = []
-        base = app.config.get('UPLOAD_FOLDER', 'uploads')
+        # Recording paths are stored relative to the User Data folder
+        base = app.config.get('USER_AUDIO_FOLDER', USER_AUDIO_FOLDER)
         for r in recs:
             fp = r.file_path or ''
             if fp and not os.path.isabs(fp):
@@ -478,21 +1692,47 @@ def health_check():
     """Health check endpoint for deployment platforms."""
     return jsonify({'status': 'healthy', 'service': 'HAI V1'}), 200
 
-
-def synthesize_with_openai(text, voice='alloy', fmt='mp3'):
+@app.route('/metrics')
+def metrics():
+    """Expose internal counters (caches, pools, queues) for latency investigations."""
+    return jsonify({
+        'status': 'ok',
+        'tts_cache': tts_cache.stats(),
+        'openai_http': openai_http.stats(),
+        'background_work': background_work.stats(),
+        'write_behind': write_behind.stats(),
+        'local_whisper': local_whisper.stats(),
+        'speech_to_text': stt.stats(),
+        'transcript_cache': transcript_cache.stats(),
+        'stt_preprocessing': audio_preprocessor.stats()
+    })
+
+
+def synthesize_with_openai(text, voice='alloy', fmt='mp3', stream=False):
+    """Call OpenAI TTS and return (audio_bytes, content_type).
+
+    With stream=True the body is left unread and (response, content_type) is returned,
+    so the caller can pass chunks on with `response.iter_content()` as they arrive.
+    """
     api_key = os.environ.get('OPENAI_API_KEY')
     if not api_key:
         raise RuntimeError('OpenAI API key not configured')
     url = 'https://api.openai.com/v1/audio/speech'
     headers = {'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'}
     payload = {'model': 'gpt-4o-mini-tts', 'voice': voice, 'input': text}
-    resp = requests.post(url, headers=headers, json=payload, stream=True, timeout=60)
+    resp = openai_http.post(url, headers=headers, json=payload, stream=True, timeout=60)
     resp.raise_for_status()
+    content_type = tts_content_type(fmt)
+    if stream:
+        return resp, content_type
     audio_bytes = resp.content
-    content_type = 'audio/mpeg' if fmt.lower() in ('mp3','mpeg') else 'audio/webm'
     return audio_bytes, content_type
 
 
+def tts_content_type(fmt):
+    return 'audio/mpeg' if fmt.lower() in ('mp3','mpeg') else 'audio/webm'
+
+
 def sanitize_stream_token(token: str) -> str:
     """
     Remove unwanted filler tokens that sometimes appear during streaming.
@@ -520,6 +1760,78 @@ def sanitize_stream_token(token: str) -> str:
     return token
 
 
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+
+def split_finished_sentences(buffer, min_chars=20):
+    """Split complete sentences off the front of streamed text.
+
+    Returns (sentences, remainder). Fragments shorter than `min_chars` stay attached to
+    the following sentence so abbreviations and interjections don't become tiny clips.
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END_RE.finditer(buffer):
+        candidate = buffer[start:match.end()].strip()
+        if len(candidate) < min_chars:
+            continue
+        sentences.append(candidate)
+        start = match.end()
+    return sentences, buffer[start:]
+
+
+def concat_audio_files(paths, file_path):
+    """Join MP3 clips into one MP3 by decoding and re-encoding them with pydub.
+
+    Plain byte concatenation would leave each clip's ID3/Xing header in the middle of the
+    stream, so players misreport the duration and seek badly. Decoding also lets pydub
+    resample clips whose sample rate or channel count differ.
+    """
+    combined = AudioSegment.empty()
+    for path in paths:
+        combined += AudioSegment.from_mp3(path)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = file_path + '.part'
+    try:
+        combined.export(temp_path, format='mp3')
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+@app.route('/live_transcription', methods=['POST'])
+def start_live_transcription():
+    """Open a live transcription stream for the recording that is about to start."""
+    participant_id = session.get('participant_id')
+    if not participant_id:
+        return jsonify({'status': 'error', 'message': 'Participant ID not found in session'}), 400
+    stream = live_transcriptions.start(participant_id)
+    return jsonify({'status': 'success', 'stream_id': stream.stream_id})
+
+@app.route('/live_transcription/<stream_id>/chunk/<int:index>', methods=['POST'])
+def live_transcription_chunk(stream_id, index):
+    """Append one MediaRecorder chunk (raw body); finished segments are transcribed in the background."""
+    stream = live_transcriptions.get(stream_id, session.get('participant_id'))
+    if stream is None:
+        return jsonify({'status': 'error', 'message': 'Live transcription stream not found'}), 404
+    if (request.content_length or 0) > LIVE_CHUNK_MAX_BYTES:
+        return jsonify({'status': 'error', 'message': f'Chunks are limited to {LIVE_CHUNK_MAX_BYTES} bytes'}), 413
+    data = request.stream.read(LIVE_CHUNK_MAX_BYTES + 1)  # bounded even without a Content-Length
+    if len(data) > LIVE_CHUNK_MAX_BYTES:
+        return jsonify({'status': 'error', 'message': f'Chunks are limited to {LIVE_CHUNK_MAX_BYTES} bytes'}), 413
+    result = live_transcriptions.append(stream, index, data)
+    if result == 'closed':
+        return jsonify({'status': 'error', 'message': 'Live transcription stream is already closed'}), 409
+    if result == 'conflict':
+        return jsonify({'status': 'error', 'message': 'Unexpected chunk index', 'next_index': stream.next_index}), 409
+    return jsonify({
+        'status': 'success',
+        'next_index': stream.next_index,
+        'segments_transcribed': len(stream.texts),
+        'partial_transcript': ' '.join(stream.texts)
+    })
+
+
 @app.route('/stream_submit_message', methods=['POST'])
 def stream_submit_message_v1():
     """Streaming variant for V1: streams partial text tokens to the client."""
@@ -532,42 +1844,47 @@ def stream_submit_message_v1():
                 'message': 'Participant ID or trial type not found in session'
             }), 400
 
-        concept_name = request.form.get('concept_name', '').strip()
-        concept_list = load_concepts()
-        concepts = {c["name"]: c for c in concept_list}   
-
-        concept_found = False
-        for concept in concepts:
-            if concept.lower() == concept_name.lower():
-                concept_name = concept
-                concept_found = True
-                break
-
-        if not concept_found:
+        concept = concept_registry.get(request.form.get('concept_name', ''))
+        if not concept:
             return jsonify({'status': 'error', 'message': 'Concept not found'}), 400
 
-        golden_answer = concepts[concept_name]['golden_answer']
+        concept_name = concept.name
+        golden_answer = concept.golden_answer
 
         # --------------------------
         #  TRANSCRIPT HANDLING
         # --------------------------
         user_transcript = request.form.get('message', '')
+        live_stream_id = request.form.get('live_stream_id')
 
-        if 'audio' in request.files:
-            audio_file = request.files['audio']
-            if audio_file:
+        if live_stream_id or 'audio' in request.files:
+            audio_file = request.files.get('audio')
+            if live_stream_id or audio_file:
                 folders = get_participant_folder(participant_id, trial_type)
                 audio_filename = get_audio_filename('user', participant_id, 1)
                 audio_path = os.path.join(folders['participant_folder'], audio_filename)
-                audio_file.save(audio_path)
+                live_stream = None
+                if live_stream_id:
+                    live_stream = live_transcriptions.close(live_stream_id, participant_id, audio_path)
+                    if live_stream is None:
+                        return jsonify({'status': 'error', 'message': 'Live transcription stream not found'}), 400
+                else:
+                    audio_file.save(audio_path)
+
+                sound = decode_clip(audio_path)
+                no_speech = detect_no_speech(audio_path, sound)
+                if no_speech:
+                    if live_stream:
+                        live_transcriptions.discard(live_stream)
+                    return not_caught_reply(participant_id, trial_type, concept_name, audio_path,
+                                            session.get('concept_attempts', {}).get(concept_name, 0), no_speech, stream=True)
+
                 try:
-                    with open(audio_path, 'rb') as f:
-                        user_transcript = openai.Audio.transcribe(
-                            model='whisper-1', 
-                            file=f
-                        )['text']
-                except Exception:
-                    user_transcript = speech_to_text(audio_path)
+                    user_transcript = live_transcriptions.complete(live_stream, sound) if live_stream else transcribe_clip(audio_path, sound)
+                except Exception as e:
+                    return transcription_unavailable_reply(e)  # a live stream is kept for the retry
+                if live_stream:
+                    live_transcriptions.discard(live_stream)
 
         messages = [
             {"role": "system", "content": f"Context: {concept_name}\nGolden Answer: {golden_answer}"},
@@ -587,7 +1904,40 @@ def stream_submit_message_v1():
                     stream=True
                 )
 
+                concept_attempts = session.get('concept_attempts', {})
+                attempt_count = concept_attempts.get(concept_name, 0)
+                concept_attempts[concept_name] = attempt_count
+
+                folders = get_participant_folder(participant_id, trial_type)
+                ai_audio_filename = get_audio_filename('ai', participant_id, attempt_count)
+                ai_audio_path = os.path.join(folders['participant_folder'], ai_audio_filename)
+                sentence_base = os.path.splitext(ai_audio_filename)[0]
+
                 final_text = ""
+                pending_text = ""
+                sentence_jobs = []  # (filename, path, text, future) in speaking order
+                sentence_results = []  # filename, or None if synthesis failed
+
+                def submit_sentence(text):
+                    filename = f"{sentence_base}_s{len(sentence_jobs) + 1}.mp3"
+                    path = os.path.join(folders['participant_folder'], filename)
+                    sentence_jobs.append((filename, path, text, executor.submit(generate_audio, text, path)))
+
+                def ready_sentence_markers(wait=False):
+                    # Emit strictly in order so sentence 2 is never announced before sentence 1
+                    while len(sentence_results) < len(sentence_jobs):
+                        filename, path, text, future = sentence_jobs[len(sentence_results)]
+                        if not wait and not future.done():
+                            break
+                        ok = future.result()
+                        sentence_results.append(filename if ok else None)
+                        if ok:
+                            marker = json.dumps({
+                                'index': len(sentence_results),
+                                'audio_url': filename,
+                                'text': text
+                            })
+                            yield '__AUDIO__START__' + marker + '__AUDIO__END__'
 
                 for event in stream_resp:
                     try:
@@ -607,41 +1957,47 @@ def stream_submit_message_v1():
                     final_text += token
                     yield token
 
+                    # Hand each finished sentence to TTS while the model keeps writing
+                    pending_text += token
+                    sentences, pending_text = split_finished_sentences(pending_text)
+                    for sentence in sentences:
+                        submit_sentence(sentence)
+                    yield from ready_sentence_markers()
+
+                if pending_text.strip():
+                    submit_sentence(pending_text.strip())
+                yield from ready_sentence_markers(wait=True)
+
                 # ----------------------------------
                 #  AFTER STREAM COMPLETE
                 # ----------------------------------
                 try:
-                    concept_attempts = session.get('concept_attempts', {})
-                    attempt_count = concept_attempts.get(concept_name, 0)
-                    concept_attempts[concept_name] = attempt_count
-
-                    folders = get_participant_folder(participant_id, trial_type)
-                    ai_audio_filename = get_audio_filename('ai', participant_id, attempt_count)
-                    ai_audio_path = os.path.join(folders['participant_folder'], ai_audio_filename)
-
                     try:
-                        generate_audio(final_text, ai_audio_path)
+                        if sentence_jobs and all(sentence_results):
+                            try:
+                                concat_audio_files([job[1] for job in sentence_jobs], ai_audio_path)
+                            except Exception as e:
+                                print('Joining sentence clips failed, synthesizing whole response:', str(e))
+                                generate_audio(final_text, ai_audio_path)
+                        else:
+                            generate_audio(final_text, ai_audio_path)
                     except Exception as e:
                         print('Audio generation error after streaming:', str(e))
 
-                    try:
-                        session_id = session.get('session_id')
-                        if session_id and os.path.exists(ai_audio_path):
-                            with open(ai_audio_path, 'rb') as f:
-                                ai_audio_data = f.read()
-                            save_audio_with_cloud_backup(
-                                ai_audio_data,
-                                ai_audio_filename,
-                                session_id,
-                                'ai_audio',
-                                concept_name,
-                                attempt_count
-                            )
-                    except Exception as e:
-                        print('Failed to backup AI audio:', str(e))
+                    session_id = session.get('session_id')
+                    if session_id and os.path.exists(ai_audio_path):
+                        background_work.submit(
+                            register_recording_file,
+                            ai_audio_path,
+                            session_id,
+                            'ai_audio',
+                            concept_name,
+                            attempt_count
+                        )
 
                     meta = json.dumps({
                         'ai_audio_url': ai_audio_filename,
+                        'sentence_audio_urls': [f for f in sentence_results if f],
                         'attempt_count': attempt_count,
                         'response': final_text
                     })
@@ -718,23 +2074,33 @@ def synthesize():
             return jsonify({'error': 'No text provided'}), 400
         voice = data.get('voice', 'alloy')
         fmt = data.get('format', 'mp3')
-        try:
-            clean_text = clean_tts_text(text)
-            ssml_text = ssml_wrap(clean_text, rate='5%', pitch='0%', break_ms=220)
-            audio_bytes, content_type = synthesize_with_openai(ssml_text, voice=voice, fmt=fmt)
-            return (audio_bytes, 200, {'Content-Type': content_type, 'Content-Disposition': 'inline; filename="tts.' + fmt + '"'})
-        except Exception as openai_err:
-            print('OpenAI TTS failed or rejected SSML, falling back to gTTS:', str(openai_err))
-        try:
-            from io import BytesIO
-            bio = BytesIO()
-            tts = gTTS(text=clean_text, lang='en')
-            tts.write_to_fp(bio)
-            bio.seek(0)
-            return (bio.read(), 200, {'Content-Type': 'audio/mpeg', 'Content-Disposition': 'inline; filename="tts.mp3"'})
-        except Exception as e:
-            print('gTTS fallback failed:', str(e))
+        use_stream = str(data.get('stream', '1')).lower() not in ('0', 'false', 'no')
+
+        if use_stream:
+            # Chunked transfer: audio goes out as the provider produces it
+            try:
+                chunks, content_type = stream_tts(text, voice=voice, fmt=fmt, prosody=SYNTHESIZE_PROSODY)
+            except Exception as e:
+                print('TTS streaming failed:', str(e))
+                chunks = None
+            if chunks is None:
+                return jsonify({'error': 'TTS synthesis failed'}), 500
+            ext = 'mp3' if content_type == 'audio/mpeg' else (re.sub(r'[^a-z0-9]', '', fmt.lower()) or 'mp3')
+            return Response(
+                stream_with_context(chunks),
+                mimetype=content_type,
+                headers={'Content-Disposition': f'inline; filename="tts.{ext}"'}
+            )
+
+        try:
+            audio_path, content_type = synthesize_tts_cached(text, voice=voice, fmt=fmt, prosody=SYNTHESIZE_PROSODY)
+        except Exception as e:
+            print('TTS synthesis failed:', str(e))
+            audio_path = None
+        if not audio_path:
             return jsonify({'error': 'TTS synthesis failed'}), 500
+        ext = os.path.splitext(audio_path)[1]
+        return send_file(audio_path, mimetype=content_type, download_name='tts' + ext)
     except Exception as e:
         print('Synthesize endpoint error:', str(e))
         return jsonify({'error': str(e)}), 500
@@ -759,35 +2125,168 @@ def download_resource(filename):
         print(f"Error serving resource {filename}: {str(e)}")
         return jsonify({'error': f'Error serving resource file {filename}'}), 500
 
-@lru_cache
-def load_concepts():
-    """Load concepts from JSON file or create default concepts if file doesn't exist."""
-    try:
-        concepts_file = 'concepts.json'
-        if os.path.exists(concepts_file):
-            with open(concepts_file, 'r') as f:
-                concepts = json.load(f)
-                print(f"Loaded concepts: {list(concepts.keys())}")  # Debug print
-                return concepts
-        else:
-            default_concepts = {
-                "Correlation": {
-                    "golden_answer": "Correlation describes the strength and direction of a relationship between two variables, ranging from -1 to 1. A value close to 1 indicates a strong positive relationship, while a value close to -1 indicates a strong negative one. Importantly, correlation does not imply causation. It only shows that two variables change together. A third variable may influence both, which is why identifying extraneous variables is essential."
-                },
-                "Confounders": {
-                    "golden_answer": "Confounders are variables that influence both the independent and dependent variables, creating a spurious association. They can lead to incorrect conclusions about causality. Identifying and controlling for confounders is crucial in research to ensure accurate interpretation of relationships between variables."
-                },
-                "Moderators": {
-                    "golden_answer": "Moderators are variables that affect the strength or direction of the relationship between two other variables. They can either strengthen, weaken, or reverse the relationship. Understanding moderators helps in identifying when and for whom a particular relationship holds true."
+CONCEPTS_FILE = 'concepts.json'
+DEFAULT_CONCEPTS = {
+    "Correlation": {
+        "golden_answer": "Correlation describes the strength and direction of a relationship between two variables, ranging from -1 to 1. A value close to 1 indicates a strong positive relationship, while a value close to -1 indicates a strong negative one. Importantly, correlation does not imply causation. It only shows that two variables change together. A third variable may influence both, which is why identifying extraneous variables is essential."
+    },
+    "Confounders": {
+        "golden_answer": "Confounders are variables that influence both the independent and dependent variables, creating a spurious association. They can lead to incorrect conclusions about causality. Identifying and controlling for confounders is crucial in research to ensure accurate interpretation of relationships between variables."
+    },
+    "Moderators": {
+        "golden_answer": "Moderators are variables that affect the strength or direction of the relationship between two other variables. They can either strengthen, weaken, or reverse the relationship. Understanding moderators helps in identifying when and for whom a particular relationship holds true."
+    }
+}
+
+SIMILARITY_STOPWORDS = frozenset({
+    'the','is','a','an','and','or','of','in','to','for','on','with','that','this','it',
+    'as','are','be','by','at','from','which','was','were','has','have','but','not'
+})
+# An explanation using any of these words gets a small similarity bonus
+SIMILARITY_KEYWORDS = ("cause", "effect", "relationship", "variable", "influence")
+
+def normalize_similarity_text(text):
+    """Lowercase, replace anything but [a-z0-9] and whitespace with spaces, collapse whitespace."""
+    t = (text or '').lower()
+    t = re.sub(r"[^a-z0-9\s]", ' ', t)
+    t = re.sub(r"\s+", ' ', t).strip()
+    return t
+
+def content_tokens(normalized_text):
+    return [w for w in normalized_text.split() if w and w not in SIMILARITY_STOPWORDS]
+
+class Concept:
+    """One concept from concepts.json with the golden-answer features similarity scoring needs."""
+
+    def __init__(self, name, golden_answer, keywords=None):
+        self.name = name
+        self.key = name.casefold()
+        self.golden_answer = golden_answer
+        self.normalized_golden = normalize_similarity_text(golden_answer)
+        self.golden_tokens = content_tokens(self.normalized_golden)
+        self.golden_token_set = frozenset(self.golden_tokens)
+        self.keywords = tuple(keywords) if keywords else SIMILARITY_KEYWORDS
+        # SequenceMatcher indexes its second sequence; index the golden answer once and
+        # hand each scoring call a shallow copy that shares the (read-only) index
+        self.golden_matcher = SequenceMatcher(None, '', self.normalized_golden)
+
+# Explanations scoring at least this count as close enough to the golden answer;
+# permissive so paraphrases pass
+SIMILARITY_THRESHOLD = 0.45
+
+def _similarity_parts(text, concept):
+    """Return (jaccard, bonus, matcher) for one text, or None if either side is empty.
+
+    `matcher` already holds the normalized text against the concept's indexed golden
+    answer, so callers can bound the character ratio before paying for it.
+    """
+    na = normalize_similarity_text(text)
+    if not na or not concept.normalized_golden:
+        return None
+
+    set_a = set(content_tokens(na))
+    shared = len(set_a & concept.golden_token_set)
+    union = len(set_a) + len(concept.golden_token_set) - shared
+    jaccard = float(shared) / float(union) if union else 0.0
+    bonus = 0.05 if any(k in na for k in concept.keywords) else 0.0
+
+    matcher = copy.copy(concept.golden_matcher)
+    matcher.set_seq1(na)
+    return jaccard, bonus, matcher
+
+def _combine_similarity(jaccard, bonus, seq):
+    score = 0.25 * jaccard + 0.75 * seq
+    if bonus:
+        score += bonus
+    return min(score, 1.0)
+
+def similarity_score(text, concept):
+    """Similarity in [0, 1] between a text and a concept's golden answer.
+
+    0.25 * token Jaccard (stopwords removed) + 0.75 * SequenceMatcher character ratio,
+    plus 0.05 if the text mentions one of the concept's keywords.
+    """
+    parts = _similarity_parts(text, concept)
+    if parts is None:
+        return 0.0
+    jaccard, bonus, matcher = parts
+    return _combine_similarity(jaccard, bonus, matcher.ratio())
+
+def meets_similarity_threshold(text, concept, threshold=SIMILARITY_THRESHOLD):
+    """Whether similarity_score(text, concept) >= threshold, usually without computing it.
+
+    SequenceMatcher's real_quick_ratio() (lengths only) and quick_ratio() (character
+    counts) are upper bounds on ratio(), so a text that cannot reach the threshold even
+    with those is rejected before the full matching-block search. The decision is
+    always the same as comparing the exact score.
+    """
+    parts = _similarity_parts(text, concept)
+    if parts is None:
+        return 0.0 >= threshold
+    jaccard, bonus, matcher = parts
+    for bound in (matcher.real_quick_ratio, matcher.quick_ratio):
+        if _combine_similarity(jaccard, bonus, bound()) < threshold:
+            return False
+    return _combine_similarity(jaccard, bonus, matcher.ratio()) >= threshold
+
+class ConceptRegistry:
+    """Concepts keyed by casefolded name, rebuilt whenever concepts.json's mtime changes.
+
+    Lookups are a dict hit plus one os.stat() to notice edits, so changing the file no
+    longer needs a restart. A file that fails to parse keeps the last good registry.
+    """
+
+    def __init__(self, path, defaults):
+        self.path = path
+        self.defaults = defaults
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._concepts = {}
+        self._by_key = {}
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            with open(self.path, 'w') as f:
+                json.dump(self.defaults, f, indent=4)
+            print(f"Created default concepts: {list(self.defaults.keys())}")
+            mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, 'r') as f:
+                    raw = json.load(f)
+                concepts = {
+                    name: Concept(name, entry['golden_answer'], entry.get('keywords'))
+                    for name, entry in raw.items()
                 }
-            }
-            with open(concepts_file, 'w') as f:
-                json.dump(default_concepts, f, indent=4)
-            print(f"Created default concepts: {list(default_concepts.keys())}")  # Debug print
-            return default_concepts
-    except Exception as e:
-        print(f"Error loading concepts: {str(e)}")
-        return {}
+            except Exception as e:
+                print(f"Error loading concepts: {str(e)}")
+                self._mtime = mtime
+                return
+            self._concepts = concepts
+            self._by_key = {concept.key: concept for concept in concepts.values()}
+            self._mtime = mtime
+            print(f"Loaded concepts: {list(concepts.keys())}")
+
+    def get(self, name):
+        """Return the Concept whose name matches `name` case-insensitively, or None."""
+        self._refresh()
+        return self._by_key.get((name or '').strip().casefold())
+
+    def all(self):
+        self._refresh()
+        return list(self._concepts.values())
+
+concept_registry = ConceptRegistry(CONCEPTS_FILE, DEFAULT_CONCEPTS)
+
+def load_concepts():
+    """Return {concept name: {'golden_answer': ...}} from the concept registry."""
+    return {concept.name: {'golden_answer': concept.golden_answer} for concept in concept_registry.all()}
         
 @app.route('/set_context', methods=['POST'])
 def set_context():
@@ -795,26 +2294,24 @@ def set_context():
     concept_name = request.form.get('concept_name')
     slide_number = request.form.get('slide_number', '0')
     logger.info(f"Setting context for concept: {concept_name}")
-    concepts = load_concepts()
-    
-    selected_concept = next((c for c in concepts if c["name"] == concept_name), None)
+    selected_concept = concept_registry.get(concept_name)
 
     if not selected_concept:
         logger.error(f"Invalid concept selection: {concept_name}")
         return jsonify({'error': 'Invalid concept selection'})
 
-    session['concept_name'] = selected_concept["name"]
-    session['golden_answer'] = selected_concept["golden_answer"]
+    session['concept_name'] = selected_concept.name
+    session['golden_answer'] = selected_concept.golden_answer
     
     if 'concept_attempts' not in session:
         session['concept_attempts'] = {}
     session.modified = True
 
-    log_interaction("SYSTEM", selected_concept["name"], 
-                    f"Context set for concept: {selected_concept['name']}")
+    log_interaction("SYSTEM", selected_concept.name, 
+                    f"Context set for concept: {selected_concept.name}")
 
-    logger.info(f"Context set successfully for: {selected_concept['name']}")
-    return jsonify({'message': f'Context set for {selected_concept["name"]}.'})
+    logger.info(f"Context set successfully for: {selected_concept.name}")
+    return jsonify({'message': f'Context set for {selected_concept.name}.'})
 
 @app.route('/change_concept', methods=['POST'])
 def change_concept():
@@ -881,7 +2378,7 @@ def get_intro_audio():
             }), 400
             
         folders = get_participant_folder(participant_id, trial_type)
-        intro_text = "Hello, let us begin the self-explanation journey! We'll be exploring the concept of Extraneous Variables, focusing on Correlation, Confounders, and Moderators. Please go through each concept and explain what you understand about them in your own words!"
+        intro_text = INTRO_TEXT
         
         intro_audio_filename = f"intro_{participant_id}.mp3"
         intro_audio_path = os.path.join(folders['participant_folder'], intro_audio_filename)
@@ -937,17 +2434,17 @@ def get_concept_audio(concept_name):
         folders = get_participant_folder(participant_id, trial_type)
         safe_concept = secure_filename(concept_name)
         
-        concept_audio_filename = get_audio_filename(f'concept_{safe_concept}', interaction_id)
+        concept_audio_filename = get_audio_filename(f'concept_{safe_concept}', participant_id, interaction_id)
         concept_audio_path = os.path.join(folders['participant_folder'], concept_audio_filename)
         
-        concept_intro_text = f"Now, let's explore the concept of {concept_name}. Please explain what you understand about this concept in your own words!"
+        concept_intro_text = CONCEPT_INTRO_TEMPLATE.format(concept_name=concept_name)
         
         generate_audio(concept_intro_text, concept_audio_path)
         
         log_interaction("AI", concept_name, concept_intro_text)
 
         return send_from_directory(
-            folders['participant_folder'],  
+            os.path.abspath(folders['participant_folder']),  # relative paths resolve against app.root_path
             concept_audio_filename,
             mimetype='audio/mpeg'
         )
@@ -959,6 +2456,70 @@ def get_concept_audio(concept_name):
         }), 500
 
 
+def not_caught_reply(participant_id, trial_type, concept_name, audio_path, attempt_count, reason, stream=False):
+    """Answer an empty/silent clip with the canned reply, skipping STT, the LLM and TTS calls.
+
+    The attempt is not counted, so the clip was saved under the next attempt's file name;
+    it is moved to `<name>_nospeech_<n>` before the real attempt overwrites it. The reply
+    audio comes from the warmed TTS cache.
+    """
+    root, extension = os.path.splitext(audio_path)
+    n = 1
+    while os.path.exists(f"{root}_nospeech_{n}{extension}"):
+        n += 1
+    nospeech_path = f"{root}_nospeech_{n}{extension}"
+    os.replace(audio_path, nospeech_path)
+    audio_path = nospeech_path
+
+    folders = get_participant_folder(participant_id, trial_type)
+    ai_audio_root, ai_audio_extension = os.path.splitext(get_audio_filename('ai', participant_id, attempt_count + 1))
+    ai_audio_filename = f"{ai_audio_root}_nospeech_{n}{ai_audio_extension}"
+    ai_audio_path = os.path.join(folders['participant_folder'], ai_audio_filename)
+    has_audio = generate_audio(NOT_CAUGHT_RESPONSE, ai_audio_path)
+
+    session_id = session.get('session_id')
+    if session_id:
+        background_work.submit(register_recording_file, audio_path, session_id, 'user_audio', concept_name, attempt_count)
+
+    if stream:
+        meta = json.dumps({
+            'ai_audio_url': ai_audio_filename if has_audio else None,
+            'sentence_audio_urls': [],
+            'attempt_count': attempt_count,
+            'response': NOT_CAUGHT_RESPONSE,
+            'no_speech': reason
+        })
+        return Response(NOT_CAUGHT_RESPONSE + '\n__JSON__START__' + meta + '__JSON__END__\n',
+                        content_type='text/plain; charset=utf-8')
+
+    return jsonify({
+        'status': 'success',
+        'response': NOT_CAUGHT_RESPONSE,
+        'user_transcript': '',
+        'ai_audio_url': ai_audio_filename if has_audio else None,
+        'attempt_count': attempt_count,
+        'should_move_to_next': False,
+        'no_speech': reason
+    })
+
+
+def transcription_unavailable_reply(error):
+    """503 for a clip that could not be transcribed right now (engines down, queue full).
+
+    Nothing is logged as the participant's explanation and the attempt is not counted,
+    so the client can simply send the recording again.
+    """
+    print(f"Transcription unavailable, asking the client to retry: {str(error)}")
+    response = jsonify({
+        'status': 'error',
+        'retryable': True,
+        'message': 'Speech recognition is temporarily unavailable. Please send your recording again in a moment.'
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+
 @app.route('/submit_message', methods=['POST'])
 def submit_message():
     """Handle user message submission and generate AI response."""
@@ -972,17 +2533,12 @@ def submit_message():
                 'message': 'Participant ID or trial type not found in session'
             }), 400
 
-        concept_name = request.form.get('concept_name', '').strip()
-        concepts = load_concepts()
-
-        for concept in concepts:
-            if concept.lower() == concept_name.lower():
-                concept_name = concept
-                break
-        else:
+        concept = concept_registry.get(request.form.get('concept_name', ''))
+        if not concept:
             return jsonify({'status': 'error', 'message': 'Concept not found'}), 400
 
-        golden_answer = concepts[concept_name]['golden_answer']
+        concept_name = concept.name
+        golden_answer = concept.golden_answer
 
         # ------------------------------
         #  GET CURRENT ATTEMPT COUNT
@@ -995,23 +2551,37 @@ def submit_message():
         #  PROCESS AUDIO OR TEXT INPUT
         # ------------------------------
         user_transcript = request.form.get('message', '')
+        live_stream_id = request.form.get('live_stream_id')
+        audio_path = None
 
-        if 'audio' in request.files:
-            audio_file = request.files['audio']
-            if audio_file:
+        if live_stream_id or 'audio' in request.files:
+            audio_file = request.files.get('audio')
+            if live_stream_id or audio_file:
                 folders = get_participant_folder(participant_id, trial_type)
                 audio_filename = get_audio_filename('user', participant_id, attempt_count + 1)
                 audio_path = os.path.join(folders['participant_folder'], audio_filename)
-                audio_file.save(audio_path)
+                live_stream = None
+                if live_stream_id:
+                    # Recording was streamed while it was made; most of it is already transcribed
+                    live_stream = live_transcriptions.close(live_stream_id, participant_id, audio_path)
+                    if live_stream is None:
+                        return jsonify({'status': 'error', 'message': 'Live transcription stream not found'}), 400
+                else:
+                    audio_file.save(audio_path)
+
+                sound = decode_clip(audio_path)
+                no_speech = detect_no_speech(audio_path, sound)
+                if no_speech:
+                    if live_stream:
+                        live_transcriptions.discard(live_stream)
+                    return not_caught_reply(participant_id, trial_type, concept_name, audio_path, original_attempt, no_speech)
 
                 try:
-                    with open(audio_path, "rb") as audio_file:
-                        user_transcript = openai.Audio.transcribe(
-                            model="whisper-1",
-                            file=audio_file
-                        )["text"]
-                except Exception:
-                    user_transcript = speech_to_text(audio_path)
+                    user_transcript = live_transcriptions.complete(live_stream, sound) if live_stream else transcribe_clip(audio_path, sound)
+                except Exception as e:
+                    return transcription_unavailable_reply(e)  # a live stream is kept for the retry
+                if live_stream:
+                    live_transcriptions.discard(live_stream)
 
                 if not user_transcript:
                     return jsonify({'status': 'error', 'message': 'Failed to transcribe audio'}), 400
@@ -1019,70 +2589,10 @@ def submit_message():
         # ---------------
         #  SIMILARITY CHECK 
         # ---------------
-        def compute_similarity(a, b):
-            """Compute a combined similarity score between two texts.
-
-            Uses token-level Jaccard (after stopword removal) and
-            SequenceMatcher character ratio. Returns weighted score in [0,1].
-            """
-            import re
-            from difflib import SequenceMatcher as _SM
-
-            def normalize(text):
-                t = (text or '').lower()
-                t = re.sub(r"[^a-z0-9\s]", ' ', t)
-                t = re.sub(r"\s+", ' ', t).strip()
-                return t
-
-            stopwords = {
-                'the','is','a','an','and','or','of','in','to','for','on','with','that','this','it',
-                'as','are','be','by','at','from','which','was','were','has','have','but','not'
-            }
-
-            na = normalize(a)
-            nb = normalize(b)
-
-            if not na or not nb:
-                return 0.0
-
-            tokens_a = [w for w in na.split() if w and w not in stopwords]
-            tokens_b = [w for w in nb.split() if w and w not in stopwords]
-
-            set_a = set(tokens_a)
-            set_b = set(tokens_b)
-
-            # token-level Jaccard
-            try:
-                jaccard = float(len(set_a & set_b)) / float(len(set_a | set_b)) if (set_a | set_b) else 0.0
-            except Exception:
-                jaccard = 0.0
-
-            # character-level sequence matcher
-            try:
-                seq = _SM(None, na, nb).ratio()
-            except Exception:
-                seq = 0.0
-
-            # weighted combination (tunable)
-            # score = 0.25 * jaccard + 0.75 * seq
-            # return score
-            score = 0.25 * jaccard + 0.75 * seq
-
-            # bonus if user hits important concepts
-            keywords = {"cause", "effect", "relationship", "variable", "influence"}
-            if any(k in na for k in keywords):
-                score += 0.05
-
-            return min(score, 1.0)
-        
         try:
-            sim = compute_similarity(user_transcript, golden_answer)
+            is_similar_enough = meets_similarity_threshold(user_transcript, concept)
         except Exception:
-            sim = 0.0
-
-        # threshold tuned to be permissive for paraphrases; adjust if needed
-        SIMILARITY_THRESHOLD = 0.45
-        is_similar_enough = (sim >= SIMILARITY_THRESHOLD)
+            is_similar_enough = False
 
         current_attempt_for_response = original_attempt
 
@@ -1129,22 +2639,23 @@ def submit_message():
         ai_audio_path = os.path.join(folders['participant_folder'], ai_audio_filename)
 
         if generate_audio(response, ai_audio_path):
-            log_interaction("User", concept_name, user_transcript)
-            log_interaction("AI", concept_name, response)
-
-            log_interaction_to_db_only("USER", concept_name, user_transcript, attempt_count)
-            log_interaction_to_db_only("AI", concept_name, response, attempt_count)
+            # Logging and recording metadata are written after the response goes out
+            now = datetime.now()
+            background_work.submit(write_log_lines, participant_id, trial_type, [
+                ("User", concept_name, user_transcript, now),
+                ("AI", concept_name, response, now)
+            ])
 
             session_id = session.get('session_id')
             if session_id:
-                if 'audio' in request.files:
-                    with open(audio_path, 'rb') as f:
-                        audio_data = f.read()
-                    save_audio_with_cloud_backup(audio_data, audio_filename, session_id, 'user_audio', concept_name, attempt_count)
+                insert_interactions([
+                    (session_id, "USER", concept_name, user_transcript, attempt_count, datetime.utcnow()),
+                    (session_id, "AI", concept_name, response, attempt_count, datetime.utcnow())
+                ])
 
-                with open(ai_audio_path, 'rb') as f:
-                    ai_audio_data = f.read()
-                save_audio_with_cloud_backup(ai_audio_data, ai_audio_filename, session_id, 'ai_audio', concept_name, attempt_count)
+                if audio_path:
+                    background_work.submit(register_recording_file, audio_path, session_id, 'user_audio', concept_name, attempt_count)
+                background_work.submit(register_recording_file, ai_audio_path, session_id, 'ai_audio', concept_name, attempt_count)
 
             should_move_flag = (attempt_count >= 3)
 
@@ -1181,36 +2692,8 @@ def generate_response(user_message, concept_name, golden_answer, attempt_count,
         history_context = "\nRecent conversation:\n" + "\n".join(conversation_history[-3:])
     
 
-    # --- Normalize for similarity comparison ---
-    def normalize(text):
-        return re.sub(r'[^a-z0-9\s]', '', (text or '').lower().strip())
-
-    user_norm = normalize(user_message)
-    golden_norm = normalize(golden_answer)
-
-    try:
-        char_ratio = SequenceMatcher(None, user_norm, golden_norm).ratio()
-    except Exception:
-        char_ratio = 0.0
-
-    def _word_jaccard(a, b):
-        a_set = set(a.split())
-        b_set = set(b.split())
-        if not a_set and not b_set:
-            return 0.0
-        try:
-            return len(a_set & b_set) / len(a_set | b_set)
-        except Exception:
-            return 0.0
-
-    word_ratio = _word_jaccard(user_norm, golden_norm)
-
     if is_similar_enough:
-        return (
-            "Excellent — your explanation is clear and accurate. "
-            "You’ve captured the main idea correctly. "
-            "You can now move on to the next concept."
-        )
+        return SIMILAR_ENOUGH_RESPONSE
 
     # ==== Base prompt ====
     base_prompt = f"""
@@ -1386,6 +2869,315 @@ def serve_audio(folder_type, participant_id, trial_type, filename):
         return jsonify({'error': 'Error serving audio file'}), 500
 
 
+RESUMABLE_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, 'resumable_uploads')
+RESUMABLE_UPLOAD_EXTENSIONS = ALLOWED_EXTENSIONS | {'mp4', 'mkv'}
+RESUMABLE_CHUNK_MAX_BYTES = int(os.environ.get('RESUMABLE_CHUNK_MAX_BYTES', 16 * 1024 * 1024))
+RESUMABLE_UPLOAD_TTL_SECONDS = 48 * 3600
+
+class ResumableUploads:
+    """Chunked uploads appended to `<upload_id>.part` in the upload folder.
+
+    Each chunk carries its index and the byte offset it starts at; it is only appended
+    when the offset equals the current size of the .part file, so a client that lost a
+    connection asks for the status and resumes from there. Chunks are copied from the
+    request stream in small pieces, so memory per upload stays bounded. Upload state is
+    kept in small JSON files so uploads survive a restart. Finalizing moves the .part
+    file to the target path, so two uploads of the same file name never share a file.
+    """
+
+    def __init__(self, folder, ttl_seconds):
+        self.folder = folder
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._upload_locks = {}
+        os.makedirs(folder, exist_ok=True)
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.folder, f"{upload_id}.json")
+
+    def _save(self, meta):
+        temp_path = self._meta_path(meta['upload_id']) + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, self._meta_path(meta['upload_id']))
+
+    def load(self, upload_id):
+        if not re.fullmatch(r'[0-9a-f]{32}', upload_id or ''):
+            return None
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def lock_for(self, upload_id):
+        with self._lock:
+            return self._upload_locks.setdefault(upload_id, threading.Lock())
+
+    def start(self, target_path, participant_id, target, total_size=None, concept_name=None):
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        meta = {
+            'upload_id': upload_id,
+            'target_path': target_path,
+            'part_path': os.path.join(self.folder, f"{upload_id}.part"),
+            'participant_id': participant_id,
+            'target': target,
+            'concept_name': concept_name,
+            'total_size': total_size,
+            'next_index': 0,
+            'started_at': time.time()
+        }
+        open(meta['part_path'], 'wb').close()
+        self._save(meta)
+        return meta
+
+    def offset(self, meta):
+        try:
+            return os.path.getsize(meta['part_path'])
+        except OSError:
+            return 0
+
+    def append(self, meta, index, offset, stream, length, piece_size=256 * 1024):
+        """Append one chunk. Returns (status, current offset); status is 'ok', 'duplicate' or 'conflict'."""
+        current = self.offset(meta)
+        if index < meta['next_index'] and offset + length <= current:
+            return 'duplicate', current  # retried after a lost response; already on disk
+        if index != meta['next_index'] or offset != current:
+            return 'conflict', current
+
+        remaining = length
+        with open(meta['part_path'], 'ab') as f:
+            while remaining > 0:
+                piece = stream.read(min(piece_size, remaining))
+                if not piece:
+                    break
+                f.write(piece)
+                remaining -= len(piece)
+        if remaining:
+            # Connection dropped mid-chunk: keep what arrived, the client resumes from the new offset
+            return 'conflict', self.offset(meta)
+
+        meta['next_index'] = index + 1
+        self._save(meta)
+        return 'ok', current + length
+
+    def finalize(self, meta, expected_sha256):
+        """Verify the checksum and move the .part file into place.
+
+        Returns (final path, sha256, newly finalized); the path is None on a checksum
+        mismatch. Finalizing is idempotent: a retry after a lost response gets the
+        same result again instead of an error. Call with lock_for(upload_id) held.
+        """
+        done = meta.get('finalized')
+        if done:
+            if expected_sha256 and done['sha256'] != expected_sha256.lower():
+                return None, done['sha256'], False
+            return done['file_path'], done['sha256'], False
+
+        digest = hashlib.sha256()
+        with open(meta['part_path'], 'rb') as f:
+            for piece in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(piece)
+        actual = digest.hexdigest()
+        if expected_sha256 and actual != expected_sha256.lower():
+            return None, actual, False
+
+        final_path = meta['target_path']
+        if os.path.exists(final_path):
+            root, ext = os.path.splitext(final_path)
+            final_path = f"{root}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}"
+        # The upload folder may be on another filesystem, so the move can be a copy; land it
+        # under .part (skipped by exports) and rename, so the target never appears half written.
+        temp_path = final_path + '.part'
+        try:
+            shutil.move(meta['part_path'], temp_path)
+            os.replace(temp_path, final_path)
+        except Exception:
+            if os.path.exists(temp_path) and os.path.exists(meta['part_path']):
+                os.remove(temp_path)
+            raise
+        meta['finalized'] = {'file_path': final_path, 'sha256': actual, 'file_size': os.path.getsize(final_path)}
+        self._save(meta)
+        return final_path, actual, True
+
+    def discard(self, upload_id):
+        try:
+            os.remove(self._meta_path(upload_id))
+        except OSError:
+            pass
+        with self._lock:
+            self._upload_locks.pop(upload_id, None)
+
+    def expire(self):
+        """Drop uploads started more than ttl_seconds ago, and part files no upload owns.
+
+        Finalized uploads are remembered until then so a retried finalize still succeeds.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if name.endswith('.json'):
+                meta = self.load(name[:-5])
+                if meta and meta['started_at'] < cutoff:
+                    with self.lock_for(meta['upload_id']):
+                        if not meta.get('finalized'):
+                            try:
+                                os.remove(meta['part_path'])
+                            except OSError:
+                                pass
+                        self.discard(meta['upload_id'])
+            elif name.endswith(('.part', '.tmp')):
+                # Left behind by a crash between writing the part file and the metadata
+                upload_id = name.rsplit('.', 1)[0].split('.')[0]
+                try:
+                    if not os.path.exists(self._meta_path(upload_id)) and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+resumable_uploads = ResumableUploads(RESUMABLE_UPLOAD_FOLDER, RESUMABLE_UPLOAD_TTL_SECONDS)
+
+def resumable_upload_status(meta):
+    done = meta.get('finalized')
+    return {
+        'upload_id': meta['upload_id'],
+        'offset': done['file_size'] if done else resumable_uploads.offset(meta),
+        'next_index': meta['next_index'],
+        'total_size': meta['total_size'],
+        'max_chunk_bytes': RESUMABLE_CHUNK_MAX_BYTES,
+        'finalized': bool(done)
+    }
+
+@app.route('/resumable_upload', methods=['POST'])
+def start_resumable_upload():
+    """Start a chunked upload into the participant's folder or its Screen Recordings folder.
+
+    JSON body: filename, target ('screen_recordings' or 'participant'), optional
+    total_size and concept_name. Returns the upload_id and the offset to start at.
+    """
+    try:
+        participant_id = session.get('participant_id')
+        trial_type = session.get('trial_type')
+        if not participant_id or not trial_type:
+            return jsonify({'status': 'error', 'message': 'Participant ID or trial type not found in session'}), 400
+
+        data = request.get_json() or {}
+        filename = secure_filename(data.get('filename') or '')
+        if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in RESUMABLE_UPLOAD_EXTENSIONS:
+            return jsonify({'status': 'error', 'message': 'Invalid or unsupported file name'}), 400
+        target = data.get('target', 'screen_recordings')
+        folders = get_participant_folder(participant_id, trial_type)
+        if target == 'screen_recordings':
+            folder = folders['screen_recordings_folder']
+        elif target == 'participant':
+            folder = folders['participant_folder']
+        else:
+            return jsonify({'status': 'error', 'message': f"Unknown upload target '{target}'"}), 400
+        total_size = data.get('total_size')
+        if total_size is not None and (type(total_size) is not int or total_size < 0):
+            return jsonify({'status': 'error', 'message': 'total_size must be a non-negative integer'}), 400
+
+        meta = resumable_uploads.start(
+            os.path.join(folder, filename),
+            participant_id,
+            target,
+            total_size=total_size,
+            concept_name=data.get('concept_name')
+        )
+        return jsonify({'status': 'success', **resumable_upload_status(meta)})
+    except Exception as e:
+        print(f"Error starting resumable upload: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/resumable_upload/<upload_id>', methods=['GET'])
+def resumable_upload_info(upload_id):
+    """Report how much of an upload has arrived, so the client knows where to resume."""
+    meta = resumable_uploads.load(upload_id)
+    if not meta or meta['participant_id'] != session.get('participant_id'):
+        return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+    return jsonify({'status': 'success', **resumable_upload_status(meta)})
+
+@app.route('/resumable_upload/<upload_id>/chunk/<int:index>', methods=['PUT'])
+def upload_resumable_chunk(upload_id, index):
+    """Append one chunk (raw request body) at the byte offset given by ?offset=."""
+    meta = resumable_uploads.load(upload_id)
+    if not meta or meta['participant_id'] != session.get('participant_id'):
+        return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+
+    offset = request.args.get('offset', type=int)
+    length = request.content_length
+    if offset is None or length is None:
+        return jsonify({'status': 'error', 'message': 'offset and Content-Length are required'}), 400
+    if length > RESUMABLE_CHUNK_MAX_BYTES:
+        return jsonify({'status': 'error', 'message': f'Chunks are limited to {RESUMABLE_CHUNK_MAX_BYTES} bytes'}), 413
+
+    try:
+        with resumable_uploads.lock_for(upload_id):
+            meta = resumable_uploads.load(upload_id)
+            if not meta:
+                return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+            if meta.get('finalized'):
+                return jsonify({'status': 'error', 'message': 'Upload is already finalized',
+                                **resumable_upload_status(meta)}), 409
+            if meta['total_size'] is not None and offset + length > meta['total_size']:
+                return jsonify({'status': 'error', 'message': 'Chunk extends past total_size',
+                                **resumable_upload_status(meta)}), 400
+            result, current = resumable_uploads.append(meta, index, offset, request.stream, length)
+            status = resumable_upload_status(meta)
+        if result == 'conflict':
+            return jsonify({'status': 'error', 'message': 'Offset mismatch; resume from the returned offset', **status}), 409
+        return jsonify({'status': 'success', 'duplicate': result == 'duplicate', **status})
+    except Exception as e:
+        print(f"Error writing upload chunk: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/resumable_upload/<upload_id>/finalize', methods=['POST'])
+def finalize_resumable_upload(upload_id):
+    """Check the SHA-256 of the assembled file and move it into place.
+
+    JSON body: sha256 (hex digest of the whole file). On mismatch the upload is kept
+    so the client can inspect the status and re-send. Repeating a successful finalize
+    returns the same result.
+    """
+    meta = resumable_uploads.load(upload_id)
+    if not meta or meta['participant_id'] != session.get('participant_id'):
+        return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+
+    data = request.get_json() or {}
+    expected = data.get('sha256')
+    if not expected:
+        return jsonify({'status': 'error', 'message': 'sha256 is required'}), 400
+
+    try:
+        with resumable_uploads.lock_for(upload_id):
+            # Re-read under the lock: a concurrent chunk or finalize may have changed it
+            meta = resumable_uploads.load(upload_id)
+            if not meta:
+                return jsonify({'status': 'error', 'message': 'Upload not found'}), 404
+            if (not meta.get('finalized') and meta['total_size'] is not None
+                    and resumable_uploads.offset(meta) != meta['total_size']):
+                return jsonify({'status': 'error', 'message': 'Upload is incomplete', **resumable_upload_status(meta)}), 409
+            final_path, actual, newly_finalized = resumable_uploads.finalize(meta, expected)
+        if not final_path:
+            return jsonify({'status': 'error', 'message': 'Checksum mismatch', 'sha256': actual, **resumable_upload_status(meta)}), 422
+
+        session_id = session.get('session_id')
+        if session_id and newly_finalized:
+            recording_type = 'screen_recording' if meta['target'] == 'screen_recordings' else 'user_upload'
+            background_work.submit(register_recording_file, final_path, session_id, recording_type, meta['concept_name'])
+
+        return jsonify({
+            'status': 'success',
+            'file_path': os.path.relpath(final_path, USER_AUDIO_FOLDER),
+            'file_size': meta['finalized']['file_size'],
+            'sha256': actual
+        })
+    except Exception as e:
+        print(f"Error finalizing upload: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 @app.route('/set_trial_type', methods=['POST'])
 def set_trial_type():
     """Set the trial type and participant ID for the session."""
@@ -1439,6 +3231,48 @@ def set_trial_type():
             "type": "server_error"
         }), 500
 
+FINALIZE_WAIT_SECONDS = float(os.environ.get('FINALIZE_WAIT_SECONDS', 0.5))
+
+def complete_session_record(session_id):
+    """Flush buffered rows and stamp the session's completed_at; returns the rows written."""
+    written = write_behind.flush()
+    if session_id and os.environ.get('DATABASE_URL'):
+        try:
+            session_record = Session.query.filter_by(session_id=session_id).first()
+            if session_record and not session_record.completed_at:
+                session_record.completed_at = datetime.utcnow()
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return written
+
+@app.route('/finalize_session', methods=['POST'])
+def finalize_session():
+    """Called by the client when the page closes: persist everything buffered for this session.
+
+    Waits at most FINALIZE_WAIT_SECONDS for queued bookkeeping so a slow queue never ties
+    up a worker; if jobs are still pending, finalizing is queued behind them and the
+    route answers 202.
+    """
+    try:
+        data = request.get_json(force=True, silent=True) or {}
+        session_id = data.get('session_id') or session.get('session_id')
+
+        if not background_work.wait_idle(timeout=FINALIZE_WAIT_SECONDS):
+            background_work.submit(complete_session_record, session_id)
+            return jsonify({'status': 'accepted'}), 202
+
+        written = complete_session_record(session_id)
+        return jsonify({'status': 'success', 'rows_written': written})
+    except Exception as e:
+        print(f"Error in finalize_session: {str(e)}")
+        try:
+            db.session.rollback()
+        except:
+            pass
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 def cleanup_recordings():
     """Cleanup function called when server shuts down."""
     try:
@@ -1465,6 +3299,7 @@ def cleanup_recordings():
 atexit.register(cleanup_recordings)
 
 def handle_sigterm(signum, frame):
+    flush_pending_writes()
     cleanup_recordings()
     exit(0)
 
@@ -1494,6 +3329,565 @@ def backup_to_cloud():
 
 # =========================== DATA EXPORT FUNCTIONALITY ===========================
 
+class ZipStreamBuffer:
+    """Write-only file object that collects zipfile output until the response generator drains it.
+
+    It has no seek(), so zipfile writes entries with data descriptors and the archive can
+    be sent while it is still being built.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def stream_zip(build_entries):
+    """Yield a ZIP archive piece by piece.
+
+    `build_entries(zip_file)` is a generator that writes entries and yields whenever
+    the bytes produced so far can be sent to the client.
+    """
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for _ in build_entries(zip_file):
+            data = buffer.drain()
+            if data:
+                yield data
+    data = buffer.drain()
+    if data:
+        yield data
+
+def write_csv_entry(zip_file, arcname, header, rows, skip_empty=True, flush_every=500):
+    """Stream CSV rows into a ZIP entry, yielding every `flush_every` rows."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None and skip_empty:
+        return
+    with zip_file.open(arcname, 'w', force_zip64=True) as entry, \
+            io.TextIOWrapper(entry, encoding='utf-8', newline='') as text:
+        writer = csv.writer(text)
+        writer.writerow(header)
+        if first is not None:
+            writer.writerow(first)
+        for n, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if n % flush_every == 0:
+                text.flush()
+                yield
+    yield
+
+# Media is already compressed, so only text-like files are worth deflating
+DEFLATE_EXTENSIONS = {'.txt', '.csv', '.json', '.log'}
+PREFETCH_MAX_FILE_BYTES = 8 * 1024 * 1024
+
+def zip_compression_for(path):
+    ext = os.path.splitext(path)[1].lower()
+    return zipfile.ZIP_DEFLATED if ext in DEFLATE_EXTENSIONS else zipfile.ZIP_STORED
+
+def write_file_entry(zip_file, file_path, arcname, data=None, chunk_size=1024 * 1024):
+    """Copy a file into a ZIP entry in chunks, yielding after each one.
+
+    `data` may hold the file's contents if it was already read by prefetch_files().
+    """
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+    zinfo.compress_type = zip_compression_for(file_path)
+    with zip_file.open(zinfo, 'w') as dest:
+        if data is not None:
+            for offset in range(0, len(data), chunk_size):
+                dest.write(data[offset:offset + chunk_size])
+                yield
+            return
+        with open(file_path, 'rb') as src:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                dest.write(chunk)
+                yield
+
+def prefetch_files(entries, max_workers=4, lookahead=8):
+    """Yield (file_path, arcname, data) in order while a thread pool reads the next files.
+
+    Files above PREFETCH_MAX_FILE_BYTES come back with data=None and are streamed from
+    disk by the writer, so at most `lookahead` small files are held in memory.
+    """
+    def read_small(file_path):
+        try:
+            if os.path.getsize(file_path) <= PREFETCH_MAX_FILE_BYTES:
+                with open(file_path, 'rb') as f:
+                    return f.read()
+        except OSError:
+            pass
+        return None
+
+    pending = []
+    entries = iter(entries)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export-read') as pool:
+        for file_path, arcname in entries:
+            pending.append((file_path, arcname, pool.submit(read_small, file_path)))
+            if len(pending) >= lookahead:
+                file_path, arcname, future = pending.pop(0)
+                yield file_path, arcname, future.result()
+        for file_path, arcname, future in pending:
+            yield file_path, arcname, future.result()
+
+ESTIMATE_SAMPLE_BYTES = 1024 * 1024
+
+def estimate_zip_export(entries, sample_bytes=ESTIMATE_SAMPLE_BYTES):
+    """Predict file count and archive size for a streamed export without building it.
+
+    Sizes come from the filesystem. Deflated entries are sized with the compression ratio
+    of a sample of at most `sample_bytes`, taken from the start of the text files, rather
+    than by compressing every one of them.
+    """
+    files = []
+    for file_path, arcname in entries:
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            continue
+        files.append((file_path, arcname, size, zip_compression_for(file_path) == zipfile.ZIP_DEFLATED))
+
+    sampled_in = 0
+    sampled_out = 0
+    for file_path, _, size, deflated in files:
+        if not deflated or sampled_in >= sample_bytes:
+            continue
+        try:
+            with open(file_path, 'rb') as f:
+                sample = f.read(min(size, sample_bytes - sampled_in, 64 * 1024))
+        except OSError:
+            continue
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        sampled_in += len(sample)
+        sampled_out += len(compressor.compress(sample)) + len(compressor.flush())
+    deflate_ratio = sampled_out / sampled_in if sampled_in else 1.0
+
+    input_bytes = 0
+    stored_bytes = 0
+    deflated_input_bytes = 0
+    deflated_output_bytes = 0
+    archive_bytes = 22  # end of central directory record
+    for file_path, arcname, size, deflated in files:
+        name_len = len(arcname.encode('utf-8'))
+        if deflated:
+            data_bytes = round(size * deflate_ratio)
+            deflated_input_bytes += size
+            deflated_output_bytes += data_bytes
+        else:
+            stored_bytes += size
+            data_bytes = size
+        zip64 = size >= zipfile.ZIP64_LIMIT
+        # local header + data descriptor + central directory entry
+        archive_bytes += data_bytes + (30 + name_len) + (24 if zip64 else 16) + (46 + name_len) + (28 if zip64 else 0)
+        input_bytes += size
+    return {
+        'file_count': len(files),
+        'input_bytes': input_bytes,
+        'stored_bytes': stored_bytes,
+        'deflated_input_bytes': deflated_input_bytes,
+        'deflated_output_bytes': deflated_output_bytes,
+        'estimated_archive_bytes': archive_bytes
+    }
+
+EXPORT_SNAPSHOT_FOLDER = os.path.join(UPLOAD_FOLDER, 'export_snapshots')
+# Rows younger than this are re-encoded on every export instead of being frozen into a
+# snapshot, so a transaction that commits a lower id late can't be skipped by the watermark.
+EXPORT_SNAPSHOT_SETTLE_SECONDS = int(os.environ.get('EXPORT_SNAPSHOT_SETTLE_SECONDS', 60))
+
+class ExportSnapshotStore:
+    """Already-encoded CSV rows for append-only tables, kept between exports.
+
+    Each source (a query over an append-only table) has a watermark: the highest row id
+    already encoded. An export only encodes rows above the watermark, appends the settled
+    ones to the source's segment files and re-encodes just the unsettled tail. Next to
+    each segment is an index of (time, id, offset, length) records, so a sheet can also
+    be read back newest first. The state file records every file's length, so a crash
+    mid-append is truncated away on load.
+
+    Segment files are only ever appended to. When a source has to be rebuilt (its table
+    was wiped or restored) it moves on to a new generation of files, and the old ones are
+    kept for RETIRED_GRACE_SECONDS so exports still streaming them can finish.
+    """
+
+    FORMAT_VERSION = 1
+    RETIRED_GRACE_SECONDS = 3600
+    INDEX_RECORD = struct.Struct('<dqqI')  # sort time, row id, byte offset, byte length
+
+    def __init__(self, folder, settle_seconds):
+        self.folder = folder
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        self._state_path = os.path.join(folder, 'state.json')
+        self._state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self._state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') != self.FORMAT_VERSION:
+                raise ValueError('snapshot format changed')
+        except Exception:
+            state = {'version': self.FORMAT_VERSION, 'sources': {}, 'retired': []}
+            # Segment files from an unreadable or older state can't be trusted
+            for filename in os.listdir(self.folder):
+                if filename.endswith(('.csv', '.idx')):
+                    os.remove(os.path.join(self.folder, filename))
+        for source in state['sources'].values():
+            for segment in source['segments'].values():
+                for key, length_key in (('file', 'bytes'), ('index', 'index_bytes')):
+                    path = os.path.join(self.folder, segment[key])
+                    if os.path.exists(path) and os.path.getsize(path) > segment[length_key]:
+                        with open(path, 'r+b') as f:
+                            f.truncate(segment[length_key])
+        return state
+
+    def _save_state(self):
+        temp_path = self._state_path + '.part'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._state, f)
+        os.replace(temp_path, self._state_path)
+
+    def _reset_source(self, name):
+        """Start `name` over on a new generation of files, retiring the current ones."""
+        source = self._state['sources'].pop(name, None)
+        generation = 1
+        if source:
+            generation = source['generation'] + 1
+            for segment in source['segments'].values():
+                self._state['retired'].append({
+                    'files': [segment['file'], segment['index']],
+                    'retired_at': time.time()
+                })
+        self._state['sources'][name] = {'watermark': 0, 'generation': generation, 'segments': {}}
+        return self._state['sources'][name]
+
+    def _purge_retired(self):
+        cutoff = time.time() - self.RETIRED_GRACE_SECONDS
+        keep = []
+        for retired in self._state['retired']:
+            if retired['retired_at'] > cutoff:
+                keep.append(retired)
+                continue
+            for filename in retired['files']:
+                path = os.path.join(self.folder, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+        self._state['retired'] = keep
+
+    @staticmethod
+    def sort_time(value):
+        """Seconds since the epoch for ordering; rows without a time sort as newest."""
+        if value is None:
+            return float('inf')
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+
+    def catch_up(self, name, query, id_column, time_column, encode, max_id):
+        """Encode rows above the watermark and return a view {segment: segment_view}.
+
+        `encode(row)` yields (segment, csv_row) pairs for a row of `query`; `max_id` is the
+        table's current highest id, used to notice a wiped or restored database. A segment
+        view holds the segment and index files with the lengths valid for this export, plus
+        the freshly encoded tail rows as (sort_time, id, csv_row). The files are only
+        appended to, so the view stays consistent even if a concurrent export moves the
+        watermark on, and retired files outlive any export still reading them.
+        """
+        with self._lock:
+            self._purge_retired()
+            source = self._state['sources'].get(name)
+            if source is None or (max_id or 0) < source['watermark']:
+                source = self._reset_source(name)
+
+            cutoff = datetime.utcnow() - timedelta(seconds=self.settle_seconds)
+            tail = {}
+            settled = {}
+            watermark = source['watermark']
+            in_tail = False
+            new_rows = (
+                query.add_columns(id_column, time_column)
+                .filter(id_column > source['watermark'])
+                .order_by(id_column)
+                .yield_per(1000)
+            )
+            for row in new_rows:
+                row_id, row_time = row[-2], row[-1]
+                in_tail = in_tail or row_time is None or row_time > cutoff
+                sort_time = self.sort_time(row_time)
+                for segment, csv_row in encode(row):
+                    (tail if in_tail else settled).setdefault(segment, []).append((sort_time, row_id, csv_row))
+                if not in_tail:
+                    watermark = row_id
+                if sum(len(rows) for rows in settled.values()) >= 5000:
+                    self._append(name, source, settled)
+                    settled = {}
+            self._append(name, source, settled)
+            source['watermark'] = watermark
+            self._save_state()
+            view = {
+                segment: {
+                    'path': os.path.join(self.folder, info['file']),
+                    'bytes': info['bytes'],
+                    'index_path': os.path.join(self.folder, info['index']),
+                    'index_bytes': info['index_bytes'],
+                    'tail': []
+                }
+                for segment, info in source['segments'].items()
+            }
+            for segment, rows in tail.items():
+                view.setdefault(segment, {'path': None, 'bytes': 0, 'index_path': None, 'index_bytes': 0})
+                view[segment]['tail'] = rows
+            return view
+
+    def _append(self, name, source, rows_by_segment):
+        for segment, rows in rows_by_segment.items():
+            info = source['segments'].get(segment)
+            if info is None:
+                # Sources reuse segment names ('rows'), so files are keyed on both
+                digest = hashlib.sha256(f"{name}\0{segment}".encode('utf-8')).hexdigest()[:16]
+                base = f"{digest}-g{source['generation']}"
+                info = source['segments'][segment] = {
+                    'file': f"{base}.csv", 'bytes': 0, 'index': f"{base}.idx", 'index_bytes': 0
+                }
+            data = bytearray()
+            index = bytearray()
+            for sort_time, row_id, csv_row in rows:
+                encoded = encode_csv_rows([csv_row])
+                index += self.INDEX_RECORD.pack(sort_time, row_id, info['bytes'] + len(data), len(encoded))
+                data += encoded
+            with open(os.path.join(self.folder, info['file']), 'ab') as f:
+                f.write(data)
+            with open(os.path.join(self.folder, info['index']), 'ab') as f:
+                f.write(index)
+            info['bytes'] += len(data)
+            info['index_bytes'] += len(index)
+
+    @staticmethod
+    def iter_segment(view, chunk_size=1024 * 1024):
+        """Yield the segment's bytes in row id order, then its tail rows."""
+        if view['path'] and view['bytes']:
+            with open(view['path'], 'rb') as f:
+                remaining = view['bytes']
+                while remaining > 0:
+                    chunk = f.read(min(chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+        if view['tail']:
+            yield encode_csv_rows([csv_row for _, _, csv_row in view['tail']])
+
+    @classmethod
+    def iter_segment_newest_first(cls, view, chunk_size=1024 * 1024):
+        """Yield the segment's rows and tail rows ordered by (time, id), newest first."""
+        index = b''
+        if view['index_path'] and view['index_bytes']:
+            with open(view['index_path'], 'rb') as f:
+                index = f.read(view['index_bytes'])
+        record_size = cls.INDEX_RECORD.size
+        count = len(index) // record_size
+
+        def records_newest_first():
+            # Rows are appended in id order, which is nearly always time order too; then
+            # the index can simply be walked backwards instead of being sorted.
+            previous = None
+            in_order = True
+            for record in cls.INDEX_RECORD.iter_unpack(index):
+                if previous is not None and record[:2] < previous:
+                    in_order = False
+                    break
+                previous = record[:2]
+            if in_order:
+                for n in range(count - 1, -1, -1):
+                    yield cls.INDEX_RECORD.unpack_from(index, n * record_size)
+            else:
+                yield from sorted(cls.INDEX_RECORD.iter_unpack(index), reverse=True)
+
+        def segment_rows():
+            if not count:
+                return
+            with open(view['path'], 'rb') as f:
+                for sort_time, row_id, offset, length in records_newest_first():
+                    f.seek(offset)
+                    yield sort_time, row_id, f.read(length)
+
+        tail_rows = sorted(
+            ((sort_time, row_id, encode_csv_rows([csv_row])) for sort_time, row_id, csv_row in view['tail']),
+            reverse=True
+        )
+        buffer = bytearray()
+        for _, _, data in heapq.merge(segment_rows(), tail_rows, key=lambda row: row[:2], reverse=True):
+            buffer += data
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+def encode_csv_rows(rows):
+    text = io.StringIO()
+    csv.writer(text).writerows(rows)
+    return text.getvalue().encode('utf-8')
+
+export_snapshots = ExportSnapshotStore(EXPORT_SNAPSHOT_FOLDER, EXPORT_SNAPSHOT_SETTLE_SECONDS)
+
+EMPTY_SNAPSHOT_SEGMENT = {'path': None, 'bytes': 0, 'index_path': None, 'index_bytes': 0, 'tail': []}
+
+def write_snapshot_entry(zip_file, arcname, header, snapshot, segment, newest_first=False):
+    """Write a CSV entry from a snapshot segment plus its freshly encoded tail rows.
+
+    Rows come out in id order, or ordered by time, newest first, with `newest_first`.
+    """
+    view = snapshot.get(segment, EMPTY_SNAPSHOT_SEGMENT)
+    chunks = (ExportSnapshotStore.iter_segment_newest_first(view) if newest_first
+              else ExportSnapshotStore.iter_segment(view))
+    with zip_file.open(arcname, 'w', force_zip64=True) as entry:
+        entry.write(encode_csv_rows([header]))
+        for chunk in chunks:
+            entry.write(chunk)
+            yield
+    yield
+
+def table_digest(model):
+    """sha256 over every column of every row, for the small tables whose rows are updated."""
+    digest = hashlib.sha256()
+    columns = list(model.__table__.columns)
+    for row in db.session.query(*columns).order_by(model.id).yield_per(1000):
+        digest.update(json.dumps(list(row), default=str).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+def export_fingerprint(kind):
+    """ETag for an export: changes whenever any exported table gains, loses or updates rows.
+
+    Participants and sessions are edited in place, so every column of them is hashed;
+    the append-only tables are summarised by row count and highest id.
+    """
+    parts = [kind, ExportSnapshotStore.FORMAT_VERSION, table_digest(Participant), table_digest(Session)]
+    for model in (Interaction, Recording, UserEvent):
+        parts += db.session.query(func.count(model.id), func.max(model.id)).one()
+    return hashlib.sha256(json.dumps(parts, default=str).encode('utf-8')).hexdigest()[:32]
+
+def not_modified_or(etag, build_response):
+    """Answer 304 when the client already has this export, else attach the ETag."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = build_response()
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+COLUMNAR_BATCH_ROWS = 10000
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+HIVE_NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+def write_columnar_table(zip_file, name, rows, schema, time_field, fmt,
+                         derive=None, partition_by_concept=False, batch_rows=COLUMNAR_BATCH_ROWS):
+    """Write `rows` (tuples in `schema` order) as hive-partitioned Parquet/Arrow files.
+
+    Rows are converted in batches of `batch_rows` and `derive(table)` can add computed
+    columns with Arrow kernels. Files land under `<name>/[concept_name=...]/date=.../`;
+    the partition values live in the directory names, not in the files. Rows should
+    arrive ordered by partition so only one partition file is open at a time.
+    """
+    extension = COLUMNAR_FORMATS[fmt]
+    part_counts = {}
+    rows = iter(rows)
+
+    with tempfile.TemporaryDirectory(prefix='columnar_export_') as workdir:
+        current = None  # (partition key, writer, temp path, arcname)
+
+        def open_partition(key, partition_schema):
+            concept, day = key
+            directories = [name]
+            if partition_by_concept:
+                directories.append('concept_name=' + (quote(concept, safe='') if concept else HIVE_NULL_PARTITION))
+            directories.append('date=' + (day or HIVE_NULL_PARTITION))
+            directory = '/'.join(directories)
+            part = part_counts[directory] = part_counts.get(directory, -1) + 1
+            temp_path = os.path.join(workdir, f"part{extension}")
+            if fmt == 'parquet':
+                writer = pq.ParquetWriter(temp_path, partition_schema)
+            else:
+                writer = pa.ipc.new_file(temp_path, partition_schema)
+            return key, writer, temp_path, f"{directory}/part-{part:05d}{extension}"
+
+        def finish_partition(partition):
+            if partition is None:
+                return
+            _, writer, temp_path, arcname = partition
+            writer.close()
+            yield from write_file_entry(zip_file, temp_path, arcname)
+            os.remove(temp_path)
+
+        while True:
+            batch = list(islice(rows, batch_rows))
+            if not batch:
+                break
+            table = pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)],
+                schema=schema
+            )
+            if derive:
+                table = derive(table)
+
+            days = pc.strftime(table[time_field], format='%Y-%m-%d').to_pylist()
+            if partition_by_concept:
+                keys = list(zip(table['concept_name'].to_pylist(), days))
+                table = table.drop(['concept_name'])
+            else:
+                keys = [(None, day) for day in days]
+
+            offset = 0
+            for key, run in groupby(keys):
+                length = sum(1 for _ in run)
+                if current is None or current[0] != key:
+                    yield from finish_partition(current)
+                    current = open_partition(key, table.schema)
+                current[1].write_table(table.slice(offset, length))
+                offset += length
+            yield
+
+        yield from finish_partition(current)
+
+# A run of characters that Python's str.split() does not split on. RE2's \S is not
+# enough: its \s lacks \v, \x1c-\x1f and the Unicode spaces that str.isspace() accepts.
+PYTHON_WORD_PATTERN = '[^\t-\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+'
+
+def text_counts(table, column='message'):
+    """Add char_count and word_count for a text column (word_count matches len(str.split()))."""
+    text = table[column]
+    return (
+        table.append_column('char_count', pc.fill_null(pc.utf8_length(text), 0))
+        .append_column('word_count', pc.fill_null(pc.count_substring_regex(text, PYTHON_WORD_PATTERN), 0))
+    )
+
+def zip_response(build_entries, filename):
+    return Response(
+        stream_with_context(stream_zip(build_entries)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
 @app.route('/data_dashboard')
 def data_dashboard():
     """Display a simple dashboard for data export and management."""
@@ -1531,179 +3925,185 @@ def data_dashboard():
 
 @app.route('/export_research_data')
 def export_research_data():
-    """Export comprehensive research data including all interactions and analysis."""
+    """Export comprehensive research data including all interactions and analysis.
+
+    Every sheet comes from a fixed number of joined/grouped queries, so the query
+    count does not grow with the number of participants, sessions or interactions.
+    The archive is streamed as it is built and rows are read with server-side cursors.
+    Interaction sheets are served from snapshots, so only rows added since the previous
+    export are encoded. Unchanged data answers 304.
+    """
     try:
-        import zipfile
-        import csv
-        from io import StringIO, BytesIO
-        
-        zip_buffer = BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            
+        def interaction_counts():
+            return (
+                db.session.query(Interaction.session_id, func.count(Interaction.id).label('n'))
+                .group_by(Interaction.session_id)
+                .subquery()
+            )
+
+        def interactions_with_participant():
+            return (
+                db.session.query(Interaction, func.coalesce(Session.participant_id, 'Unknown'))
+                .outerjoin(Session, Session.session_id == Interaction.session_id)
+            )
+
+        def word_count(message):
+            return len(message.split()) if message else 0
+
+        def participant_rows():
+            counts = interaction_counts()
+            session_stats = {
+                participant_id: (sessions_count, total_interactions or 0)
+                for participant_id, sessions_count, total_interactions in db.session.query(
+                    Session.participant_id,
+                    func.count(Session.id),
+                    func.sum(counts.c.n)
+                )
+                .outerjoin(counts, counts.c.session_id == Session.session_id)
+                .group_by(Session.participant_id)
+            }
+            trial_types = {}
+            versions = {}
+            for participant_id, trial_type, version in db.session.query(
+                Session.participant_id, Session.trial_type, Session.version
+            ).distinct():
+                if trial_type:
+                    trial_types.setdefault(participant_id, set()).add(trial_type)
+                if version:
+                    versions.setdefault(participant_id, set()).add(version)
+
+            for p in Participant.query.order_by(Participant.id).yield_per(1000):
+                sessions_count, total_interactions = session_stats.get(p.participant_id, (0, 0))
+                yield [
+                    p.participant_id,
+                    p.created_at,
+                    sessions_count,
+                    total_interactions,
+                    '; '.join(sorted(trial_types.get(p.participant_id, ()))),
+                    '; '.join(sorted(versions.get(p.participant_id, ())))
+                ]
+
+        def session_rows():
+            counts = interaction_counts()
+            query = (
+                db.session.query(Session, func.coalesce(counts.c.n, 0))
+                .outerjoin(counts, counts.c.session_id == Session.session_id)
+                .order_by(Session.started_at.desc())
+            )
+            for s, interactions_count in query.yield_per(1000):
+                duration = None
+                if s.started_at and s.completed_at:
+                    duration = (s.completed_at - s.started_at).total_seconds() / 60
+                yield [
+                    s.session_id,
+                    s.participant_id,
+                    s.trial_type,
+                    s.version,
+                    s.started_at,
+                    s.completed_at,
+                    round(duration, 2) if duration else '',
+                    interactions_count
+                ]
+
+        def encode_interaction(row):
+            i, participant_id = row[0], row[1]
+            char_count = len(i.message) if i.message else 0
+            yield 'all', [
+                i.session_id,
+                participant_id,
+                i.timestamp,
+                i.speaker,
+                i.concept_name,
+                i.message,
+                i.attempt_number,
+                char_count,
+                word_count(i.message)
+            ]
+            if i.speaker == 'USER':
+                yield 'user', [
+                    participant_id,
+                    i.session_id,
+                    i.timestamp,
+                    i.concept_name,
+                    i.message,
+                    i.attempt_number,
+                    word_count(i.message)
+                ]
+                yield 'concept:' + (i.concept_name or ''), [
+                    participant_id,
+                    i.session_id,
+                    i.timestamp,
+                    i.message,
+                    i.attempt_number,
+                    word_count(i.message)
+                ]
+
+        def summary_rows():
+            total_participants = Participant.query.count()
+            total_sessions = Session.query.count()
+            total_interactions, user_interactions_count, ai_interactions_count = db.session.query(
+                func.count(Interaction.id),
+                func.coalesce(func.sum(case((Interaction.speaker == 'USER', 1), else_=0)), 0),
+                func.coalesce(func.sum(case((Interaction.speaker == 'AI', 1), else_=0)), 0)
+            ).one()
+
+            avg_interactions_per_session = total_interactions / total_sessions if total_sessions > 0 else 0
+            avg_sessions_per_participant = total_sessions / total_participants if total_participants > 0 else 0
+
+            yield ['Total Participants', total_participants]
+            yield ['Total Sessions', total_sessions]
+            yield ['Total Interactions', total_interactions]
+            yield ['User Explanations', user_interactions_count]
+            yield ['AI Responses', ai_interactions_count]
+            yield ['Avg Interactions per Session', round(avg_interactions_per_session, 2)]
+            yield ['Avg Sessions per Participant', round(avg_sessions_per_participant, 2)]
+
+        def build(zip_file):
             # 1. Detailed Participants Data
-            participants = Participant.query.all()
-            if participants:
-                csv_buffer = StringIO()
-                writer = csv.writer(csv_buffer)
-                writer.writerow(['Participant_ID', 'Created_At', 'Total_Sessions', 'Total_Interactions', 'Trial_Types', 'Versions_Used'])
-                
-                for p in participants:
-                    sessions = Session.query.filter_by(participant_id=p.participant_id).all()
-                    sessions_count = len(sessions)
-                    trial_types = list(set([s.trial_type for s in sessions if s.trial_type]))
-                    versions = list(set([s.version for s in sessions if s.version]))
-                    
-                    total_interactions = 0
-                    for s in sessions:
-                        interactions_count = Interaction.query.filter_by(session_id=s.session_id).count()
-                        total_interactions += interactions_count
-                    
-                    writer.writerow([
-                        p.participant_id, 
-                        p.created_at, 
-                        sessions_count, 
-                        total_interactions,
-                        '; '.join(trial_types),
-                        '; '.join(versions)
-                    ])
-                
-                zip_file.writestr('01_Participants_Summary.csv', csv_buffer.getvalue())
-            
+            yield from write_csv_entry(zip_file, '01_Participants_Summary.csv',
+                ['Participant_ID', 'Created_At', 'Total_Sessions', 'Total_Interactions', 'Trial_Types', 'Versions_Used'],
+                participant_rows())
+
             # 2. Detailed Sessions Data
-            sessions = Session.query.order_by(Session.started_at.desc()).all()
-            if sessions:
-                csv_buffer = StringIO()
-                writer = csv.writer(csv_buffer)
-                writer.writerow(['Session_ID', 'Participant_ID', 'Trial_Type', 'Version', 'Started_At', 'Ended_At', 'Duration_Minutes', 'Total_Interactions'])
-                
-                for s in sessions:
-                    interactions_count = Interaction.query.filter_by(session_id=s.session_id).count()
-                    duration = None
-                    if s.started_at and s.ended_at:
-                        duration = (s.ended_at - s.started_at).total_seconds() / 60
-                    
-                    writer.writerow([
-                        s.session_id,
-                        s.participant_id,
-                        s.trial_type,
-                        s.version,
-                        s.started_at,
-                        s.ended_at,
-                        round(duration, 2) if duration else '',
-                        interactions_count
-                    ])
-                
-                zip_file.writestr('02_Sessions_Detail.csv', csv_buffer.getvalue())
-            
+            yield from write_csv_entry(zip_file, '02_Sessions_Detail.csv',
+                ['Session_ID', 'Participant_ID', 'Trial_Type', 'Version', 'Started_At', 'Ended_At', 'Duration_Minutes', 'Total_Interactions'],
+                session_rows())
+
+            # 3-5. Interaction sheets: only rows added since the last export are encoded
+            snapshot = export_snapshots.catch_up(
+                'research_interactions',
+                interactions_with_participant(),
+                Interaction.id,
+                Interaction.timestamp,
+                encode_interaction,
+                db.session.query(func.max(Interaction.id)).scalar()
+            )
             # 3. All Interactions with Full Text
-            interactions = Interaction.query.order_by(Interaction.timestamp.desc()).all()
-            if interactions:
-                csv_buffer = StringIO()
-                writer = csv.writer(csv_buffer)
-                writer.writerow(['Session_ID', 'Participant_ID', 'Timestamp', 'Speaker', 'Concept_Name', 'Message_Text', 'Attempt_Number', 'Character_Count', 'Word_Count'])
-                
-                for i in interactions:
-                    session = Session.query.filter_by(session_id=i.session_id).first()
-                    participant_id = session.participant_id if session else 'Unknown'
-                    
-                    char_count = len(i.message) if i.message else 0
-                    word_count = len(i.message.split()) if i.message else 0
-                    
-                    writer.writerow([
-                        i.session_id,
-                        participant_id,
-                        i.timestamp,
-                        i.speaker,
-                        i.concept_name,
-                        i.message,
-                        i.attempt_number,
-                        char_count,
-                        word_count
-                    ])
-                
-                zip_file.writestr('03_All_Interactions.csv', csv_buffer.getvalue())
-            
+            if 'all' in snapshot:
+                yield from write_snapshot_entry(zip_file, '03_All_Interactions.csv',
+                    ['Session_ID', 'Participant_ID', 'Timestamp', 'Speaker', 'Concept_Name', 'Message_Text', 'Attempt_Number', 'Character_Count', 'Word_Count'],
+                    snapshot, 'all', newest_first=True)
+
             # 4. User Explanations Only (Research Gold)
-            user_interactions = Interaction.query.filter_by(speaker='USER').order_by(Interaction.timestamp.desc()).all()
-            if user_interactions:
-                csv_buffer = StringIO()
-                writer = csv.writer(csv_buffer)
-                writer.writerow(['Participant_ID', 'Session_ID', 'Timestamp', 'Concept_Name', 'User_Explanation', 'Attempt_Number', 'Word_Count'])
-                
-                for i in user_interactions:
-                    session = Session.query.filter_by(session_id=i.session_id).first()
-                    participant_id = session.participant_id if session else 'Unknown'
-                    word_count = len(i.message.split()) if i.message else 0
-                    
-                    writer.writerow([
-                        participant_id,
-                        i.session_id,
-                        i.timestamp,
-                        i.concept_name,
-                        i.message,
-                        i.attempt_number,
-                        word_count
-                    ])
-                
-                zip_file.writestr('04_User_Explanations_RESEARCH_DATA.csv', csv_buffer.getvalue())
-            
-            # 5. Concept-wise Analysis
-            concepts = ['Correlation', 'Confounders', 'Moderators']
-            for concept in concepts:
-                concept_interactions = Interaction.query.filter_by(concept_name=concept, speaker='USER').all()
-                if concept_interactions:
-                    csv_buffer = StringIO()
-                    writer = csv.writer(csv_buffer)
-                    writer.writerow(['Participant_ID', 'Session_ID', 'Timestamp', 'User_Explanation', 'Attempt_Number', 'Word_Count'])
-                    
-                    for i in concept_interactions:
-                        session = Session.query.filter_by(session_id=i.session_id).first()
-                        participant_id = session.participant_id if session else 'Unknown'
-                        word_count = len(i.message.split()) if i.message else 0
-                        
-                        writer.writerow([
-                            participant_id,
-                            i.session_id,
-                            i.timestamp,
-                            i.message,
-                            i.attempt_number,
-                            word_count
-                        ])
-                    
-                    zip_file.writestr(f'05_Concept_{concept}_Explanations.csv', csv_buffer.getvalue())
-        
+            if 'user' in snapshot:
+                yield from write_snapshot_entry(zip_file, '04_User_Explanations_RESEARCH_DATA.csv',
+                    ['Participant_ID', 'Session_ID', 'Timestamp', 'Concept_Name', 'User_Explanation', 'Attempt_Number', 'Word_Count'],
+                    snapshot, 'user', newest_first=True)
+
+            # 5. Concept-wise Analysis: one sheet per concept_name present in the data
+            for segment in sorted(seg for seg in snapshot if seg.startswith('concept:')):
+                concept_label = secure_filename(segment[len('concept:'):]) or 'Unknown'
+                yield from write_snapshot_entry(zip_file, f'05_Concept_{concept_label}_Explanations.csv',
+                    ['Participant_ID', 'Session_ID', 'Timestamp', 'User_Explanation', 'Attempt_Number', 'Word_Count'],
+                    snapshot, segment)
+
             # 6. Summary Statistics
-            csv_buffer = StringIO()
-            writer = csv.writer(csv_buffer)
-            writer.writerow(['Metric', 'Value'])
-            
-            total_participants = Participant.query.count()
-            total_sessions = Session.query.count()
-            total_interactions = Interaction.query.count()
-            user_interactions_count = Interaction.query.filter_by(speaker='USER').count()
-            ai_interactions_count = Interaction.query.filter_by(speaker='AI').count()
-            
-            avg_interactions_per_session = total_interactions / total_sessions if total_sessions > 0 else 0
-            avg_sessions_per_participant = total_sessions / total_participants if total_participants > 0 else 0
-            
-            writer.writerow(['Total Participants', total_participants])
-            writer.writerow(['Total Sessions', total_sessions])
-            writer.writerow(['Total Interactions', total_interactions])
-            writer.writerow(['User Explanations', user_interactions_count])
-            writer.writerow(['AI Responses', ai_interactions_count])
-            writer.writerow(['Avg Interactions per Session', round(avg_interactions_per_session, 2)])
-            writer.writerow(['Avg Sessions per Participant', round(avg_sessions_per_participant, 2)])
-            
-            zip_file.writestr('00_Research_Summary_Statistics.csv', csv_buffer.getvalue())
-        
-        zip_buffer.seek(0)
-        
-        from flask import Response
-        return Response(
-            zip_buffer.getvalue(),
-            mimetype='application/zip',
-            headers={'Content-Disposition': f'attachment; filename=HAI_V1_Research_Data_Complete_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'}
+            yield from write_csv_entry(zip_file, '00_Research_Summary_Statistics.csv',
+                ['Metric', 'Value'], summary_rows())
+
+        return not_modified_or(
+            export_fingerprint('research'),
+            lambda: zip_response(build, f'HAI_V1_Research_Data_Complete_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip')
         )
         
     except Exception as e:
@@ -1711,63 +4111,266 @@ def export_research_data():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-@app.route('/export_complete_data')
-def export_complete_data():
-    """Export all available user/AI audio, screen recordings, and logs as a ZIP. No CSV/Excel/database fallback."""
+@app.route('/export_csv')
+def export_csv():
+    """Export every database table as a CSV file in a ZIP.
+
+    Participants and sessions are small and can change (completed_at), so they are
+    re-encoded each time; the append-only tables come from incremental snapshots.
+    """
     try:
-        import zipfile
-        from io import BytesIO
-        from flask import Response
-        import os
-        from datetime import datetime
+        def model_columns(model):
+            return [column.name for column in model.__table__.columns]
+
+        def table_rows(model):
+            columns = model_columns(model)
+            for record in model.query.order_by(model.id).yield_per(1000):
+                yield [getattr(record, column) for column in columns]
+
+        def build(zip_file):
+            for model in (Participant, Session):
+                yield from write_csv_entry(zip_file, f'{model.__tablename__}.csv',
+                    model_columns(model), table_rows(model), skip_empty=False)
+
+            for model, time_column in ((Interaction, Interaction.timestamp),
+                                       (Recording, Recording.created_at),
+                                       (UserEvent, UserEvent.timestamp)):
+                columns = model_columns(model)
+                def encode(row, columns=columns):
+                    yield 'rows', [getattr(row[0], column) for column in columns]
+
+                snapshot = export_snapshots.catch_up(
+                    f'table_{model.__tablename__}',
+                    db.session.query(model),
+                    model.id,
+                    time_column,
+                    encode,
+                    db.session.query(func.max(model.id)).scalar()
+                )
+                yield from write_snapshot_entry(zip_file, f'{model.__tablename__}.csv',
+                    columns, snapshot, 'rows')
+
+        return not_modified_or(
+            export_fingerprint('csv'),
+            lambda: zip_response(build, f'HAI_V1_Database_CSV_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip')
+        )
+    except Exception as e:
+        print(f"CSV export error: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
 
-        zip_buffer = BytesIO()
-        files_found = False
 
+@app.route('/export_columnar')
+def export_columnar():
+    """Export the interaction, session, recording and user-event tables as typed columnar files.
+
+    `?format=parquet` (default) or `?format=arrow` for Arrow IPC. Interactions and
+    recordings are partitioned by concept_name and day, sessions and user events by day,
+    so `pyarrow.dataset` / `pandas.read_parquet` can prune partitions.
+    """
+    if pa is None:
+        return jsonify({'status': 'error', 'message': 'Columnar export requires pyarrow to be installed.'}), 501
+
+    fmt = request.args.get('format', 'parquet').lower()
+    if fmt not in COLUMNAR_FORMATS:
+        return jsonify({'status': 'error', 'message': f"Unsupported format '{fmt}'. Use one of: {', '.join(COLUMNAR_FORMATS)}."}), 400
+
+    try:
+        timestamp = pa.timestamp('us')
+
+        def interaction_rows():
+            return (
+                db.session.query(
+                    Interaction.id, Interaction.session_id, Session.participant_id, Interaction.speaker,
+                    Interaction.concept_name, Interaction.message, Interaction.attempt_number, Interaction.timestamp
+                )
+                .outerjoin(Session, Session.session_id == Interaction.session_id)
+                .order_by(Interaction.concept_name, Interaction.timestamp, Interaction.id)
+                .yield_per(COLUMNAR_BATCH_ROWS)
+            )
+
+        def session_rows():
+            return (
+                db.session.query(
+                    Session.id, Session.session_id, Session.participant_id, Session.trial_type,
+                    Session.version, Session.started_at, Session.completed_at
+                )
+                .order_by(Session.started_at, Session.id)
+                .yield_per(COLUMNAR_BATCH_ROWS)
+            )
+
+        def recording_rows():
+            return (
+                db.session.query(
+                    Recording.id, Recording.session_id, Recording.recording_type, Recording.file_path,
+                    Recording.original_filename, Recording.file_size, Recording.concept_name,
+                    Recording.attempt_number, Recording.created_at
+                )
+                .order_by(Recording.concept_name, Recording.created_at, Recording.id)
+                .yield_per(COLUMNAR_BATCH_ROWS)
+            )
+
+        def user_event_rows():
+            query = (
+                db.session.query(UserEvent.id, UserEvent.session_id, UserEvent.event_type, UserEvent.event_data, UserEvent.timestamp)
+                .order_by(UserEvent.timestamp, UserEvent.id)
+                .yield_per(COLUMNAR_BATCH_ROWS)
+            )
+            for event_id, session_id, event_type, event_data, event_time in query:
+                yield event_id, session_id, event_type, json.dumps(event_data) if event_data is not None else None, event_time
+
+        def session_durations(table):
+            elapsed = pc.subtract(table['completed_at'], table['started_at'])
+            seconds = pc.divide(pc.cast(pc.cast(elapsed, pa.int64()), pa.float64()), 1e6)
+            return table.append_column('duration_seconds', seconds)
+
+        def build(zip_file):
+            yield from write_columnar_table(zip_file, 'interactions', interaction_rows(), pa.schema([
+                ('id', pa.int64()), ('session_id', pa.string()), ('participant_id', pa.string()),
+                ('speaker', pa.string()), ('concept_name', pa.string()), ('message', pa.string()),
+                ('attempt_number', pa.int32()), ('timestamp', timestamp)
+            ]), 'timestamp', fmt, derive=text_counts, partition_by_concept=True)
+
+            yield from write_columnar_table(zip_file, 'sessions', session_rows(), pa.schema([
+                ('id', pa.int64()), ('session_id', pa.string()), ('participant_id', pa.string()),
+                ('trial_type', pa.string()), ('version', pa.string()),
+                ('started_at', timestamp), ('completed_at', timestamp)
+            ]), 'started_at', fmt, derive=session_durations)
+
+            yield from write_columnar_table(zip_file, 'recordings', recording_rows(), pa.schema([
+                ('id', pa.int64()), ('session_id', pa.string()), ('recording_type', pa.string()),
+                ('file_path', pa.string()), ('original_filename', pa.string()), ('file_size', pa.int64()),
+                ('concept_name', pa.string()), ('attempt_number', pa.int32()), ('created_at', timestamp)
+            ]), 'created_at', fmt, partition_by_concept=True)
+
+            yield from write_columnar_table(zip_file, 'user_events', user_event_rows(), pa.schema([
+                ('id', pa.int64()), ('session_id', pa.string()), ('event_type', pa.string()),
+                ('event_data', pa.string()), ('timestamp', timestamp)
+            ]), 'timestamp', fmt)
+
+        return not_modified_or(
+            export_fingerprint(f'columnar:{fmt}'),
+            lambda: zip_response(build, f'HAI_V1_Columnar_{fmt}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip')
+        )
+    except Exception as e:
+        print(f"Columnar export error: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/export_complete_data')
+def export_complete_data():
+    """Export all available user/AI audio, screen recordings, and logs as a ZIP. No CSV/Excel/database fallback.
+
+    Files are streamed into the archive in chunks, so memory use stays flat regardless of export size.
+    Audio and video are stored as-is; only text logs and CSVs are deflated. Pass
+    ?dry_run=1 to get the file count and expected archive size instead of the download.
+    """
+    try:
         folders_to_export = [
             app.config.get('USER_AUDIO_FOLDER'),
             app.config.get('CONCEPT_AUDIO_FOLDER'),
         ]
+        log_path = os.path.join(app.config['UPLOAD_FOLDER'], 'conversation_log.txt')
 
-        user_audio_base = app.config.get('USER_AUDIO_FOLDER', '')
-
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        def export_files():
             for folder in folders_to_export:
                 if folder and os.path.exists(folder):
                     for root, dirs, files in os.walk(folder):
+                        dirs[:] = [d for d in dirs if d != TranscriptCache.FOLDER]  # STT cache, not research data
                         for file in files:
+                            if file.endswith('.part'):
+                                continue  # file still being written
                             file_path = os.path.join(root, file)
                             rel_path = os.path.relpath(file_path, app.config['UPLOAD_FOLDER'])
-                            archive_path = f"Exported_Data/{rel_path}"
-                            try:
-                                zip_file.write(file_path, archive_path)
-                                files_found = True
-                            except Exception as e:
-                                print(f"Could not add file {file_path}: {str(e)}")
-            log_path = os.path.join(app.config['UPLOAD_FOLDER'], 'conversation_log.txt')
+                            yield file_path, f"Exported_Data/{rel_path}"
             if os.path.exists(log_path):
-                zip_file.write(log_path, 'Exported_Data/conversation_log.txt')
-                files_found = True
-
-        zip_buffer.seek(0)
+                yield log_path, 'Exported_Data/conversation_log.txt'
 
-        if files_found and zip_buffer.getvalue():
-            filename_prefix = "HAI_V1_Files_Export"
-            return Response(
-                zip_buffer.getvalue(),
-                mimetype='application/zip',
-                headers={'Content-Disposition': f'attachment; filename={filename_prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'}
-            )
-        else:
+        if next(export_files(), None) is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data available for export. Please ensure participants have completed interactions.'
             }), 404
+
+        if request.args.get('dry_run', '').lower() in ('1', 'true', 'yes'):
+            return jsonify({'status': 'success', 'dry_run': True, **estimate_zip_export(export_files())})
+
+        def build(zip_file):
+            for file_path, archive_path, data in prefetch_files(export_files()):
+                try:
+                    yield from write_file_entry(zip_file, file_path, archive_path, data)
+                except Exception as e:
+                    print(f"Could not add file {file_path}: {str(e)}")
+
+        filename_prefix = "HAI_V1_Files_Export"
+        return zip_response(build, f'{filename_prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip')
     except Exception as e:
         print(f"Export error: {str(e)}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@app.route('/export_participant/<participant_id>')
+def export_participant(participant_id):
+    """Export one participant's database rows and User Data folder as a streamed ZIP.
+
+    Every query is keyed on the participant's sessions and served by an index, so the
+    cost depends on how much data this participant has, not on the size of the database.
+    """
+    if participant_id != os.path.basename(participant_id) or participant_id in ('.', '..'):
+        return jsonify({'status': 'error', 'message': 'Invalid participant ID'}), 400
+
+    try:
+        participant = Participant.query.filter_by(participant_id=participant_id).first()
+        participant_folder = os.path.join(app.config['USER_AUDIO_FOLDER'], participant_id)
+        if participant is None and not os.path.isdir(participant_folder):
+            return jsonify({'status': 'error', 'message': f'No data found for participant {participant_id}'}), 404
+
+        session_ids = db.session.query(Session.session_id).filter(Session.participant_id == participant_id)
+        prefix = f"Participant_{secure_filename(participant_id) or 'Unknown'}"
+
+        def model_columns(model):
+            return [column.name for column in model.__table__.columns]
+
+        def rows(model, query):
+            columns = model_columns(model)
+            for record in query.yield_per(1000):
+                yield [getattr(record, column) for column in columns]
+
+        def participant_files():
+            for root, dirs, files in os.walk(participant_folder):
+                dirs[:] = sorted(d for d in dirs if d != TranscriptCache.FOLDER)  # STT cache, not research data
+                for file in sorted(files):
+                    if file.endswith('.part'):
+                        continue  # file still being written
+                    file_path = os.path.join(root, file)
+                    rel_path = os.path.relpath(file_path, app.config['UPLOAD_FOLDER'])
+                    yield file_path, f"{prefix}/{rel_path}"
+
+        def build(zip_file):
+            yield from write_csv_entry(zip_file, f'{prefix}/database/sessions.csv', model_columns(Session),
+                rows(Session, Session.query.filter(Session.participant_id == participant_id)
+                     .order_by(Session.started_at)), skip_empty=False)
+            for model, time_column in ((Interaction, Interaction.timestamp),
+                                       (Recording, Recording.created_at),
+                                       (UserEvent, UserEvent.timestamp)):
+                query = (
+                    model.query.filter(model.session_id.in_(session_ids))
+                    .order_by(model.session_id, time_column)
+                )
+                yield from write_csv_entry(zip_file, f'{prefix}/database/{model.__tablename__}.csv',
+                    model_columns(model), rows(model, query), skip_empty=False)
+
+            for file_path, archive_path, data in prefetch_files(participant_files()):
+                try:
+                    yield from write_file_entry(zip_file, file_path, archive_path, data)
+                except Exception as e:
+                    print(f"Could not add file {file_path}: {str(e)}")
+
+        return zip_response(build, f'{prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip')
+    except Exception as e:
+        print(f"Participant export error: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 @app.route('/diagnose_uploads')
 def diagnose_uploads():
     """Return a JSON summary of upload folders and environment info for debugging."""
@@ -1810,83 +4413,80 @@ def diagnose_uploads():
 def export_latest_session():
     """Export only the most recent session data for each participant."""
     try:
-        import zipfile
-        import csv
-        from io import StringIO, BytesIO
-        
-        zip_buffer = BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            
-            latest_sessions = []
-            participants = Participant.query.all()
-            
-            for participant in participants:
-                latest_session = Session.query.filter_by(participant_id=participant.participant_id)\
-                                                .order_by(Session.started_at.desc()).first()
-                if latest_session:
-                    latest_sessions.append(latest_session)
-            
-            if latest_sessions:
-                csv_buffer = StringIO()
-                writer = csv.writer(csv_buffer)
-                writer.writerow([
-                    'Participant_ID', 'Session_ID', 'Trial_Type', 'Version',
-                    'Speaker', 'Concept_Name', 'Message', 'Attempt_Number', 
-                    'Interaction_Time', 'Session_Started'
-                ])
-                
-                for session in latest_sessions:
-                    interactions = Interaction.query.filter_by(session_id=session.session_id)\
-                                                      .order_by(Interaction.created_at.asc()).all()
-                    
-                    for interaction in interactions:
-                        writer.writerow([
-                            session.participant_id,
-                            interaction.session_id,
-                            session.trial_type,
-                            session.version,
-                            interaction.speaker,
-                            interaction.concept_name,
-                            interaction.message,
-                            interaction.attempt_number,
-                            interaction.created_at,
-                            session.started_at
-                        ])
-                
-                zip_file.writestr('Latest_Session_Interactions.csv', csv_buffer.getvalue())
-                
-                csv_buffer = StringIO()
-                writer = csv.writer(csv_buffer)
-                writer.writerow(['Participant_ID', 'Session_ID', 'Trial_Type', 'Version', 'Started_At', 'Total_Interactions'])
-                
-                for session in latest_sessions:
-                    interactions_count = Interaction.query.filter_by(session_id=session.session_id).count()
-                    writer.writerow([
-                        session.participant_id,
-                        session.session_id,
-                        session.trial_type,
-                        session.version,
-                        session.started_at,
-                        interactions_count
-                    ])
-                
-                zip_file.writestr('Latest_Sessions_Summary.csv', csv_buffer.getvalue())
-        
-        zip_buffer.seek(0)
-        
-        if zip_buffer.getvalue():
-            from flask import Response
-            return Response(
-                zip_buffer.getvalue(),
-                mimetype='application/zip',
-                headers={'Content-Disposition': f'attachment; filename=HAI_V1_Latest_Sessions_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'}
+        def latest_sessions():
+            latest = (
+                db.session.query(Session.participant_id, func.max(Session.started_at).label('started_at'))
+                .group_by(Session.participant_id)
+                .subquery()
             )
-        else:
+            return (
+                Session.query
+                .join(latest, (latest.c.participant_id == Session.participant_id) &
+                              (latest.c.started_at == Session.started_at))
+            )
+
+        if latest_sessions().first() is None:
             return jsonify({
                 'status': 'error', 
                 'message': 'No recent session data available for export.'
             }), 404
+
+        def interaction_rows():
+            latest = latest_sessions().subquery()
+            query = (
+                db.session.query(Interaction, latest.c.participant_id, latest.c.trial_type,
+                                 latest.c.version, latest.c.started_at)
+                .join(latest, latest.c.session_id == Interaction.session_id)
+                .order_by(latest.c.participant_id, Interaction.timestamp.asc())
+            )
+            for interaction, participant_id, trial_type, version, started_at in query.yield_per(1000):
+                yield [
+                    participant_id,
+                    interaction.session_id,
+                    trial_type,
+                    version,
+                    interaction.speaker,
+                    interaction.concept_name,
+                    interaction.message,
+                    interaction.attempt_number,
+                    interaction.timestamp,
+                    started_at
+                ]
+
+        def summary_rows():
+            counts = (
+                db.session.query(Interaction.session_id, func.count(Interaction.id).label('n'))
+                .group_by(Interaction.session_id)
+                .subquery()
+            )
+            query = (
+                latest_sessions()
+                .outerjoin(counts, counts.c.session_id == Session.session_id)
+                .add_columns(func.coalesce(counts.c.n, 0))
+                .order_by(Session.participant_id)
+            )
+            for session_record, interactions_count in query.yield_per(1000):
+                yield [
+                    session_record.participant_id,
+                    session_record.session_id,
+                    session_record.trial_type,
+                    session_record.version,
+                    session_record.started_at,
+                    interactions_count
+                ]
+
+        def build(zip_file):
+            yield from write_csv_entry(zip_file, 'Latest_Session_Interactions.csv', [
+                'Participant_ID', 'Session_ID', 'Trial_Type', 'Version',
+                'Speaker', 'Concept_Name', 'Message', 'Attempt_Number', 
+                'Interaction_Time', 'Session_Started'
+            ], interaction_rows(), skip_empty=False)
+
+            yield from write_csv_entry(zip_file, 'Latest_Sessions_Summary.csv',
+                ['Participant_ID', 'Session_ID', 'Trial_Type', 'Version', 'Started_At', 'Total_Interactions'],
+                summary_rows(), skip_empty=False)
+
+        return zip_response(build, f'HAI_V1_Latest_Sessions_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip')
             
     except Exception as e:
         print(f"Latest session export error: {str(e)}")
@@ -1992,6 +4592,18 @@ def diagnostic_filesystem():
             'error_type': type(e).__name__
         }), 500
 
+@app.cli.command('warm-tts')
+def warm_tts_command():
+    """Pre-render the fixed tutor prompts into the TTS cache (run at deploy time)."""
+    rendered = warm_tts_cache()
+    print(f"Cached {rendered} fixed tutor phrases in {TTS_CACHE_FOLDER}")
+
+if os.environ.get('TTS_WARMUP_ON_BOOT', '1') == '1':
+    threading.Thread(target=warm_tts_cache, name='tts-warmup', daemon=True).start()
+
+if os.environ.get('LOCAL_WHISPER_ENABLED', '1') == '1':
+    local_whisper.start()
+
 if __name__ == '__main__':
     startup_interaction_id = get_interaction_id()
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,182 @@
+"""Query-plan benchmark for the hot query shapes in app.py, before and after
+schema migration 1 (indexes).
+
+Seeds a database with about 1M interactions, drops the indexes, runs each hot
+query and prints its plan and timing, then applies the migration and repeats.
+
+Usage:
+    python benchmarks/bench_indexes.py                          # local SQLite file
+    python benchmarks/bench_indexes.py --database-url postgresql://...
+    python benchmarks/bench_indexes.py --interactions 200000 > bench_output.txt
+
+Point it at a scratch database: it drops and recreates every table.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import insert, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import db, Participant, Session, Interaction, Recording, SchemaMigration, SCHEMA_MIGRATIONS, run_migrations
+
+CONCEPTS = ['Correlation', 'Confounders', 'Moderators']
+
+HOT_QUERIES = [
+    ('interaction count per session (export, dashboard)',
+     'SELECT count(*) FROM interactions WHERE session_id = :session_id'),
+    ('session transcript in order',
+     'SELECT * FROM interactions WHERE session_id = :session_id ORDER BY timestamp'),
+    ('latest user explanations',
+     "SELECT * FROM interactions WHERE speaker = 'USER' ORDER BY timestamp DESC LIMIT 100"),
+    ('per-concept user explanations',
+     "SELECT * FROM interactions WHERE concept_name = :concept AND speaker = 'USER' ORDER BY timestamp DESC LIMIT 100"),
+    ('all interactions newest first',
+     'SELECT * FROM interactions ORDER BY timestamp DESC LIMIT 100'),
+    ('recent recordings (/list_recent_recordings)',
+     'SELECT * FROM recordings ORDER BY created_at DESC LIMIT 20'),
+    ('latest session per participant',
+     'SELECT * FROM sessions WHERE participant_id = :participant_id ORDER BY started_at DESC LIMIT 1'),
+    ('recent sessions (/data_dashboard)',
+     'SELECT * FROM sessions ORDER BY started_at DESC LIMIT 10'),
+]
+
+
+def seed(n_interactions, n_participants, batch_size=20000):
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    participants = [f"P{i:05d}" for i in range(n_participants)]
+    db.session.execute(insert(Participant), [{'participant_id': p, 'created_at': start} for p in participants])
+
+    sessions = []
+    for p in participants:
+        for trial in ('Trial_1', 'Trial_2'):
+            sessions.append({
+                'session_id': f"{p}_{trial}",
+                'participant_id': p,
+                'trial_type': trial,
+                'version': 'V1',
+                'started_at': start + timedelta(minutes=rng.randint(0, 500000))
+            })
+    db.session.execute(insert(Session), sessions)
+    db.session.commit()
+
+    session_ids = [s['session_id'] for s in sessions]
+    written = 0
+    while written < n_interactions:
+        rows = []
+        for _ in range(min(batch_size, n_interactions - written)):
+            rows.append({
+                'session_id': rng.choice(session_ids),
+                'speaker': rng.choice(('USER', 'AI', 'SYSTEM')),
+                'concept_name': rng.choice(CONCEPTS),
+                'message': 'Seeded interaction text for the index benchmark.',
+                'timestamp': start + timedelta(seconds=rng.randint(0, 30000000)),
+                'attempt_number': rng.randint(1, 3)
+            })
+        db.session.execute(insert(Interaction), rows)
+        db.session.commit()
+        written += len(rows)
+
+    recordings = [{
+        'session_id': rng.choice(session_ids),
+        'recording_type': rng.choice(('user_audio', 'ai_audio')),
+        'file_path': f"seed/{i}.mp3",
+        'created_at': start + timedelta(seconds=rng.randint(0, 30000000))
+    } for i in range(n_interactions // 4)]
+    db.session.execute(insert(Recording), recordings)
+    db.session.commit()
+    return session_ids, participants
+
+
+def drop_indexes():
+    for statement in SCHEMA_MIGRATIONS[0][2]:
+        name = statement.split('IF NOT EXISTS ')[1].split(' ')[0]
+        db.session.execute(text(f'DROP INDEX IF EXISTS {name}'))
+    db.session.query(SchemaMigration).delete()
+    db.session.commit()
+
+
+def explain(sql, params, dialect):
+    if dialect == 'postgresql':
+        rows = db.session.execute(text('EXPLAIN (ANALYZE, BUFFERS) ' + sql), params).fetchall()
+    else:
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql), params).fetchall()
+    return '\n'.join('      ' + ' | '.join(str(c) for c in row) for row in rows)
+
+
+def time_query(sql, params, repeat=5):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        db.session.execute(text(sql), params).fetchall()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_queries(label, params, dialect):
+    print(f"\n=== {label} ===")
+    timings = {}
+    for name, sql in HOT_QUERIES:
+        timings[name] = time_query(sql, params)
+        print(f"\n  {name}: {timings[name] * 1000:.2f} ms (best of 5)")
+        print(explain(sql, params, dialect))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default='sqlite:///' + os.path.abspath('bench_indexes.sqlite'))
+    parser.add_argument('--interactions', type=int, default=1000000)
+    parser.add_argument('--participants', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+    db.init_app(app)
+
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        db.drop_all()
+        db.create_all()
+        drop_indexes()
+
+        t0 = time.perf_counter()
+        session_ids, participants = seed(args.interactions, args.participants)
+        print(f"Seeded {args.interactions} interactions across {len(session_ids)} sessions "
+              f"on {dialect} in {time.perf_counter() - t0:.1f}s")
+
+        if dialect == 'postgresql':
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+
+        params = {
+            'session_id': session_ids[len(session_ids) // 2],
+            'participant_id': participants[len(participants) // 2],
+            'concept': CONCEPTS[1]
+        }
+
+        before = run_queries('BEFORE migration 1 (no secondary indexes)', params, dialect)
+
+        t0 = time.perf_counter()
+        run_migrations()
+        if dialect == 'postgresql':
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+        print(f"\nApplied migrations in {time.perf_counter() - t0:.1f}s")
+
+        after = run_queries('AFTER migration 1', params, dialect)
+
+        print('\n=== Summary (best of 5, ms) ===')
+        for name, _ in HOT_QUERIES:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            print(f"  {name:<52} {before[name] * 1000:>10.2f} {after[name] * 1000:>10.2f}  x{speedup:.1f}")
+
+
+if __name__ == '__main__':
+    main()
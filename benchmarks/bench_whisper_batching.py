@@ -0,0 +1,100 @@
+"""Throughput benchmark for micro-batched local Whisper decoding (whisper_worker.transcribe_batch).
+
+Transcribes the same set of clips at several batch sizes, in the worker process's
+own code path, and prints clips per second for each batch size against batch size 1.
+Batch size 1 is what every job cost before the workers batched.
+
+Usage:
+    python benchmarks/bench_whisper_batching.py                          # 16 synthetic 5 s clips, model "tiny"
+    python benchmarks/bench_whisper_batching.py --model small --batch-sizes 1,4,8
+    python benchmarks/bench_whisper_batching.py --clips recordings/*.mp3 > bench_output.txt
+
+Synthetic clips are tones, so the transcripts are meaningless; pass --clips with real
+recordings to also check the text. The model is downloaded on first use.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from whisper_worker import transcribe_batch
+
+
+def synthetic_clips(folder, count, seconds):
+    paths = []
+    for i in range(count):
+        t = np.arange(int(16000 * seconds)) / 16000
+        samples = 0.3 * np.sin(2 * np.pi * (200 + 40 * i) * t) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        path = os.path.join(folder, f'clip{i:03d}.wav')
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes((samples * 32767).astype('<i2').tobytes())
+        paths.append(path)
+    return paths
+
+
+def run(whisper, model, paths, batch_size, options):
+    """Transcribe every clip in batches of batch_size; returns (seconds, results)."""
+    jobs = [{'path': path, 'options': options} for path in paths]
+    results = []
+    started = time.perf_counter()
+    for start in range(0, len(jobs), batch_size):
+        results.extend(transcribe_batch(whisper, model, jobs[start:start + batch_size]))
+    return time.perf_counter() - started, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='tiny')
+    parser.add_argument('--clips', nargs='*', help='audio files to transcribe (default: synthetic tones)')
+    parser.add_argument('--count', type=int, default=16, help='number of synthetic clips')
+    parser.add_argument('--seconds', type=float, default=5.0, help='length of each synthetic clip')
+    parser.add_argument('--batch-sizes', default='1,2,4,8')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--language', default='en', help="fixed language, or '' to detect per clip")
+    args = parser.parse_args()
+
+    import torch
+    import whisper
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+    options = {'language': args.language} if args.language else {}
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = args.clips or synthetic_clips(folder, args.count, args.seconds)
+        t0 = time.perf_counter()
+        model = whisper.load_model(args.model)
+        print(f"Loaded {args.model} on {model.device} in {time.perf_counter() - t0:.1f}s "
+              f"({torch.get_num_threads()} CPU threads); {len(paths)} clips")
+
+        run(whisper, model, paths[:2], 2, options)  # warm-up
+        timings = {}
+        reference = None
+        for batch_size in batch_sizes:
+            best = float('inf')
+            for _ in range(args.repeat):
+                seconds, results = run(whisper, model, paths, batch_size, options)
+                best = min(best, seconds)
+            texts = [result.get('text', result.get('error')) for result in results]
+            if reference is None:
+                reference = texts
+            changed = sum(text != ref for text, ref in zip(texts, reference))
+            timings[batch_size] = best
+            print(f"  batch {batch_size:>3}: {best:8.2f}s  {len(paths) / best:6.2f} clips/s  "
+                  f"{changed} transcript(s) differ from batch {batch_sizes[0]}")
+
+        base = timings[batch_sizes[0]]
+        print(f"\n=== Summary (best of {args.repeat}) ===")
+        for batch_size in batch_sizes:
+            print(f"  batch {batch_size:>3}  x{base / timings[batch_size]:.2f} throughput")
+
+
+if __name__ == '__main__':
+    main()
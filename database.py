@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 from datetime import datetime
 import json
 
@@ -24,6 +25,11 @@ class Session(db.Model):
     version = db.Column(db.String(10), nullable=False) 
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_sessions_participant_started', 'participant_id', 'started_at'),
+        db.Index('ix_sessions_started_at', 'started_at'),
+    )
     
     # Relationships
     interactions = db.relationship('Interaction', backref='session', lazy=True, cascade='all, delete-orphan')
@@ -40,6 +46,13 @@ class Interaction(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     attempt_number = db.Column(db.Integer, default=1)
 
+    __table_args__ = (
+        db.Index('ix_interactions_session_timestamp', 'session_id', 'timestamp'),
+        db.Index('ix_interactions_speaker_timestamp', 'speaker', 'timestamp'),
+        db.Index('ix_interactions_concept_speaker_timestamp', 'concept_name', 'speaker', 'timestamp'),
+        db.Index('ix_interactions_timestamp', 'timestamp'),
+    )
+
 class Recording(db.Model):
     __tablename__ = 'recordings'
     
@@ -53,6 +66,11 @@ class Recording(db.Model):
     attempt_number = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_recordings_session_created', 'session_id', 'created_at'),
+        db.Index('ix_recordings_created_at', 'created_at'),
+    )
+
 class UserEvent(db.Model):
     __tablename__ = 'user_events'
     
@@ -60,4 +78,50 @@ class UserEvent(db.Model):
     session_id = db.Column(db.String(100), db.ForeignKey('sessions.session_id'), nullable=False)
     event_type = db.Column(db.String(50), nullable=False)  
     event_data = db.Column(db.JSON)  
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_user_events_session_timestamp', 'session_id', 'timestamp'),
+    )
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Versioned schema changes for deployments whose tables predate a change.
+# db.create_all() only creates missing tables, so anything added to an existing
+# table must also be listed here. Statements must be safe to re-run.
+SCHEMA_MIGRATIONS = [
+    (1, 'Indexes for hot query shapes', [
+        'CREATE INDEX IF NOT EXISTS ix_sessions_participant_started ON sessions (participant_id, started_at)',
+        'CREATE INDEX IF NOT EXISTS ix_sessions_started_at ON sessions (started_at)',
+        'CREATE INDEX IF NOT EXISTS ix_interactions_session_timestamp ON interactions (session_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS ix_interactions_speaker_timestamp ON interactions (speaker, timestamp)',
+        'CREATE INDEX IF NOT EXISTS ix_interactions_concept_speaker_timestamp ON interactions (concept_name, speaker, timestamp)',
+        'CREATE INDEX IF NOT EXISTS ix_interactions_timestamp ON interactions (timestamp)',
+        'CREATE INDEX IF NOT EXISTS ix_recordings_session_created ON recordings (session_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS ix_recordings_created_at ON recordings (created_at)',
+    ]),
+    (2, 'Index user events by session for per-participant export', [
+        'CREATE INDEX IF NOT EXISTS ix_user_events_session_timestamp ON user_events (session_id, timestamp)',
+    ]),
+]
+
+def run_migrations():
+    """Apply pending SCHEMA_MIGRATIONS in order. Call inside an app context after db.create_all()."""
+    applied = {version for (version,) in db.session.query(SchemaMigration.version)}
+    for version, description, statements in SCHEMA_MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            for statement in statements:
+                db.session.execute(text(statement))
+            db.session.add(SchemaMigration(version=version, description=description))
+            db.session.commit()
+            print(f"Applied schema migration {version}: {description}")
+        except Exception:
+            db.session.rollback()
+            raise
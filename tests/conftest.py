@@ -0,0 +1,135 @@
+"""Import app.py against a throwaway SQLite database and working directory.
+
+app.py keeps uploads/ and concepts.json relative to the working directory and
+reads its configuration at import time, so both are set up before the import.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix='hai_tests_')
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'test.sqlite')
+os.environ['TTS_WARMUP_ON_BOOT'] = '0'
+os.environ['EXPORT_SNAPSHOT_SETTLE_SECONDS'] = '0'
+os.environ['LOCAL_WHISPER_ENABLED'] = '0'
+os.chdir(WORK_DIR)
+sys.path.insert(0, REPO_ROOT)
+
+import app as app_module  # noqa: E402
+from database import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'export_snapshots', app_module.ExportSnapshotStore(
+        str(tmp_path / 'export_snapshots'), app_module.EXPORT_SNAPSHOT_SETTLE_SECONDS))
+    app_module.app.config['TESTING'] = True
+    with app_module.app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app_module.app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def tts_cache(tmp_path, monkeypatch):
+    cache = app_module.TTSAudioCache(str(tmp_path / 'tts_cache'), 1024 * 1024)
+    monkeypatch.setattr(app_module, 'tts_cache', cache)
+    return cache
+
+
+class FakeTTSResponse:
+    def __init__(self, audio):
+        self.audio = audio
+        self.closed = False
+
+    def iter_content(self, chunk_size=4096):
+        for start in range(0, len(self.audio), chunk_size):
+            yield self.audio[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOpenAITTS:
+    """Stands in for synthesize_with_openai and records the SSML it was sent."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text, voice='alloy', fmt='mp3', stream=False):
+        self.calls.append(text)
+        audio = b'ID3 fake mp3 ' + text.encode('utf-8')
+        if stream:
+            return FakeTTSResponse(audio), app_module.tts_content_type(fmt)
+        return audio, app_module.tts_content_type(fmt)
+
+
+@pytest.fixture
+def openai_tts(monkeypatch):
+    fake = FakeOpenAITTS()
+    monkeypatch.setattr(app_module, 'synthesize_with_openai', fake)
+    return fake
+
+
+def seed_study(n_participants=2, concepts=('Correlation', 'Confounders'), start=None, prefix='P'):
+    """Insert participants with two sessions each and a USER/AI exchange per concept.
+
+    Returns the number of interaction rows written.
+    """
+    from datetime import datetime, timedelta
+    from database import Participant, Session, Interaction
+
+    start = start or datetime(2024, 5, 1, 9, 0, 0)
+    written = 0
+    for p in range(n_participants):
+        participant_id = f'{prefix}{p:03d}'
+        db.session.add(Participant(participant_id=participant_id, created_at=start))
+        for t, trial in enumerate(('Trial_1', 'Trial_2')):
+            session_id = f'{participant_id}_{trial}'
+            started_at = start + timedelta(hours=p, minutes=30 * t)
+            db.session.add(Session(session_id=session_id, participant_id=participant_id, trial_type=trial,
+                                   version='V1', started_at=started_at,
+                                   completed_at=started_at + timedelta(minutes=12)))
+            for c, concept in enumerate(concepts):
+                moment = started_at + timedelta(minutes=c)
+                db.session.add(Interaction(session_id=session_id, speaker='USER', concept_name=concept,
+                                           message=f'{participant_id} explains {concept} in {trial}',
+                                           attempt_number=1, timestamp=moment))
+                db.session.add(Interaction(session_id=session_id, speaker='AI', concept_name=concept,
+                                           message=f'Feedback on {concept}', attempt_number=1,
+                                           timestamp=moment + timedelta(seconds=30)))
+                written += 2
+    db.session.commit()
+    return written
+
+
+@pytest.fixture
+def count_queries(app):
+    """Count SQL statements executed inside the `with count_queries() as n:` block (n[0])."""
+    import contextlib
+    from sqlalchemy import event
+
+    @contextlib.contextmanager
+    def counter():
+        executed = [0]
+
+        def before_cursor_execute(*args):
+            executed[0] += 1
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield executed
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
@@ -0,0 +1,60 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import app_module
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason='ffmpeg is not installed')
+
+
+def padded_tone(silence_ms=1000, tone_ms=1000):
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+    silence = AudioSegment.silent(duration=silence_ms, frame_rate=44100)
+    tone = Sine(440, sample_rate=44100).to_audio_segment(duration=tone_ms, volume=-10)
+    return (silence + tone + silence).set_channels(2)
+
+
+def test_silence_is_trimmed_and_clip_downmixed(tmp_path):
+    from pydub import AudioSegment
+    source = str(tmp_path / 'clip.wav')
+    padded_tone().export(source, format='wav')
+    preprocessor = app_module.AudioPreprocessor()
+
+    upload_path, report = preprocessor.preprocess(source)
+    try:
+        processed = AudioSegment.from_file(upload_path)
+        assert upload_path != source
+        assert processed.channels == 1  # Opus always decodes at 48 kHz, so the rate isn't checked
+        assert abs(len(processed) - 1400) < 60  # the tone plus 200 ms padding on each side
+        assert report['bytes_saved'] > 0
+        assert abs(report['seconds_trimmed'] - 1.6) < 0.05
+    finally:
+        os.remove(upload_path)
+    assert preprocessor.stats()['used'] == 1
+
+
+def test_predecoded_clip_is_not_decoded_again(tmp_path, monkeypatch):
+    source = str(tmp_path / 'clip.wav')
+    sound = padded_tone()
+    sound.export(source, format='wav')
+
+    def no_decode(*args, **kwargs):
+        raise AssertionError('clip decoded twice')
+
+    monkeypatch.setattr(app_module.AudioSegment, 'from_file', no_decode)
+    upload_path, report = app_module.AudioPreprocessor().preprocess(source, sound)
+    os.remove(upload_path)
+    assert report['seconds_in'] == 3.0
+
+
+def test_undecodable_clip_is_sent_unchanged(tmp_path):
+    source = str(tmp_path / 'clip.webm')
+    with open(source, 'wb') as f:
+        f.write(b'not audio')
+    preprocessor = app_module.AudioPreprocessor()
+
+    assert preprocessor.preprocess(source) == (source, None)
+    assert preprocessor.stats()['failed'] == 1
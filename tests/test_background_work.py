@@ -0,0 +1,82 @@
+import threading
+from datetime import datetime
+
+from conftest import app_module
+from database import Interaction
+
+
+def make_queue(**kwargs):
+    kwargs.setdefault('retry_delay', 0)
+    return app_module.BackgroundWorkQueue(**kwargs)
+
+
+def test_failing_job_is_retried_until_it_succeeds(app):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError('database is locked')
+
+    work = make_queue(workers=1, max_retries=3)
+    work.submit(flaky)
+    work.flush(timeout=5)
+
+    assert len(attempts) == 3
+    assert work.stats()['completed'] == 1
+    assert work.stats()['retried'] == 2
+    assert work.stats()['failed'] == 0
+
+
+def test_job_that_keeps_failing_is_counted_once(app):
+    def broken():
+        raise RuntimeError('S3 unavailable')
+
+    work = make_queue(workers=1, max_retries=2)
+    work.submit(broken)
+    work.flush(timeout=5)
+
+    assert work.stats()['failed'] == 1
+    assert work.stats()['retried'] == 1
+
+
+def test_full_queue_runs_jobs_inline_instead_of_dropping_them(app):
+    ran_on = []
+    work = make_queue(maxsize=1, workers=0)
+
+    for _ in range(3):
+        work.submit(lambda: ran_on.append(threading.current_thread().name))
+
+    assert ran_on == [threading.current_thread().name] * 2
+    assert work.stats()['ran_inline'] == 2
+    assert work.stats()['queue_depth'] == 1
+
+
+def test_interaction_rows_keep_their_enqueue_time_and_order(app):
+    student_time = datetime(2024, 5, 1, 10, 0, 0)
+    tutor_time = datetime(2024, 5, 1, 10, 0, 1)
+    work = make_queue(workers=2)
+
+    work.submit(app_module.insert_interactions, [
+        ('S1', 'User', 'Correlation', 'They move together.', 1, student_time),
+        ('S1', 'AI', 'Correlation', 'Good start.', 1, tutor_time),
+    ])
+    work.flush(timeout=5)
+    app_module.write_behind.flush()
+
+    rows = Interaction.query.order_by(Interaction.id).all()
+    assert [(r.speaker, r.timestamp) for r in rows] == [('User', student_time), ('AI', tutor_time)]
+
+
+def test_log_lines_are_written_in_order(app):
+    app_module.write_log_lines('P042', 'Trial_1', [
+        ('User', 'Correlation', 'first', datetime(2024, 5, 1, 10, 0, 0)),
+        ('AI', 'Correlation', 'second', datetime(2024, 5, 1, 10, 0, 1)),
+    ])
+
+    folders = app_module.get_participant_folder('P042', 'Trial_1')
+    with open(f"{folders['participant_folder']}/conversation_log_P042.txt", encoding='utf-8') as f:
+        assert f.read().splitlines()[-2:] == [
+            '[2024-05-01 10:00:00] User (Correlation): first',
+            '[2024-05-01 10:00:01] AI (Correlation): second',
+        ]
@@ -0,0 +1,65 @@
+import io
+import zipfile
+
+import pytest
+
+from conftest import seed_study
+from database import db, Interaction
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.parquet as pq  # noqa: E402
+
+
+def read_archive(response):
+    assert response.status_code == 200
+    return zipfile.ZipFile(io.BytesIO(response.data))
+
+
+def test_interactions_are_partitioned_by_concept_and_day(client):
+    seed_study(n_participants=2)
+    archive = read_archive(client.get('/export_columnar'))
+
+    names = [name for name in archive.namelist() if name.startswith('interactions/')]
+    assert sorted(names) == [
+        'interactions/concept_name=Confounders/date=2024-05-01/part-00000.parquet',
+        'interactions/concept_name=Correlation/date=2024-05-01/part-00000.parquet',
+    ]
+    table = pq.read_table(io.BytesIO(archive.read(names[1])))
+    assert 'concept_name' not in table.column_names
+    assert table.num_rows == 8
+    assert set(table['participant_id'].to_pylist()) == {'P000', 'P001'}
+
+
+def test_text_counts_match_python(client):
+    seed_study(n_participants=1, concepts=('Correlation',))
+    message = 'tabs\tand　ideographic  spaces\x1cseparated'
+    db.session.add(Interaction(session_id='P000_Trial_1', speaker='USER', concept_name='Correlation',
+                               message=message, attempt_number=2))
+    db.session.add(Interaction(session_id='P000_Trial_1', speaker='USER', concept_name='Correlation',
+                               message='', attempt_number=3))
+    db.session.commit()
+
+    archive = read_archive(client.get('/export_columnar'))
+    counts = {}
+    for name in archive.namelist():
+        if name.startswith('interactions/'):
+            table = pq.read_table(io.BytesIO(archive.read(name)))
+            counts.update(zip(table['attempt_number'].to_pylist(),
+                              zip(table['char_count'].to_pylist(), table['word_count'].to_pylist())))
+    assert counts[2] == (len(message), len(message.split()))
+    assert counts[3] == (0, 0)
+
+
+def test_sessions_carry_duration_and_arrow_format(client):
+    seed_study(n_participants=1)
+    archive = read_archive(client.get('/export_columnar?format=arrow'))
+
+    [name] = [name for name in archive.namelist() if name.startswith('sessions/')]
+    assert name == 'sessions/date=2024-05-01/part-00000.arrow'
+    table = pa.ipc.open_file(io.BytesIO(archive.read(name))).read_all()
+    assert table['duration_seconds'].to_pylist() == [720.0, 720.0]
+
+
+def test_unknown_format_is_rejected(client):
+    response = client.get('/export_columnar?format=xlsx')
+    assert response.status_code == 400
@@ -0,0 +1,73 @@
+import json
+import os
+
+from conftest import app_module
+
+ConceptRegistry = app_module.ConceptRegistry
+
+
+def write_concepts(path, concepts, bump_mtime=0):
+    path.write_text(json.dumps(concepts))
+    if bump_mtime:
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_mtime))
+
+
+def test_lookup_is_case_insensitive_and_parses_once(tmp_path):
+    path = tmp_path / 'concepts.json'
+    write_concepts(path, {'Correlation': {'golden_answer': 'Two variables change together.',
+                                          'keywords': ['variables']}})
+    registry = ConceptRegistry(str(path), {})
+
+    concept = registry.get('  correlATION ')
+    assert concept.name == 'Correlation'
+    assert concept.golden_answer == 'Two variables change together.'
+    assert concept.keywords == ('variables',)
+    assert registry.get('Correlation') is concept
+    assert registry.get('Moderators') is None
+    assert registry.get(None) is None
+
+
+def test_edits_are_picked_up_without_a_restart(tmp_path):
+    path = tmp_path / 'concepts.json'
+    write_concepts(path, {'Correlation': {'golden_answer': 'old'}})
+    registry = ConceptRegistry(str(path), {})
+    assert registry.get('correlation').golden_answer == 'old'
+
+    write_concepts(path, {'Correlation': {'golden_answer': 'new'}, 'Moderators': {'golden_answer': 'm'}},
+                   bump_mtime=10 ** 9)
+    assert registry.get('correlation').golden_answer == 'new'
+    assert [concept.name for concept in registry.all()] == ['Correlation', 'Moderators']
+
+
+def test_a_broken_file_keeps_the_last_good_concepts(tmp_path):
+    path = tmp_path / 'concepts.json'
+    write_concepts(path, {'Correlation': {'golden_answer': 'old'}})
+    registry = ConceptRegistry(str(path), {})
+    assert registry.get('correlation')
+
+    path.write_text('{"Correlation": ')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+    assert registry.get('correlation').golden_answer == 'old'
+
+
+def test_missing_file_is_created_from_the_defaults(tmp_path):
+    path = tmp_path / 'concepts.json'
+    registry = ConceptRegistry(str(path), {'Moderators': {'golden_answer': 'm'}})
+
+    assert registry.get('moderators').golden_answer == 'm'
+    assert json.loads(path.read_text()) == {'Moderators': {'golden_answer': 'm'}}
+
+
+def test_set_context_matches_a_concept_by_name(client, tmp_path, monkeypatch):
+    path = tmp_path / 'concepts.json'
+    write_concepts(path, {'Correlation': {'golden_answer': 'Two variables change together.'}})
+    monkeypatch.setattr(app_module, 'concept_registry', ConceptRegistry(str(path), {}))
+
+    response = client.post('/set_context', data={'concept_name': 'correlation'})
+    assert response.get_json() == {'message': 'Context set for Correlation.'}
+    with client.session_transaction() as flask_session:
+        assert flask_session['golden_answer'] == 'Two variables change together.'
+
+    assert client.post('/set_context', data={'concept_name': 'Unknown'}).get_json() == {
+        'error': 'Invalid concept selection'}
@@ -0,0 +1,88 @@
+import io
+import os
+import zipfile
+
+from conftest import app_module
+
+
+def make_files(folder, log_lines=20000):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'screen.webm'), 'wb') as f:
+        f.write(os.urandom(512 * 1024))
+    with open(os.path.join(folder, 'ai_1.mp3'), 'wb') as f:
+        f.write(os.urandom(128 * 1024))
+    with open(os.path.join(folder, 'conversation_log.txt'), 'w') as f:
+        for n in range(log_lines):
+            f.write(f'[2024-05-01 10:{n % 60:02d}:00] USER (Correlation): attempt {n} at explaining it\n')
+
+
+def download(client):
+    resp = client.get('/export_complete_data', buffered=False)
+    data = b''.join(bytes(chunk) for chunk in resp.response)
+    resp.close()
+    return data
+
+
+def test_media_is_stored_and_text_is_deflated(client):
+    make_files(os.path.join(app_module.USER_AUDIO_FOLDER, 'P600'))
+
+    archive = zipfile.ZipFile(io.BytesIO(download(client)))
+
+    base = 'Exported_Data/User Data/P600/'
+    assert archive.getinfo(base + 'screen.webm').compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo(base + 'ai_1.mp3').compress_type == zipfile.ZIP_STORED
+    log = archive.getinfo(base + 'conversation_log.txt')
+    assert log.compress_type == zipfile.ZIP_DEFLATED
+    assert log.compress_size < log.file_size / 4
+
+
+def test_dry_run_predicts_the_archive_size(client):
+    make_files(os.path.join(app_module.USER_AUDIO_FOLDER, 'P601'))
+
+    estimate = client.get('/export_complete_data?dry_run=1').get_json()
+    actual = len(download(client))
+
+    assert estimate['dry_run'] is True
+    assert estimate['file_count'] == len(zipfile.ZipFile(io.BytesIO(download(client))).namelist())
+    assert abs(estimate['estimated_archive_bytes'] - actual) / actual < 0.05  # text size is sampled
+
+
+def test_estimate_samples_text_instead_of_compressing_all_of_it(tmp_path, monkeypatch):
+    make_files(str(tmp_path), log_lines=200000)
+    log_path = str(tmp_path / 'conversation_log.txt')
+    compressed_bytes = []
+    real_compressobj = app_module.zlib.compressobj
+
+    class CountingCompressor:
+        def __init__(self, *args):
+            self._inner = real_compressobj(*args)
+
+        def compress(self, data):
+            compressed_bytes.append(len(data))
+            return self._inner.compress(data)
+
+        def flush(self):
+            return self._inner.flush()
+
+    monkeypatch.setattr(app_module.zlib, 'compressobj', CountingCompressor)
+
+    estimate = app_module.estimate_zip_export([(log_path, 'log.txt')], sample_bytes=32 * 1024)
+
+    assert sum(compressed_bytes) == 32 * 1024
+    assert estimate['deflated_input_bytes'] == os.path.getsize(log_path)
+    assert 0 < estimate['deflated_output_bytes'] < estimate['deflated_input_bytes'] / 4
+
+
+def test_prefetch_keeps_order_and_leaves_large_files_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, 'PREFETCH_MAX_FILE_BYTES', 1000)
+    entries = []
+    for n in range(20):
+        path = tmp_path / f'{n}.bin'
+        path.write_bytes(bytes([n]) * (2000 if n == 7 else 10))
+        entries.append((str(path), f'{n}.bin'))
+
+    fetched = list(app_module.prefetch_files(entries, max_workers=3, lookahead=4))
+
+    assert [arcname for _, arcname, _ in fetched] == [arcname for _, arcname in entries]
+    assert fetched[7][2] is None
+    assert fetched[3][2] == bytes([3]) * 10
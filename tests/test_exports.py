@@ -0,0 +1,129 @@
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime, timedelta
+
+from conftest import app_module, seed_study
+from database import db, Participant, Session, Interaction, Recording, UserEvent
+
+
+def seed():
+    earlier = datetime.utcnow() - timedelta(hours=1)
+    db.session.add(Participant(participant_id='P001', created_at=earlier))
+    db.session.add(Session(session_id='P001_Trial_1', participant_id='P001', trial_type='Trial_1',
+                           version='V1', started_at=earlier))
+    db.session.add_all([
+        Interaction(session_id='P001_Trial_1', speaker='USER', concept_name='Correlation',
+                    message=f'explanation {i}', timestamp=earlier, attempt_number=1)
+        for i in range(3)
+    ])
+    db.session.add_all([
+        Recording(session_id='P001_Trial_1', recording_type='user_audio', file_path=f'uploads/{i}.webm',
+                  original_filename=f'{i}.webm', created_at=earlier)
+        for i in range(2)
+    ])
+    db.session.add(UserEvent(session_id='P001_Trial_1', event_type='page_view', event_data={'page': 'intro'},
+                             timestamp=earlier))
+    db.session.commit()
+
+
+def read_tables(response):
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        return {
+            name: list(csv.DictReader(io.TextIOWrapper(archive.open(name), encoding='utf-8')))
+            for name in archive.namelist()
+        }
+
+
+def assert_tables_hold_own_rows(tables):
+    assert sorted(row['message'] for row in tables['interactions.csv']) == [
+        'explanation 0', 'explanation 1', 'explanation 2']
+    assert sorted(row['original_filename'] for row in tables['recordings.csv']) == ['0.webm', '1.webm']
+    assert [row['event_type'] for row in tables['user_events.csv']] == ['page_view']
+    for name, model in (('interactions.csv', Interaction), ('recordings.csv', Recording),
+                        ('user_events.csv', UserEvent)):
+        columns = [column.name for column in model.__table__.columns]
+        assert all(list(row) == columns and None not in row for row in tables[name])
+
+
+def test_export_csv_tables_contain_only_their_own_rows(client):
+    seed()
+    assert_tables_hold_own_rows(read_tables(client.get('/export_csv')))
+
+
+def test_export_csv_snapshots_stay_separate_after_restart(client, monkeypatch):
+    seed()
+    read_tables(client.get('/export_csv'))
+
+    # A new store over the same folder reloads state.json, as after a restart
+    folder = app_module.export_snapshots.folder
+    monkeypatch.setattr(app_module, 'export_snapshots',
+                        app_module.ExportSnapshotStore(folder, app_module.EXPORT_SNAPSHOT_SETTLE_SECONDS))
+    files = [segment['file'] for source in app_module.export_snapshots._state['sources'].values()
+             for segment in source['segments'].values()]
+    assert len(files) == len(set(files))
+
+    assert_tables_hold_own_rows(read_tables(client.get('/export_csv')))
+
+
+def test_export_etag_changes_when_a_session_is_edited(client):
+    seed()
+    etag = client.get('/export_csv').headers['ETag']
+    assert client.get('/export_csv', headers={'If-None-Match': etag}).status_code == 304
+
+    session = Session.query.filter_by(session_id='P001_Trial_1').one()
+    session.trial_type = 'Trial_2'
+    db.session.commit()
+
+    response = client.get('/export_csv', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert read_tables(response)['sessions.csv'][0]['trial_type'] == 'Trial_2'
+
+
+def test_rebuilt_source_keeps_retired_files_until_grace_expires(client, monkeypatch):
+    seed()
+    read_tables(client.get('/export_csv'))
+    store = app_module.export_snapshots
+    old_file = store._state['sources']['table_interactions']['segments']['rows']['file']
+
+    # A restored database with fewer rows starts the source over on new files
+    Interaction.query.filter(Interaction.id > 1).delete()
+    db.session.commit()
+    tables = read_tables(client.get('/export_csv'))
+    assert [row['message'] for row in tables['interactions.csv']] == ['explanation 0']
+    new_file = store._state['sources']['table_interactions']['segments']['rows']['file']
+    assert new_file != old_file
+    assert old_file in os.listdir(store.folder)
+
+    monkeypatch.setattr(app_module.ExportSnapshotStore, 'RETIRED_GRACE_SECONDS', 0)
+    read_tables(client.get('/export_csv'))
+    assert old_file not in os.listdir(store.folder)
+    assert new_file in os.listdir(store.folder)
+
+
+def test_interaction_sheets_stay_newest_first_across_snapshots(client):
+    seed_study(n_participants=2)
+    client.get('/export_research_data')
+
+    # An old row landing late in id order, and a row newer than the settle cutoff
+    db.session.add(Interaction(session_id='P000_Trial_1', speaker='USER', concept_name='Correlation',
+                               message='backfilled', attempt_number=2, timestamp=datetime(2024, 5, 1, 8)))
+    db.session.add(Interaction(session_id='P001_Trial_2', speaker='USER', concept_name='Correlation',
+                               message='still settling', attempt_number=2,
+                               timestamp=datetime.utcnow() + timedelta(hours=1)))
+    db.session.commit()
+
+    response = client.get('/export_research_data')
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        for name, message_column, expected_rows in (('03_All_Interactions.csv', 5, 18),
+                                                    ('04_User_Explanations_RESEARCH_DATA.csv', 4, 10)):
+            rows = list(csv.reader(io.TextIOWrapper(archive.open(name), encoding='utf-8')))[1:]
+            timestamps = [row[2] for row in rows]
+            assert len(rows) == expected_rows
+            assert timestamps == sorted(timestamps, reverse=True)
+            assert rows[0][message_column] == 'still settling'
+            assert rows[-1][message_column] == 'backfilled'
@@ -0,0 +1,118 @@
+import io
+import threading
+import time
+from concurrent.futures import Future
+
+from conftest import app_module
+from database import Interaction
+from whisper_worker import WhisperUnavailable
+
+
+class FakeLocalWhisper:
+    """Stands in for WhisperWorkerPool: answers after `delay` seconds, or is unavailable."""
+
+    model_name = 'fake'
+
+    def __init__(self, text='local transcript', delay=0.0, available=True):
+        self.text = text
+        self.delay = delay
+        self.available = available
+        self.submitted = 0
+
+    def submit(self, audio_path, **options):
+        if not self.available:
+            raise WhisperUnavailable('model loading')
+        self.submitted += 1
+        future = Future()
+        threading.Timer(self.delay, lambda: future.set_running_or_notify_cancel() and future.set_result(self.text)).start()
+        return future
+
+    def transcribe(self, audio_path, timeout=None, **options):
+        return self.submit(audio_path).result(timeout=timeout)
+
+
+def make_stt(api, local, failure_threshold=2, hedge_after=0.05, api_timeout=2, max_api_calls=8):
+    stt = app_module.HedgedSpeechToText(
+        local, app_module.CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=60),
+        api_timeout=api_timeout, hedge_after=hedge_after, max_api_calls=max_api_calls)
+    stt._call_api = api
+    return stt
+
+
+def test_fast_api_answer_is_not_hedged():
+    local = FakeLocalWhisper()
+    stt = make_stt(lambda path: 'api transcript', local)
+
+    assert stt.transcribe('clip.wav') == ('api transcript', stt.api_engine)
+    assert local.submitted == 0
+    assert stt.stats()['api_wins'] == 1
+
+
+def test_slow_api_is_hedged_and_local_wins():
+    release = threading.Event()
+
+    def slow_api(path):
+        release.wait(5)
+        return 'api transcript'
+
+    stt = make_stt(slow_api, FakeLocalWhisper(delay=0.01))
+    try:
+        assert stt.transcribe('clip.wav') == ('local transcript', stt.local_engine)
+    finally:
+        release.set()
+    stats = stt.stats()
+    assert (stats['hedged'], stats['local_wins'], stats['api_wins']) == (1, 1, 0)
+
+
+def test_breaker_opens_after_consecutive_api_failures():
+    calls = []
+
+    def failing_api(path):
+        calls.append(path)
+        raise ConnectionError('api down')
+
+    stt = make_stt(failing_api, FakeLocalWhisper(), failure_threshold=2)
+    for _ in range(2):
+        assert stt.transcribe('clip.wav') == ('local transcript', stt.local_engine)
+    time.sleep(0.05)  # the outcome callback runs on the API thread
+    assert stt.breaker.state == 'open'
+
+    assert stt.transcribe('clip.wav') == ('local transcript', stt.local_engine)
+    assert len(calls) == 2
+    assert stt.stats()['short_circuited'] == 1
+
+
+def test_cancelled_api_call_does_not_count_as_a_failure():
+    release = threading.Event()
+    stt = make_stt(lambda path: release.wait(5) and 'api transcript', FakeLocalWhisper(delay=0.01),
+                   failure_threshold=1, max_api_calls=1)
+    try:
+        # The first call occupies the only API thread, so the second one is still
+        # queued when the local hedge wins and gets cancelled.
+        assert stt.transcribe('first.wav')[1] == stt.local_engine
+        assert stt.transcribe('second.wav')[1] == stt.local_engine
+        assert stt.breaker.stats()['consecutive_failures'] == 0
+        assert stt.breaker.state == 'closed'
+    finally:
+        release.set()
+
+
+def test_untranscribable_clip_answers_503_without_counting_an_attempt(client, monkeypatch):
+    def unavailable(path):
+        raise WhisperUnavailable('queue full')
+
+    monkeypatch.setattr(app_module.stt, 'transcribe', unavailable)
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+        flask_session['trial_type'] = 'Trial_1'
+
+    response = client.post('/submit_message', data={
+        'concept_name': 'Correlation', 'audio': (io.BytesIO(b'webm audio'), 'clip.webm')})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert response.get_json()['retryable'] is True
+    with client.session_transaction() as flask_session:
+        assert flask_session.get('concept_attempts', {}).get('Correlation', 0) == 0
+    app_module.write_behind.flush()
+    assert Interaction.query.count() == 0
@@ -0,0 +1,134 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from conftest import app_module
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason='ffmpeg is not installed')
+
+
+def recording_chunks(tmp_path, pieces=5):
+    """A webm/Opus recording with a one-second pause in the middle, cut into chunks."""
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+    tone = Sine(330, sample_rate=48000).to_audio_segment(duration=2000, volume=-12)
+    sound = tone + AudioSegment.silent(duration=1000, frame_rate=48000) + tone
+    path = str(tmp_path / 'recording.webm')
+    sound.export(path, format='webm', codec='libopus')
+    with open(path, 'rb') as f:
+        data = f.read()
+    size = len(data) // pieces + 1
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+class FakeSTT:
+    def __init__(self):
+        self.paths = []
+        self.fail = False
+
+    def transcribe(self, path):
+        if self.fail:
+            raise app_module.WhisperUnavailable('queue full')
+        self.paths.append(path)
+        return f'part {len(self.paths)}', 'openai:whisper-1'
+
+
+@pytest.fixture
+def fake_stt(monkeypatch, tmp_path):
+    stt = FakeSTT()
+    monkeypatch.setattr(app_module.stt, 'transcribe', stt.transcribe)
+    monkeypatch.setattr(app_module, 'transcript_cache', app_module.TranscriptCache(['openai:whisper-1']))
+    return stt
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    manager = app_module.LiveTranscriptionManager(str(tmp_path / 'live'), min_silence_ms=500, min_segment_ms=1000)
+    monkeypatch.setattr(app_module, 'live_transcriptions', manager)
+    return manager
+
+
+def test_chunks_are_transcribed_by_segment_then_completed(tmp_path, fake_stt, manager):
+    chunks = recording_chunks(tmp_path)
+    stream = manager.start('P001')
+    for index, chunk in enumerate(chunks):
+        assert manager.append(stream, index, chunk) == 'ok'
+        time.sleep(0.2)  # paced like MediaRecorder timeslices, so the decoder keeps up
+    assert manager.append(stream, 0, chunks[0]) == 'duplicate'
+
+    dest = str(tmp_path / 'user_1.webm')
+    assert manager.close(stream.stream_id, 'P001', dest) is stream
+    assert manager.append(stream, len(chunks), b'late') == 'closed'
+    transcript = manager.complete(stream)
+
+    with open(dest, 'rb') as f:
+        assert f.read() == b''.join(chunks)
+    assert len(fake_stt.paths) == 2  # one segment per side of the pause, not the whole file
+    assert transcript == 'part 1 part 2'
+    assert len(os.listdir(os.path.join(manager.folder, app_module.TranscriptCache.FOLDER))) == 2
+    assert not stream.failed
+
+
+def test_failed_submit_can_be_retried_with_the_same_stream(tmp_path, fake_stt, manager):
+    chunks = recording_chunks(tmp_path)
+    stream = manager.start('P001')
+    for index, chunk in enumerate(chunks):
+        manager.append(stream, index, chunk)
+    dest = str(tmp_path / 'user_1.webm')
+    manager.close(stream.stream_id, 'P001', dest)
+
+    fake_stt.fail = True
+    with pytest.raises(app_module.WhisperUnavailable):
+        manager.complete(stream)
+    assert manager.get(stream.stream_id, 'P001') is stream
+
+    fake_stt.fail = False
+    again = manager.close(stream.stream_id, 'P001', dest)
+    assert again is stream and os.path.exists(dest)
+    assert manager.complete(again)
+    manager.discard(again)
+    assert manager.get(stream.stream_id, 'P001') is None
+    assert os.path.exists(dest)
+
+
+def test_idle_streams_expire_without_a_new_start(tmp_path, manager):
+    stream = manager.start('P001')
+    stream.updated_at -= manager.ttl_seconds + 1
+    manager._last_expired -= manager.EXPIRE_INTERVAL_SECONDS
+
+    assert manager.get(stream.stream_id, 'P001') is None
+    assert not os.path.exists(stream.path)
+
+
+def test_chunk_size_is_capped(client, manager, monkeypatch):
+    monkeypatch.setattr(app_module, 'LIVE_CHUNK_MAX_BYTES', 16)
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+    stream_id = client.post('/live_transcription').get_json()['stream_id']
+
+    assert client.post(f'/live_transcription/{stream_id}/chunk/0', data=b'x' * 17).status_code == 413
+    assert client.post(f'/live_transcription/{stream_id}/chunk/0', data=b'x' * 16).status_code == 200
+
+
+def test_submit_retries_a_live_stream_after_503(client, tmp_path, fake_stt, manager, monkeypatch):
+    monkeypatch.setattr(app_module.openai, 'ChatCompletion', type('ChatCompletion', (), {
+        'create': staticmethod(lambda **kwargs: iter(()))}), raising=False)
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+        flask_session['trial_type'] = 'Trial_1'
+    stream_id = client.post('/live_transcription').get_json()['stream_id']
+    for index, chunk in enumerate(recording_chunks(tmp_path)):
+        assert client.post(f'/live_transcription/{stream_id}/chunk/{index}', data=chunk).status_code == 200
+
+    fake_stt.fail = True
+    form = {'concept_name': 'Correlation', 'live_stream_id': stream_id}
+    assert client.post('/stream_submit_message', data=form).status_code == 503
+
+    fake_stt.fail = False
+    response = client.post('/stream_submit_message', data=form)
+    assert response.status_code == 200
+    response.get_data()
+    assert manager.get(stream_id, 'P001') is None
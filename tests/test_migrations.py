@@ -0,0 +1,64 @@
+import pytest
+from flask import Flask
+from sqlalchemy import inspect, text
+
+import database
+from database import db, SchemaMigration, SCHEMA_MIGRATIONS, run_migrations
+
+
+@pytest.fixture
+def legacy_app(tmp_path):
+    """A database whose tables were created before the indexes existed."""
+    legacy = Flask(__name__)
+    legacy.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + str(tmp_path / 'legacy.sqlite')
+    db.init_app(legacy)
+    with legacy.app_context():
+        db.create_all()
+        for statement in (statement for _, _, statements in SCHEMA_MIGRATIONS for statement in statements):
+            name = statement.split('IF NOT EXISTS ')[1].split(' ')[0]
+            db.session.execute(text(f'DROP INDEX {name}'))
+        db.session.query(SchemaMigration).delete()
+        db.session.commit()
+        yield legacy
+        db.session.remove()
+
+
+def index_names():
+    inspector = inspect(db.engine)
+    return {index['name'] for table in ('sessions', 'interactions', 'recordings', 'user_events')
+            for index in inspector.get_indexes(table)}
+
+
+def test_pending_migrations_add_the_indexes_once(legacy_app):
+    assert not any(name.startswith('ix_') for name in index_names())
+
+    run_migrations()
+    run_migrations()
+
+    assert {'ix_interactions_session_timestamp', 'ix_recordings_created_at',
+            'ix_sessions_participant_started', 'ix_user_events_session_timestamp'} <= index_names()
+    assert [m.version for m in SchemaMigration.query] == [version for version, _, _ in SCHEMA_MIGRATIONS]
+
+
+def test_failed_migration_is_not_recorded(legacy_app, monkeypatch):
+    monkeypatch.setattr(database, 'SCHEMA_MIGRATIONS', SCHEMA_MIGRATIONS + [
+        (len(SCHEMA_MIGRATIONS) + 1, 'Broken', ['CREATE INDEX ix_broken ON no_such_table (id)']),
+    ])
+
+    with pytest.raises(Exception):
+        database.run_migrations()
+
+    assert [m.version for m in SchemaMigration.query] == [version for version, _, _ in SCHEMA_MIGRATIONS]
+
+
+def test_hot_queries_use_the_indexes(legacy_app):
+    run_migrations()
+
+    def plan(sql):
+        return ' '.join(str(row) for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)))
+
+    assert 'ix_interactions_session_timestamp' in plan(
+        "SELECT * FROM interactions WHERE session_id = 'P1_Trial_1' ORDER BY timestamp")
+    assert 'ix_recordings_created_at' in plan('SELECT * FROM recordings ORDER BY created_at DESC LIMIT 20')
+    assert 'ix_sessions_participant_started' in plan(
+        "SELECT * FROM sessions WHERE participant_id = 'P1' ORDER BY started_at DESC LIMIT 1")
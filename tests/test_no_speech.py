@@ -0,0 +1,91 @@
+import io
+import os
+import shutil
+
+import pytest
+
+from conftest import app_module
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason='ffmpeg is not installed')
+
+
+def clip_bytes(tone_ms=0, silence_ms=0):
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+    sound = AudioSegment.silent(duration=silence_ms, frame_rate=16000)
+    if tone_ms:
+        sound += Sine(300, sample_rate=16000).to_audio_segment(duration=tone_ms, volume=-12)
+    out = io.BytesIO()
+    sound.export(out, format='wav')
+    return out.getvalue()
+
+
+def check(tmp_path, data):
+    path = str(tmp_path / 'clip.wav')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return app_module.detect_no_speech(path, app_module.decode_clip(path))
+
+
+def test_clips_without_speech_are_recognised(tmp_path):
+    assert check(tmp_path, b'') == 'empty'
+    assert check(tmp_path, clip_bytes(tone_ms=300)) == 'too_short'
+    assert check(tmp_path, clip_bytes(silence_ms=2000)) == 'silent'
+    assert check(tmp_path, clip_bytes(tone_ms=100, silence_ms=2000)) == 'silent'
+    assert check(tmp_path, clip_bytes(tone_ms=1000, silence_ms=500)) is None
+    assert check(tmp_path, b'not audio at all') is None  # undecodable: let STT decide
+
+
+def test_silent_clip_gets_canned_reply_without_stt(client, monkeypatch):
+    decoded = []
+    real_decode = app_module.decode_clip
+
+    def counting_decode(path):
+        decoded.append(path)
+        return real_decode(path)
+
+    def no_stt(*args, **kwargs):
+        raise AssertionError('speech-to-text called for a silent clip')
+
+    generated = []
+    monkeypatch.setattr(app_module, 'decode_clip', counting_decode)
+    monkeypatch.setattr(app_module, 'transcribe_clip', no_stt)
+    monkeypatch.setattr(app_module, 'generate_audio', lambda text, path: generated.append(text) or False)
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+        flask_session['trial_type'] = 'Trial_1'
+
+    for _ in range(2):
+        response = client.post('/submit_message', data={
+            'concept_name': 'Correlation', 'audio': (io.BytesIO(clip_bytes(silence_ms=1500)), 'clip.webm')})
+        body = response.get_json()
+        assert (body['response'], body['no_speech'], body['attempt_count']) == (
+            app_module.NOT_CAUGHT_RESPONSE, 'silent', 0)
+
+    assert len(decoded) == 2
+    assert generated == [app_module.NOT_CAUGHT_RESPONSE] * 2
+    folder = app_module.get_participant_folder('P001', 'Trial_1')['participant_folder']
+    kept = sorted(os.path.splitext(name)[0] for name in os.listdir(folder)
+                  if name.startswith('user_') and '_nospeech_' in name)
+    assert [name.rsplit('_nospeech_', 1)[1] for name in kept] == ['1', '2']
+
+
+def test_decoded_clip_is_passed_on_to_transcription(client, monkeypatch):
+    seen = {}
+
+    def fake_transcribe(path, sound=None):
+        seen['sound'] = sound
+        return 'Two things that change together.'
+
+    monkeypatch.setattr(app_module, 'transcribe_clip', fake_transcribe)
+    monkeypatch.setattr(app_module.openai, 'ChatCompletion', type('ChatCompletion', (), {
+        'create': staticmethod(lambda **kwargs: iter(()))}), raising=False)
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+        flask_session['trial_type'] = 'Trial_1'
+
+    client.post('/stream_submit_message', data={
+        'concept_name': 'Correlation', 'audio': (io.BytesIO(clip_bytes(tone_ms=1000)), 'clip.webm')}).get_data()
+
+    assert seen['sound'] is not None and abs(len(seen['sound']) - 1000) < 50
@@ -0,0 +1,75 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import app_module
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_warm_connections(local_server):
+    http = app_module.PooledHTTPSession(pool_size=2)
+    for _ in range(5):
+        assert http.get(local_server, timeout=5).text == 'ok'
+
+    assert http.stats() == {'pool_size': 2, 'requests': 5, 'new_connections': 1, 'reused_connections': 4}
+    http.shutdown()
+
+
+def test_close_keeps_the_pool_and_shutdown_drops_it(local_server):
+    http = app_module.PooledHTTPSession(pool_size=2)
+    http.get(local_server, timeout=5)
+
+    http.close()  # what openai 0.28 does with its per-thread session
+    http.get(local_server, timeout=5)
+    assert http.stats()['reused_connections'] == 1
+
+    http.shutdown()
+    assert http.stats()['requests'] == 0
+
+
+def test_tts_and_openai_client_share_the_pool(client, monkeypatch):
+    sent = []
+
+    class Response:
+        content = b'ID3 audio'
+
+        def raise_for_status(self):
+            pass
+
+    def post(url, **kwargs):
+        sent.append(url)
+        return Response()
+
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    monkeypatch.setattr(app_module.openai_http, 'post', post)
+
+    audio, content_type = app_module.synthesize_with_openai('Hello', fmt='mp3')
+
+    assert (audio, content_type) == (b'ID3 audio', 'audio/mpeg')
+    assert sent == ['https://api.openai.com/v1/audio/speech']
+    assert app_module.openai.requestssession is app_module.openai_http
+    assert 'openai_http' in client.get('/metrics').get_json()
@@ -0,0 +1,42 @@
+import csv
+import io
+import os
+import shutil
+import zipfile
+
+from conftest import app_module, seed_study
+from database import db, UserEvent
+
+
+def test_export_holds_only_the_participants_rows_and_files(client):
+    seed_study(n_participants=3)
+    db.session.add(UserEvent(session_id='P001_Trial_2', event_type='page_view', event_data={'page': 'intro'}))
+    db.session.add(UserEvent(session_id='P002_Trial_1', event_type='page_view', event_data={'page': 'intro'}))
+    db.session.commit()
+    folder = os.path.join(app_module.app.config['USER_AUDIO_FOLDER'], 'P001')
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'concept1.webm'), 'wb') as f:
+        f.write(b'webm bytes')
+
+    try:
+        response = client.get('/export_participant/P001')
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+    finally:
+        shutil.rmtree(folder)
+
+    def table(name):
+        return list(csv.DictReader(io.TextIOWrapper(archive.open(f'Participant_P001/database/{name}.csv'))))
+
+    assert [row['session_id'] for row in table('sessions')] == ['P001_Trial_1', 'P001_Trial_2']
+    interactions = table('interactions')
+    assert len(interactions) == 8
+    assert {row['session_id'] for row in interactions} == {'P001_Trial_1', 'P001_Trial_2'}
+    assert [row['session_id'] for row in table('user_events')] == ['P001_Trial_2']
+    assert table('recordings') == []
+    assert archive.read('Participant_P001/User Data/P001/concept1.webm') == b'webm bytes'
+
+
+def test_unknown_participant_is_not_found(client):
+    seed_study(n_participants=1)
+    assert client.get('/export_participant/P404').status_code == 404
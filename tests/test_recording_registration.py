@@ -0,0 +1,65 @@
+import os
+
+from conftest import app_module
+from database import Recording
+
+
+def write_recording(participant_id, name, data=b'ID3 recorded audio'):
+    folders = app_module.get_participant_folder(participant_id, 'Trial_1')
+    path = os.path.join(folders['participant_folder'], name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def uploads_snapshot():
+    return sorted(os.path.join(root, name) for root, _, names in os.walk('uploads') for name in names)
+
+
+def test_file_on_disk_is_registered_in_place(app):
+    path = write_recording('P100', 'user_P100_1.mp3')
+    before = uploads_snapshot()
+
+    assert app_module.register_recording_file(path, 'S100', 'user_audio', 'Correlation', 1) == path
+
+    assert uploads_snapshot() == before
+    app_module.write_behind.flush()
+    recording = Recording.query.one()
+    assert recording.file_path == os.path.relpath(path, app_module.USER_AUDIO_FOLDER)
+    assert recording.file_size == len(b'ID3 recorded audio')
+    assert recording.original_filename == 'user_P100_1.mp3'
+    assert (recording.recording_type, recording.concept_name, recording.attempt_number) == ('user_audio', 'Correlation', 1)
+
+
+def test_backup_of_a_path_does_not_copy_it(app):
+    path = write_recording('P101', 'ai_P101_1.mp3')
+    before = uploads_snapshot()
+
+    local_path, _ = app_module.save_audio_with_cloud_backup(path, 'ai_P101_1.mp3', 'S101', 'ai_audio')
+
+    assert local_path == path
+    assert uploads_snapshot() == before
+    app_module.write_behind.flush()
+    assert Recording.query.count() == 1
+
+
+def test_backup_of_bytes_still_writes_the_file(app):
+    local_path, _ = app_module.save_audio_with_cloud_backup(
+        b'webm bytes', 'User Data/P102/screen.webm', 'S102', 'screen_recording')
+
+    with open(local_path, 'rb') as f:
+        assert f.read() == b'webm bytes'
+    app_module.write_behind.flush()
+    assert Recording.query.one().file_path == os.path.join('P102', 'screen.webm')
+
+
+def test_recent_recordings_resolve_against_user_data(client):
+    path = write_recording('P103', 'user_P103_1.mp3')
+    app_module.register_recording_file(path, 'S103', 'user_audio')
+    app_module.write_behind.flush()
+
+    listed = client.get('/list_recent_recordings').get_json()
+
+    entry = next(r for r in listed['recent_recordings'] if r['session_id'] == 'S103')
+    assert entry['exists'] is True
+    assert os.path.samefile(entry['file_path_resolved'], path)
@@ -0,0 +1,67 @@
+import csv
+import io
+import zipfile
+
+from conftest import seed_study
+from database import db, Interaction
+
+
+def read_export(client):
+    resp = client.get('/export_research_data')
+    assert resp.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(resp.data))
+    return {name: list(csv.reader(io.StringIO(archive.read(name).decode('utf-8'))))
+            for name in archive.namelist()}
+
+
+def test_sheets_summarise_the_seeded_study(client):
+    seed_study(n_participants=2)
+    db.session.add(Interaction(session_id='P001_Trial_1', speaker='USER', concept_name='Moderators',
+                               message='A moderator changes the strength', attempt_number=2))
+    db.session.commit()
+
+    sheets = read_export(client)
+
+    participants = {row[0]: row for row in sheets['01_Participants_Summary.csv'][1:]}
+    assert participants['P000'][2:] == ['2', '8', 'Trial_1; Trial_2', 'V1']
+    assert participants['P001'][2:] == ['2', '9', 'Trial_1; Trial_2', 'V1']
+
+    sessions = {row[0]: row for row in sheets['02_Sessions_Detail.csv'][1:]}
+    assert sessions['P001_Trial_1'][6:] == ['12.0', '5']
+    assert sessions['P000_Trial_2'][6:] == ['12.0', '4']
+
+    explanations = sheets['04_User_Explanations_RESEARCH_DATA.csv'][1:]
+    assert {row[0] for row in explanations} == {'P000', 'P001'}
+    assert len(explanations) == 9
+
+    concept_sheets = sorted(name for name in sheets if name.startswith('05_Concept_'))
+    assert concept_sheets == ['05_Concept_Confounders_Explanations.csv', '05_Concept_Correlation_Explanations.csv',
+                              '05_Concept_Moderators_Explanations.csv']
+    assert sheets['05_Concept_Moderators_Explanations.csv'][1][:2] == ['P001', 'P001_Trial_1']
+
+    summary = dict(sheets['00_Research_Summary_Statistics.csv'][1:])
+    assert summary['Total Interactions'] == '17'
+    assert summary['User Explanations'] == '9'
+    assert summary['AI Responses'] == '8'
+
+
+def test_orphan_interactions_are_attributed_to_unknown(client):
+    db.session.add(Interaction(session_id='gone', speaker='USER', concept_name='Correlation',
+                               message='orphaned row', attempt_number=1))
+    db.session.commit()
+
+    sheets = read_export(client)
+
+    assert sheets['03_All_Interactions.csv'][1][:2] == ['gone', 'Unknown']
+
+
+def test_query_count_does_not_grow_with_the_data(client, count_queries):
+    seed_study(n_participants=2, prefix='A')
+    with count_queries() as small:
+        read_export(client)
+
+    seed_study(n_participants=15, concepts=('Correlation',), prefix='B')
+    with count_queries() as large:
+        read_export(client)
+
+    assert 0 < large[0] == small[0]
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import app_module
+from database import Recording
+
+DATA = os.urandom(300 * 1024)
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    store = app_module.ResumableUploads(str(tmp_path / 'resumable_uploads'), app_module.RESUMABLE_UPLOAD_TTL_SECONDS)
+    monkeypatch.setattr(app_module, 'resumable_uploads', store)
+    return store
+
+
+def log_in(client, session_id=None):
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+        flask_session['trial_type'] = 'Trial_1'
+        if session_id:
+            flask_session['session_id'] = session_id
+
+
+def start(client, name):
+    response = client.post('/resumable_upload', json={
+        'filename': name, 'target': 'screen_recordings', 'total_size': len(DATA)})
+    assert response.status_code == 200
+    return response.get_json()['upload_id']
+
+
+def put_chunk(client, upload_id, index, offset, data):
+    return client.put(f'/resumable_upload/{upload_id}/chunk/{index}?offset={offset}', data=data)
+
+
+def finalize(client, upload_id):
+    return client.post(f'/resumable_upload/{upload_id}/finalize', json={'sha256': hashlib.sha256(DATA).hexdigest()})
+
+
+def recordings_for(path):
+    app_module.background_work.wait_idle()
+    app_module.write_behind.flush()
+    return Recording.query.filter_by(file_path=os.path.relpath(path, app_module.USER_AUDIO_FOLDER)).count()
+
+
+def test_chunks_resume_and_finalize_into_place(client, uploads):
+    log_in(client, session_id='P001_Trial_1')
+    upload_id = start(client, 'screen_resume.webm')
+    half = len(DATA) // 2
+
+    assert put_chunk(client, upload_id, 0, 0, DATA[:half]).status_code == 200
+    assert put_chunk(client, upload_id, 0, 0, DATA[:half]).get_json()['duplicate'] is True
+    conflict = put_chunk(client, upload_id, 2, half, DATA[half:])
+    assert conflict.status_code == 409 and conflict.get_json()['offset'] == half
+    assert client.get(f'/resumable_upload/{upload_id}').get_json()['offset'] == half
+    assert finalize(client, upload_id).status_code == 409  # incomplete
+    assert put_chunk(client, upload_id, 1, half, DATA[half:]).status_code == 200
+
+    first = finalize(client, upload_id)
+    assert first.status_code == 200
+    folder = app_module.get_participant_folder('P001', 'Trial_1')['screen_recordings_folder']
+    path = os.path.join(folder, 'screen_resume.webm')
+    with open(path, 'rb') as f:
+        assert f.read() == DATA
+    assert not os.path.exists(path + '.part')
+    assert [name for name in os.listdir(uploads.folder) if name.endswith('.part')] == []
+
+    # A retry after a lost response gets the same answer and registers nothing new
+    again = finalize(client, upload_id)
+    assert again.status_code == 200 and again.get_json() == first.get_json()
+    assert put_chunk(client, upload_id, 2, len(DATA), b'late').status_code == 409
+    assert recordings_for(path) == 1
+    os.remove(path)
+
+
+def test_concurrent_finalize_moves_the_file_once(app, uploads):
+    clients = [app.test_client() for _ in range(4)]
+    for client in clients:
+        log_in(client)
+    upload_id = start(clients[0], 'screen_race.webm')
+    assert put_chunk(clients[0], upload_id, 0, 0, DATA).status_code == 200
+
+    results = []
+    threads = [threading.Thread(target=lambda c=client: results.append(finalize(c, upload_id)))
+               for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r.status_code for r in results] == [200] * 4
+    assert len({r.get_json()['file_path'] for r in results}) == 1
+    folder = app_module.get_participant_folder('P001', 'Trial_1')['screen_recordings_folder']
+    assert [name for name in os.listdir(folder) if name.startswith('screen_race')] == ['screen_race.webm']
+    os.remove(os.path.join(folder, 'screen_race.webm'))
+
+
+def test_expire_removes_stale_uploads_and_orphaned_parts(tmp_path):
+    store = app_module.ResumableUploads(str(tmp_path / 'uploads'), ttl_seconds=3600)
+    stale = store.start(str(tmp_path / 'stale.webm'), 'P001', 'participant')
+    fresh = store.start(str(tmp_path / 'fresh.webm'), 'P001', 'participant')
+    orphan = os.path.join(store.folder, 'f' * 32 + '.part')
+    open(orphan, 'wb').close()
+
+    old = time.time() - 7200
+    os.utime(orphan, (old, old))
+    stale['started_at'] = old
+    store._save(stale)
+    store.expire()
+
+    assert store.load(stale['upload_id']) is None
+    assert not os.path.exists(stale['part_path'])
+    assert not os.path.exists(orphan)
+    assert store.load(fresh['upload_id']) is not None
+    assert os.path.exists(fresh['part_path'])
@@ -0,0 +1,84 @@
+import json
+import re
+import shutil
+
+import pytest
+
+from conftest import app_module
+
+needs_ffmpeg = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason='ffmpeg is not installed')
+
+
+def write_tone(path, duration_ms=400, frame_rate=24000):
+    from pydub.generators import Sine
+    Sine(440, sample_rate=frame_rate).to_audio_segment(duration=duration_ms).export(path, format='mp3')
+    return path
+
+
+def test_short_fragments_stay_with_the_next_sentence():
+    sentences, rest = app_module.split_finished_sentences(
+        'Yes. That is a good start to the answer. Now think about the third varia')
+
+    assert sentences == ['Yes. That is a good start to the answer.']
+    assert rest == 'Now think about the third varia'
+
+
+@needs_ffmpeg
+def test_concatenated_clips_form_one_clean_mp3(tmp_path):
+    from pydub import AudioSegment
+    clips = [
+        write_tone(str(tmp_path / 'a.mp3'), 400, 24000),
+        write_tone(str(tmp_path / 'b.mp3'), 600, 44100),
+    ]
+    out = str(tmp_path / 'joined' / 'ai.mp3')
+
+    app_module.concat_audio_files(clips, out)
+
+    with open(out, 'rb') as f:
+        data = f.read()
+    assert data.count(b'ID3') <= 1
+    assert data.count(b'Xing') + data.count(b'Info') <= 1
+    assert abs(len(AudioSegment.from_mp3(out)) - 1000) < 120
+    assert not (tmp_path / 'joined' / 'ai.mp3.part').exists()
+
+
+def chat_stream(text, size=10):
+    for start in range(0, len(text), size):
+        yield {'choices': [{'delta': {'content': text[start:start + size]}}]}
+
+
+@needs_ffmpeg
+def test_stream_announces_sentence_clips_in_order(client, monkeypatch, tmp_path):
+    reply = ('Correlation describes how two variables move together. '
+             'It does not prove that one causes the other. '
+             'Think about a third variable')
+    spoken = []
+
+    def fake_generate_audio(text, file_path):
+        spoken.append(text)
+        write_tone(file_path, 300)
+        return True
+
+    monkeypatch.setattr(app_module.openai, 'ChatCompletion', type('ChatCompletion', (), {
+        'create': staticmethod(lambda **kwargs: chat_stream(reply))}), raising=False)
+    monkeypatch.setattr(app_module, 'generate_audio', fake_generate_audio)
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+        flask_session['trial_type'] = 'Trial_1'
+
+    body = client.post('/stream_submit_message', data={
+        'concept_name': 'Correlation', 'message': 'Two things that change together.'}).get_data(as_text=True)
+
+    markers = [json.loads(m) for m in re.findall(r'__AUDIO__START__(.*?)__AUDIO__END__', body)]
+    meta = json.loads(re.search(r'__JSON__START__(.*?)__JSON__END__', body).group(1))
+    bubble_text = re.sub(r'__AUDIO__START__.*?__AUDIO__END__', '', body.split('__JSON__START__')[0])
+
+    assert bubble_text.rstrip('\n') == reply
+    assert [m['index'] for m in markers] == [1, 2, 3]
+    assert [m['text'] for m in markers] == spoken
+    assert ' '.join(spoken) == reply
+    assert meta['sentence_audio_urls'] == [m['audio_url'] for m in markers]
+    folders = app_module.get_participant_folder('P001', 'Trial_1')
+    from pydub import AudioSegment
+    assert abs(len(AudioSegment.from_mp3(f"{folders['participant_folder']}/{meta['ai_audio_url']}")) - 900) < 150
@@ -0,0 +1,82 @@
+import random
+import re
+from difflib import SequenceMatcher
+
+import pytest
+
+from conftest import app_module
+
+Concept = app_module.Concept
+
+
+def baseline_similarity(a, b):
+    """compute_similarity() as it was defined inside submit_message before the scoring engine."""
+    def normalize(text):
+        t = (text or '').lower()
+        t = re.sub(r"[^a-z0-9\s]", ' ', t)
+        t = re.sub(r"\s+", ' ', t).strip()
+        return t
+
+    stopwords = {
+        'the', 'is', 'a', 'an', 'and', 'or', 'of', 'in', 'to', 'for', 'on', 'with', 'that', 'this', 'it',
+        'as', 'are', 'be', 'by', 'at', 'from', 'which', 'was', 'were', 'has', 'have', 'but', 'not'
+    }
+    na = normalize(a)
+    nb = normalize(b)
+    if not na or not nb:
+        return 0.0
+    set_a = {w for w in na.split() if w and w not in stopwords}
+    set_b = {w for w in nb.split() if w and w not in stopwords}
+    jaccard = float(len(set_a & set_b)) / float(len(set_a | set_b)) if (set_a | set_b) else 0.0
+    score = 0.25 * jaccard + 0.75 * SequenceMatcher(None, na, nb).ratio()
+    if any(k in na for k in {"cause", "effect", "relationship", "variable", "influence"}):
+        score += 0.05
+    return min(score, 1.0)
+
+
+def explanation_corpus(golden_answers, size=400, seed=7):
+    """Golden answers, edge cases and random paraphrases built from the golden answers' words."""
+    rng = random.Random(seed)
+    words = [w for answer in golden_answers for w in answer.split()]
+    corpus = list(golden_answers) + ['', '   ', '?!...', 'the of and', 'CORRELATION!!', 'it is a cause']
+    for answer in golden_answers:
+        tokens = answer.split()
+        corpus.append(' '.join(tokens[:len(tokens) // 2]))
+        corpus.append(' '.join(reversed(tokens)))
+        corpus.append(answer.upper().replace('.', ' ... '))
+    while len(corpus) < size:
+        corpus.append(' '.join(rng.choice(words) for _ in range(rng.randint(1, 60))))
+    return corpus
+
+
+@pytest.fixture(scope='module')
+def concepts():
+    return [Concept(name, entry['golden_answer']) for name, entry in app_module.DEFAULT_CONCEPTS.items()]
+
+
+def test_scores_match_the_baseline_formula(concepts):
+    corpus = explanation_corpus([concept.golden_answer for concept in concepts])
+    for concept in concepts:
+        for text in corpus:
+            assert app_module.similarity_score(text, concept) == baseline_similarity(text, concept.golden_answer), text
+
+
+def test_threshold_decisions_match_the_baseline_formula(concepts):
+    corpus = explanation_corpus([concept.golden_answer for concept in concepts])
+    decisions = set()
+    for concept in concepts:
+        for text in corpus:
+            expected = baseline_similarity(text, concept.golden_answer) >= app_module.SIMILARITY_THRESHOLD
+            assert app_module.meets_similarity_threshold(text, concept) == expected, text
+            decisions.add(expected)
+    assert decisions == {True, False}
+
+
+def test_concept_keywords_replace_the_default_bonus():
+    concept = Concept('Moderators', 'Moderators change how strongly two variables are related.', ['moderator'])
+    text = 'a moderator changes the relationship'
+
+    # Both get the 0.05 bonus, for different words
+    assert app_module.similarity_score(text, concept) == pytest.approx(baseline_similarity(text, concept.golden_answer))
+    assert app_module.similarity_score('the relationship', concept) == pytest.approx(
+        baseline_similarity('the relationship', concept.golden_answer) - 0.05)
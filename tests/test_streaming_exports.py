@@ -0,0 +1,67 @@
+import csv
+import io
+import os
+import zipfile
+
+from conftest import app_module, seed_study
+
+
+def collect(resp):
+    chunks = [bytes(chunk) for chunk in resp.response]
+    resp.close()
+    return chunks
+
+
+def test_file_export_is_streamed_in_pieces(client):
+    folder = os.path.join(app_module.USER_AUDIO_FOLDER, 'P500')
+    os.makedirs(folder, exist_ok=True)
+    big = os.urandom(3 * 1024 * 1024)
+    with open(os.path.join(folder, 'screen.webm'), 'wb') as f:
+        f.write(big)
+    with open(os.path.join(folder, 'conversation_log_P500.txt'), 'w') as f:
+        f.write('[2024-05-01 10:00:00] USER (Correlation): hello\n')
+
+    resp = client.get('/export_complete_data', buffered=False)
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    chunks = collect(resp)
+
+    assert len(chunks) >= 3  # the 3 MB file goes out in 1 MB pieces
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    assert archive.testzip() is None
+    assert archive.read('Exported_Data/User Data/P500/screen.webm') == big
+    info = archive.getinfo('Exported_Data/User Data/P500/conversation_log_P500.txt')
+    assert info.flag_bits & 0x08  # sizes follow the data, so nothing was seeked back to
+
+
+def test_zip_stream_buffer_cannot_seek():
+    buffer = app_module.ZipStreamBuffer()
+    assert not hasattr(buffer, 'seek')
+    buffer.write(b'abc')
+    assert (buffer.tell(), buffer.drain(), buffer.drain()) == (3, b'abc', b'')
+
+
+def test_csv_rows_are_flushed_between_batches(app):
+    def build(zip_file):
+        yield from app_module.write_csv_entry(
+            zip_file, 'rows.csv', ['n', 'text'], ([n, os.urandom(64).hex()] for n in range(5000)), flush_every=500)
+
+    chunks = list(app_module.stream_zip(build))
+
+    assert len(chunks) > 5
+    rows = list(csv.reader(io.StringIO(zipfile.ZipFile(io.BytesIO(b''.join(chunks))).read('rows.csv').decode())))
+    assert len(rows) == 5001
+
+
+def test_latest_session_export_has_one_session_per_participant(client):
+    assert client.get('/export_latest_session').status_code == 404
+    seed_study(n_participants=3)
+
+    resp = client.get('/export_latest_session')
+
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(collect(resp))))
+    summary = list(csv.reader(io.StringIO(archive.read('Latest_Sessions_Summary.csv').decode())))[1:]
+    assert [(row[1], row[5]) for row in summary] == [('P000_Trial_2', '4'), ('P001_Trial_2', '4'), ('P002_Trial_2', '4')]
+    interactions = list(csv.reader(io.StringIO(archive.read('Latest_Session_Interactions.csv').decode())))[1:]
+    assert {row[1] for row in interactions} == {'P000_Trial_2', 'P001_Trial_2', 'P002_Trial_2'}
+    assert [row[4] for row in interactions[:4]] == ['USER', 'AI', 'USER', 'AI']
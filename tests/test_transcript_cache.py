@@ -0,0 +1,64 @@
+import io
+import os
+import shutil
+import zipfile
+
+from conftest import app_module, seed_study
+
+
+def write_clip(folder, name, data=b'webm clip bytes'):
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_retried_clip_is_answered_from_the_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def transcribe(path):
+        calls.append(path)
+        return 'two things move together', app_module.stt.api_engine
+
+    monkeypatch.setattr(app_module.stt, 'transcribe', transcribe)
+    monkeypatch.setattr(app_module, 'transcript_cache', app_module.TranscriptCache(
+        [app_module.stt.api_engine, app_module.stt.local_engine]))
+    first = write_clip(str(tmp_path), 'user_1.webm')
+    retry = write_clip(str(tmp_path), 'user_1_retry.webm')
+
+    assert app_module.transcribe_clip(first) == 'two things move together'
+    assert app_module.transcribe_clip(retry) == 'two things move together'
+    assert calls == [first]
+    assert len(os.listdir(tmp_path / '.transcripts')) == 1
+    assert app_module.transcript_cache.stats()['hits'] == 1
+
+
+def test_lookups_prefer_engines_in_order(tmp_path):
+    cache = app_module.TranscriptCache(['openai:whisper-1', 'local-whisper:small'])
+    path = write_clip(str(tmp_path), 'clip.webm')
+    digest = cache.audio_digest(path)
+
+    assert cache.get(path, digest) is None
+    cache.put(path, digest, 'local-whisper:small', 'local text')
+    assert cache.get(path, digest) == ('local text', 'local-whisper:small')
+    cache.put(path, digest, 'openai:whisper-1', 'api text')
+    assert cache.get(path, digest) == ('api text', 'openai:whisper-1')
+    assert app_module.TranscriptCache(['local-whisper:small']).get(path, digest) == ('local text', 'local-whisper:small')
+
+
+def test_cached_transcripts_stay_out_of_participant_exports(client):
+    seed_study(n_participants=1)
+    folder = os.path.join(app_module.app.config['USER_AUDIO_FOLDER'], 'P000')
+    path = write_clip(folder, 'user_1.webm')
+    cache = app_module.TranscriptCache(['openai:whisper-1'])
+    cache.put(path, cache.audio_digest(path), 'openai:whisper-1', 'text')
+
+    try:
+        response = client.get('/export_participant/P000')
+        names = zipfile.ZipFile(io.BytesIO(response.data)).namelist()
+    finally:
+        shutil.rmtree(folder)
+
+    assert 'Participant_P000/User Data/P000/user_1.webm' in names
+    assert not any('.transcripts' in name for name in names)
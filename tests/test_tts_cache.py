@@ -0,0 +1,102 @@
+import os
+import threading
+
+from conftest import app_module
+
+
+def test_second_request_is_served_from_cache(tts_cache, openai_tts):
+    first, content_type = app_module.synthesize_tts_cached('Hello there. How are you?')
+    second, _ = app_module.synthesize_tts_cached('Hello there. How are you?')
+
+    assert first == second
+    assert content_type == 'audio/mpeg'
+    assert len(openai_tts.calls) == 1
+    assert (tts_cache.hits, tts_cache.misses) == (1, 1)
+    with open(first, 'rb') as f:
+        assert f.read().startswith(b'ID3 fake mp3 ')
+
+
+def test_prosody_is_part_of_the_cache_key(tts_cache, openai_tts):
+    tutor_path, _ = app_module.synthesize_tts_cached('One. Two, three.')
+    synth_path, _ = app_module.synthesize_tts_cached('One. Two, three.', prosody=app_module.SYNTHESIZE_PROSODY)
+
+    assert tutor_path != synth_path
+    assert openai_tts.calls == [
+        app_module.ssml_wrap('One. Two, three.', rate='0%', pitch='0%', break_ms=250),
+        app_module.ssml_wrap('One. Two, three.', rate='5%', pitch='0%', break_ms=220),
+    ]
+
+
+def test_synthesize_endpoint_keeps_its_prosody(client, tts_cache, openai_tts):
+    resp = client.post('/synthesize', json={'text': 'First sentence. Second one.', 'stream': '0'})
+
+    assert resp.status_code == 200
+    assert resp.mimetype == 'audio/mpeg'
+    assert openai_tts.calls == [app_module.ssml_wrap('First sentence. Second one.', rate='5%', pitch='0%', break_ms=220)]
+    assert '220ms' in openai_tts.calls[0]
+
+
+def test_falls_back_to_gtts_when_openai_fails(tts_cache, monkeypatch):
+    def failing_openai(text, voice='alloy', fmt='mp3', stream=False):
+        raise RuntimeError('OpenAI API key not configured')
+
+    class FakeGTTS:
+        saved = 0
+
+        def __init__(self, text, lang='en', slow=False):
+            self.text = text
+
+        def save(self, path):
+            FakeGTTS.saved += 1
+            with open(path, 'wb') as f:
+                f.write(b'gtts ' + self.text.encode('utf-8'))
+
+    monkeypatch.setattr(app_module, 'synthesize_with_openai', failing_openai)
+    monkeypatch.setattr(app_module, 'gTTS', FakeGTTS)
+
+    path, content_type = app_module.synthesize_tts_cached('Fallback please.', voice='nova')
+    again, _ = app_module.synthesize_tts_cached('Fallback please.', voice='alloy')
+
+    assert content_type == 'audio/mpeg'
+    assert path == again
+    assert FakeGTTS.saved == 1
+
+
+def put(cache, key, audio):
+    temp_path = cache.new_temp_path()
+    with open(temp_path, 'wb') as f:
+        f.write(audio)
+    return cache.put_file(key, 'mp3', temp_path)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = app_module.TTSAudioCache(str(tmp_path / 'cache'), max_bytes=250)
+    old = put(cache, 'old', b'a' * 100)
+    os.utime(old, (1, 1))
+    recent = put(cache, 'recent', b'b' * 100)
+    os.utime(recent, (2, 2))
+    assert cache.get('old', 'mp3') == old  # a hit makes 'old' the most recently used
+
+    put(cache, 'new', b'c' * 100)
+
+    assert cache.get('recent', 'mp3') is None
+    assert cache.get('old', 'mp3') == old
+    assert cache.evictions == 1
+
+
+def test_hit_and_miss_counters_are_exact_under_concurrency(tmp_path):
+    cache = app_module.TTSAudioCache(str(tmp_path / 'cache'), max_bytes=1024)
+    put(cache, 'key', b'x')
+
+    def hammer():
+        for _ in range(500):
+            cache.get('key', 'mp3')
+            cache.record_miss()
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert (cache.hits, cache.misses) == (4000, 4000)
@@ -0,0 +1,59 @@
+from conftest import app_module
+
+
+def test_synthesize_streams_and_fills_the_cache(client, tts_cache, openai_tts):
+    text = 'A long answer. ' * 400
+
+    first = client.post('/synthesize', json={'text': text})
+    assert first.status_code == 200
+    assert first.mimetype == 'audio/mpeg'
+    assert first.is_streamed
+    audio = first.data
+    assert len(openai_tts.calls) == 1
+    assert openai_tts.calls[0] == app_module.ssml_wrap(
+        app_module.clean_tts_text(text), rate='5%', pitch='0%', break_ms=220)
+
+    second = client.post('/synthesize', json={'text': text})
+    assert second.data == audio
+    assert len(openai_tts.calls) == 1
+    assert (tts_cache.hits, tts_cache.misses) == (1, 1)
+
+
+def test_streamed_and_buffered_synthesis_share_cache_entries(client, tts_cache, openai_tts):
+    streamed = client.post('/synthesize', json={'text': 'Shared entry.'}).data
+    buffered = client.post('/synthesize', json={'text': 'Shared entry.', 'stream': '0'}).data
+
+    assert streamed == buffered
+    assert len(openai_tts.calls) == 1
+
+
+def test_download_finishes_when_the_client_disconnects(tts_cache, openai_tts):
+    chunks, _ = app_module.stream_tts('Client goes away. ' * 1000)
+    assert next(chunks)
+    chunks.close()
+
+    cached_path, _ = app_module.synthesize_tts_cached('Client goes away. ' * 1000)
+    assert len(openai_tts.calls) == 1
+    with open(cached_path, 'rb') as f:
+        assert f.read() == b'ID3 fake mp3 ' + openai_tts.calls[0].encode('utf-8')
+
+
+def test_stream_falls_back_to_gtts(tts_cache, monkeypatch):
+    def openai_down(*args, **kwargs):
+        raise RuntimeError('OpenAI API key not configured')
+
+    class FakeGTTS:
+        def __init__(self, text, lang='en', slow=False):
+            self.text = text
+
+        def save(self, path):
+            with open(path, 'wb') as f:
+                f.write(b'gtts ' + self.text.encode('utf-8'))
+
+    monkeypatch.setattr(app_module, 'synthesize_with_openai', openai_down)
+    monkeypatch.setattr(app_module, 'gTTS', FakeGTTS)
+
+    chunks, content_type = app_module.stream_tts('No OpenAI today.')
+
+    assert content_type == 'audio/mpeg'
+    assert b''.join(chunks) == b'gtts No OpenAI today.'
@@ -0,0 +1,43 @@
+from conftest import FakeTTSResponse, app_module
+
+
+def test_concept_audio_is_served_from_the_warmed_cache(client, tts_cache, monkeypatch):
+    synthesized = []
+
+    def warm_up_engine(text, voice='alloy', fmt='mp3', stream=False):
+        synthesized.append(b'ID3' + text.encode('utf-8'))
+        return FakeTTSResponse(synthesized[-1]), 'audio/mpeg'
+
+    monkeypatch.setattr(app_module, 'synthesize_with_openai', warm_up_engine)
+    assert app_module.warm_tts_cache() == len(app_module.fixed_tutor_phrases())
+    assert len(synthesized) == len(app_module.fixed_tutor_phrases())
+
+    def no_engine(*args, **kwargs):
+        raise AssertionError('TTS engine called for a pre-warmed phrase')
+
+    monkeypatch.setattr(app_module, 'synthesize_with_openai', no_engine)
+    monkeypatch.setattr(app_module, 'gTTS', no_engine)
+    with client.session_transaction() as flask_session:
+        flask_session['participant_id'] = 'P001'
+        flask_session['trial_type'] = 'Trial_1'
+
+    response = client.get('/get_concept_audio/Correlation')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'audio/mpeg'
+    assert response.data in synthesized
+    assert b'explore the concept of Correlation' in response.data
+    assert tts_cache.misses == len(synthesized)
+
+
+def test_warm_up_counts_only_rendered_phrases(tts_cache, monkeypatch):
+    def openai_down(*args, **kwargs):
+        raise RuntimeError('OpenAI API key not configured')
+
+    def gtts_down(*args, **kwargs):
+        raise RuntimeError('Failed to connect')
+
+    monkeypatch.setattr(app_module, 'synthesize_with_openai', openai_down)
+    monkeypatch.setattr(app_module, 'gTTS', gtts_down)
+
+    assert app_module.warm_tts_cache() == 0
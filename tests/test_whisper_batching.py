@@ -0,0 +1,109 @@
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+whisper = pytest.importorskip('whisper')
+torch = pytest.importorskip('torch')
+
+from whisper_worker import transcribe_batch  # noqa: E402
+
+
+def write_tone(path, seconds, frequency):
+    samples = (0.3 * np.sin(2 * np.pi * frequency * np.arange(int(16000 * seconds)) / 16000) * 32767).astype('<i2')
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+
+@pytest.fixture(scope='module')
+def tiny_model():
+    """A randomly initialised, very small multilingual Whisper: no download, deterministic greedy output.
+
+    Cross-attention is scaled up so the decode depends noticeably on the audio.
+    """
+    torch.manual_seed(0)
+    dims = whisper.model.ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+        n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=1)
+    model = whisper.model.Whisper(dims).eval()
+    with torch.no_grad():
+        model.decoder.positional_embedding.normal_(0, 0.01)  # allocated with torch.empty; the rest is initialised
+        for block in model.decoder.blocks:
+            block.cross_attn.out.weight.mul_(10)
+    return model
+
+
+def test_batched_output_matches_single_clip_output(tmp_path, tiny_model, monkeypatch):
+    decoded = []
+
+    def recording_decode(mel, options):
+        result = whisper.decode(tiny_model, mel, options)
+        decoded.extend(result if isinstance(result, list) else [result])
+        return result
+
+    monkeypatch.setattr(tiny_model, 'decode', recording_decode)
+    options = {'temperature': 0.0, 'sample_len': 8}
+    jobs = [{'path': write_tone(tmp_path / f'clip{i}.wav', seconds, frequency), 'options': options}
+            for i, (seconds, frequency) in enumerate([(1.0, 220), (2.5, 440), (4.0, 880)])]
+
+    batched = transcribe_batch(whisper, tiny_model, jobs)
+    single = [transcribe_batch(whisper, tiny_model, [job])[0] for job in jobs]
+
+    assert [result['text'] for result in batched] == [result['text'] for result in single]
+    # Random weights give near-identical text for every clip; the log-probabilities still
+    # differ per clip, so rows mixed up or altered by the batching would show here
+    batched_logprobs = [result.avg_logprob for result in decoded[:3]]
+    single_logprobs = [result.avg_logprob for result in decoded[3:]]
+    assert batched_logprobs == pytest.approx(single_logprobs, abs=1e-5)
+    assert min(abs(a - b) for a, b in [batched_logprobs[:2], batched_logprobs[1:], batched_logprobs[::2]]) > 1e-4
+
+
+class FakeDecodeModel:
+    """Stands in for the model's decode(), answering by clip length (frames before the zero padding).
+
+    1 s decodes cleanly, 2 s is repetitive until temperature 0.4, 3 s looks like silence.
+    """
+
+    dims = SimpleNamespace(n_mels=80)
+    device = 'cpu'
+
+    def __init__(self):
+        self.calls = []
+
+    def decode(self, mel, options):
+        self.calls.append((mel.ndim, options.temperature))
+        if mel.ndim == 3:
+            return [self.result(row, options.temperature) for row in mel]
+        return self.result(mel, options.temperature)
+
+    @staticmethod
+    def result(mel, temperature):
+        seconds = round(int(mel.abs().sum(dim=0).count_nonzero()) / 100)
+        if seconds == 3:
+            return SimpleNamespace(text='uh', compression_ratio=1.0, avg_logprob=-2.0, no_speech_prob=0.9)
+        if seconds == 2 and temperature < 0.4:
+            return SimpleNamespace(text='la la la la', compression_ratio=3.0, avg_logprob=-0.2, no_speech_prob=0.0)
+        return SimpleNamespace(text=f'clean at {temperature}', compression_ratio=1.2, avg_logprob=-0.3, no_speech_prob=0.0)
+
+
+def test_only_clips_failing_the_quality_check_fall_back_to_higher_temperatures(tmp_path):
+    model = FakeDecodeModel()
+    jobs = [{'path': write_tone(tmp_path / f'clip{seconds}.wav', seconds, 440)} for seconds in (1, 2, 3)]
+
+    results = transcribe_batch(whisper, model, jobs)
+
+    assert [result['text'] for result in results] == ['clean at 0.0', 'clean at 0.4', '']
+    assert model.calls == [(3, 0.0), (2, 0.2), (2, 0.4)]
+
+
+def test_a_fixed_temperature_disables_the_fallback(tmp_path):
+    model = FakeDecodeModel()
+    jobs = [{'path': write_tone(tmp_path / 'clip.wav', 2, 440), 'options': {'temperature': 0.0}}]
+
+    assert transcribe_batch(whisper, model, jobs)[0]['text'] == 'la la la la'
+    assert model.calls == [(3, 0.0)]
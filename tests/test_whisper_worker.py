@@ -0,0 +1,118 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from whisper_worker import WhisperWorkerPool, WhisperUnavailable
+
+FAKE_WORKER = '''
+import json, os, sys
+print(json.dumps({"event": "ready"}), flush=True)
+for line in sys.stdin:
+    paths = [job["path"] for job in json.loads(line)["jobs"]]
+    if any(path.endswith("crash.wav") for path in paths):
+        sys.exit(1)
+    if any(path.endswith("garbled.wav") for path in paths):
+        print("not a reply", flush=True)
+        continue
+    results = [{"error": "cannot decode"} if path.endswith("bad.wav")
+               else {"text": "heard " + os.path.basename(path), "seconds": 0.01}
+               for path in paths]
+    print(json.dumps({"results": results}), flush=True)
+'''
+
+
+class FakePool(WhisperWorkerPool):
+    """Runs a stand-in worker speaking the same JSON-line protocol, without a model."""
+
+    def __init__(self, script, **kwargs):
+        super().__init__(**kwargs)
+        self.script = script
+
+    def _spawn(self):
+        return subprocess.Popen([sys.executable, str(self.script)], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, text=True, bufsize=1)
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    script = tmp_path / 'fake_worker.py'
+    script.write_text(FAKE_WORKER)
+    pool = FakePool(script, processes=1, max_queue=4)
+    yield pool
+    pool.shutdown()
+
+
+def test_submit_fails_fast_until_a_worker_is_ready(pool):
+    with pytest.raises(WhisperUnavailable):
+        pool.submit('clip.wav')
+    assert pool.stats()['rejected'] == 1
+
+    pool.start()
+    wait_until(lambda: pool.ready)
+    assert pool.transcribe('clip.wav', timeout=5) == 'heard clip.wav'
+    with pytest.raises(RuntimeError, match='cannot decode'):
+        pool.transcribe('bad.wav', timeout=5)
+
+    stats = pool.stats()
+    assert (stats['completed'], stats['failed'], stats['in_flight']) == (1, 1, 0)
+    assert stats['latency']['jobs'] == 1
+
+
+def test_queue_is_bounded(pool):
+    pool._ready = 1  # pretend a worker is up, but nothing consumes the queue
+    for _ in range(pool.max_queue):
+        pool.submit('clip.wav')
+    with pytest.raises(WhisperUnavailable, match='queue is full'):
+        pool.submit('clip.wav')
+    assert pool.stats()['queue_depth'] == pool.max_queue
+
+
+def test_dead_worker_fails_its_job_and_is_restarted(pool):
+    pool.start()
+    wait_until(lambda: pool.ready)
+
+    with pytest.raises(WhisperUnavailable, match='failed during a job'):
+        pool.transcribe('crash.wav', timeout=5)
+
+    wait_until(lambda: pool.stats()['restarts'] == 1 and pool.ready)
+    assert pool.transcribe('after.wav', timeout=5) == 'heard after.wav'
+
+
+def test_queued_jobs_are_sent_as_one_batch(tmp_path):
+    script = tmp_path / 'fake_worker.py'
+    script.write_text(FAKE_WORKER)
+    pool = FakePool(script, processes=1, max_queue=8, max_batch=3, max_wait=1.0)
+    try:
+        pool.start()
+        wait_until(lambda: pool.ready)
+        futures = [pool.submit(f'clip{i}.wav') for i in range(4)] + [pool.submit('bad.wav')]
+        assert [future.result(timeout=5) for future in futures[:4]] == [f'heard clip{i}.wav' for i in range(4)]
+        with pytest.raises(RuntimeError, match='cannot decode'):
+            futures[4].result(timeout=5)
+
+        stats = pool.stats()
+        assert (stats['batches'], stats['avg_batch_size']) == (2, 2.5)
+        assert (stats['completed'], stats['failed'], stats['in_flight']) == (4, 1, 0)
+    finally:
+        pool.shutdown()
+
+
+def test_unreadable_reply_fails_the_batch_and_restarts_the_worker(pool):
+    pool.start()
+    wait_until(lambda: pool.ready)
+
+    with pytest.raises(WhisperUnavailable, match='failed during a job'):
+        pool.transcribe('garbled.wav', timeout=5)
+    assert pool.stats()['in_flight'] == 0
+
+    wait_until(lambda: pool.stats()['restarts'] == 1 and pool.ready)
+    assert pool.transcribe('after.wav', timeout=5) == 'heard after.wav'
@@ -0,0 +1,86 @@
+import threading
+import time
+from datetime import datetime
+
+from conftest import app_module
+from database import db, Participant, Session, Interaction, Recording
+
+
+def interaction(message, concept_name='Correlation'):
+    return {'session_id': 'P001_Trial_1', 'speaker': 'USER', 'concept_name': concept_name,
+            'message': message, 'attempt_number': 1, 'timestamp': datetime.utcnow()}
+
+
+def test_rejected_row_does_not_block_the_batch(app):
+    db.session.add(Participant(participant_id='P001'))
+    db.session.add(Session(session_id='P001_Trial_1', participant_id='P001', trial_type='Trial_1', version='V1'))
+    db.session.commit()
+
+    buffer = app_module.WriteBehindBuffer([Interaction, Recording], interval=3600)
+    try:
+        for i in range(5):
+            buffer.add(Interaction, interaction(f'explanation {i}'))
+        buffer.add(Interaction, interaction('no concept', concept_name=None))
+        buffer.add(Recording, {'session_id': 'P001_Trial_1', 'recording_type': 'user_audio',
+                               'file_path': 'uploads/0.webm'})
+
+        assert buffer.flush() == 6
+    finally:
+        buffer.close()
+
+    stats = buffer.stats()
+    assert stats['rejected_rows'] == 1
+    assert stats['failed_flushes'] == 0
+    assert stats['pending'] == {'interactions': 0, 'recordings': 0}
+    assert sorted(row.message for row in Interaction.query) == [f'explanation {i}' for i in range(5)]
+    assert Recording.query.count() == 1
+
+
+def add_session(session_id='P002_Trial_1'):
+    db.session.add(Participant(participant_id=session_id.split('_')[0]))
+    db.session.add(Session(session_id=session_id, participant_id=session_id.split('_')[0],
+                           trial_type='Trial_1', version='V1'))
+    db.session.commit()
+
+
+def test_rows_are_flushed_once_max_rows_are_pending(app):
+    buffer = app_module.WriteBehindBuffer([Interaction, Recording], max_rows=3, interval=3600)
+    try:
+        for i in range(3):
+            buffer.add(Interaction, interaction(f'explanation {i}'))
+        deadline = time.monotonic() + 5
+        while Interaction.query.count() < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            db.session.remove()
+    finally:
+        buffer.close()
+
+    assert buffer.stats()['flushes'] >= 1
+    assert Interaction.query.count() == 3
+
+
+def test_finalize_flushes_rows_and_stamps_the_session(client):
+    add_session()
+    app_module.save_interaction_to_db('P002_Trial_1', 'USER', 'Correlation', 'they move together')
+
+    resp = client.post('/finalize_session', json={'session_id': 'P002_Trial_1'})
+
+    assert resp.status_code == 200
+    assert Interaction.query.filter_by(session_id='P002_Trial_1').count() == 1
+    assert Session.query.filter_by(session_id='P002_Trial_1').one().completed_at is not None
+
+
+def test_finalize_does_not_wait_for_a_busy_queue(client, monkeypatch):
+    add_session()
+    monkeypatch.setattr(app_module, 'FINALIZE_WAIT_SECONDS', 0.05)
+    release = threading.Event()
+    app_module.background_work.submit(release.wait, 10)
+    try:
+        resp = client.post('/finalize_session', json={'session_id': 'P002_Trial_1'})
+        assert resp.status_code == 202
+    finally:
+        release.set()
+
+    assert app_module.background_work.wait_idle(timeout=5)
+    db.session.remove()
+    assert Session.query.filter_by(session_id='P002_Trial_1').one().completed_at is not None
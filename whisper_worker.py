@@ -0,0 +1,409 @@
+"""Resident local Whisper transcription.
+
+The model lives in separate worker processes (`python whisper_worker.py <model>`) that
+load it once at startup and then take jobs as JSON lines on stdin, answering on stdout.
+Web workers never import torch or wait on a model load: `WhisperWorkerPool` is the
+web-side handle, with a bounded job queue, one feeder thread per worker process that
+hands queued clips to its worker in micro-batches, automatic restarts and latency
+counters.
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class WhisperUnavailable(Exception):
+    """Raised when no worker has a model loaded or the job queue is full."""
+
+
+class WhisperWorkerPool:
+    """Bounded queue of transcription jobs served by resident Whisper processes.
+
+    `submit` never blocks: it raises WhisperUnavailable while no model is loaded or
+    when `max_queue` jobs are already waiting, so callers can fail fast instead of
+    piling up behind a slow worker. Each worker takes up to `max_batch` queued jobs
+    at once, waiting at most `max_wait` seconds for a batch to fill.
+    """
+
+    def __init__(self, model_name='small', processes=1, max_queue=8, max_batch=4, max_wait=0.05, latency_window=200):
+        self.model_name = model_name
+        self.processes = processes
+        self.max_queue = max_queue
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._jobs = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._procs = set()
+        self._stopping = False
+        self._ready = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._batches = 0
+        self._batched_jobs = 0
+        self._latencies = deque(maxlen=latency_window)  # (queue_wait, run_seconds, total_seconds)
+
+    def start(self):
+        for index in range(self.processes):
+            thread = threading.Thread(target=self._feed, name=f'whisper-feeder-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def ready(self):
+        return self._ready > 0
+
+    def submit(self, audio_path, **options):
+        """Queue a transcription and return a Future resolving to the transcript text."""
+        if not self.ready:
+            with self._lock:
+                self._rejected += 1
+            raise WhisperUnavailable('Local Whisper model is not loaded yet')
+        future = Future()
+        try:
+            self._jobs.put_nowait((future, os.path.abspath(audio_path), options, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise WhisperUnavailable(f'Local Whisper queue is full ({self.max_queue} jobs waiting)')
+        return future
+
+    def transcribe(self, audio_path, timeout=None, **options):
+        return self.submit(audio_path, **options).result(timeout=timeout)
+
+    def _spawn(self):
+        return subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), self.model_name],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+    def _feed(self):
+        backoff = 1
+        while not self._stopping:
+            proc = self._spawn()
+            with self._lock:
+                self._procs.add(proc)
+            try:
+                hello = proc.stdout.readline()  # blocks for the model load, off the request path
+                if hello and json.loads(hello).get('event') == 'ready':
+                    backoff = 1
+                    with self._lock:
+                        self._ready += 1
+                    try:
+                        self._serve(proc)
+                    finally:
+                        with self._lock:
+                            self._ready -= 1
+                else:
+                    print(f"Local Whisper worker failed to load model '{self.model_name}'")
+            except Exception as e:
+                print(f"Local Whisper worker error: {str(e)}")
+            finally:
+                with self._lock:
+                    self._procs.discard(proc)
+                if proc.poll() is None:
+                    proc.kill()
+                proc.wait()
+
+            if not self._stopping:
+                with self._lock:
+                    self._restarts += 1
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 300)
+
+    def _next_batch(self, proc):
+        """Block for one job, then gather more for up to max_wait seconds (max_batch in total).
+
+        Returns (jobs, stop); `jobs` is None if the worker process died while idle.
+        """
+        while True:
+            try:
+                job = self._jobs.get(timeout=5)
+                break
+            except queue.Empty:
+                if proc.poll() is not None:
+                    return None, False
+        if job is None:
+            return [], True
+
+        batch = [job]
+        stop = False
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                job = self._jobs.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                stop = True
+                break
+            batch.append(job)
+        return batch, stop
+
+    def _serve(self, proc):
+        """Feed batches of jobs to one worker process until it exits or the pool shuts down."""
+        while True:
+            batch, stop = self._next_batch(proc)
+            if batch is None:
+                return
+            if batch and proc.poll() is not None:
+                # Died while idle: hand the jobs to another worker rather than make them wait for a reload
+                with self._lock:
+                    others_ready = self._ready > 1
+                for job in batch:
+                    try:
+                        if not others_ready:
+                            raise queue.Full
+                        self._jobs.put_nowait(job)
+                    except queue.Full:
+                        if job[0].set_running_or_notify_cancel():
+                            job[0].set_exception(WhisperUnavailable('Local Whisper worker is restarting'))
+                return
+
+            batch = [job for job in batch if job[0].set_running_or_notify_cancel()]
+            if batch:
+                self._run_batch(proc, batch)
+            if stop or proc.poll() is not None:
+                return
+
+    def _run_batch(self, proc, batch):
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += len(batch)
+            self._batches += 1
+            self._batched_jobs += len(batch)
+        results = None
+        try:
+            proc.stdin.write(json.dumps({
+                'jobs': [{'path': audio_path, 'options': options} for _, audio_path, options, _ in batch]
+            }) + '\n')
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+            if line:
+                results = self._parse_results(line, len(batch))
+                if results is None:
+                    # Out of step with the worker: restart it rather than misread later replies
+                    proc.kill()
+                    proc.wait()
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            self._finish_batch(batch, results or [None] * len(batch), started)
+
+    @staticmethod
+    def _parse_results(line, expected):
+        try:
+            results = json.loads(line)['results']
+        except (ValueError, KeyError, TypeError):
+            print(f"Local Whisper worker sent an unreadable reply: {line[:200]!r}")
+            return None
+        if not isinstance(results, list) or len(results) != expected:
+            print(f"Local Whisper worker answered {len(results) if isinstance(results, list) else 'no'} "
+                  f"results for a batch of {expected}")
+            return None
+        return [result if isinstance(result, dict) else None for result in results]
+
+    def _finish_batch(self, batch, results, started):
+        """Resolve every future in the batch; a None result means the worker failed it."""
+        finished = time.perf_counter()
+        with self._lock:
+            self._in_flight -= len(batch)
+            for (_, _, _, submitted), result in zip(batch, results):
+                if result and 'text' in result:
+                    self._completed += 1
+                    self._latencies.append((started - submitted, result.get('seconds', finished - started), finished - submitted))
+                else:
+                    self._failed += 1
+
+        for (future, _, _, _), result in zip(batch, results):
+            if result is None:
+                future.set_exception(WhisperUnavailable('Local Whisper worker failed during a job'))
+            elif 'text' in result:
+                future.set_result(result['text'])
+            else:
+                future.set_exception(RuntimeError(result.get('error', 'Local Whisper transcription failed')))
+
+    def shutdown(self):
+        self._stopping = True
+        for _ in self._threads:
+            try:
+                self._jobs.put_nowait(None)
+            except queue.Full:
+                break
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self._latencies)
+            stats = {
+                'model': self.model_name,
+                'processes': self.processes,
+                'ready_workers': self._ready,
+                'queue_depth': self._jobs.qsize(),
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'restarts': self._restarts,
+                'max_batch': self.max_batch,
+                'batches': self._batches,
+                'avg_batch_size': round(self._batched_jobs / self._batches, 2) if self._batches else 0
+            }
+        if latencies:
+            totals = sorted(total for _, _, total in latencies)
+            stats['latency'] = {
+                'jobs': len(latencies),
+                'avg_queue_wait_seconds': round(sum(wait for wait, _, _ in latencies) / len(latencies), 3),
+                'avg_run_seconds': round(sum(run for _, run, _ in latencies) / len(latencies), 3),
+                'p50_seconds': round(totals[len(totals) // 2], 3),
+                'p95_seconds': round(totals[min(len(totals) - 1, int(len(totals) * 0.95))], 3),
+                'max_seconds': round(totals[-1], 3)
+            }
+        return stats
+
+
+# transcribe()'s defaults: retry at higher temperatures while a decode looks repetitive or unlikely
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def needs_fallback(result):
+    """transcribe()'s quality check: too repetitive or too unlikely, unless the clip is silence."""
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+        return False
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def is_silence(result):
+    """transcribe() drops a window that is probably silence unless the decode is confident."""
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD
+
+
+def decoding_options(whisper, options, temperature):
+    kwargs = dict(options)
+    if temperature > 0:
+        kwargs.pop('beam_size', None)
+        kwargs.pop('patience', None)
+    else:
+        kwargs.pop('best_of', None)
+    return whisper.DecodingOptions(**kwargs, temperature=temperature)
+
+
+def transcribe_batch(whisper, model, jobs):
+    """Transcribe a batch of jobs, decoding clips of up to 30 s together.
+
+    Short clips get the same zero-padded log-mel window transcribe() would give them, and
+    the windows are stacked into one tensor, so the encoder and decoder run once for the
+    batch. A clip whose decode fails transcribe()'s quality check is decoded again on its
+    own at the next fallback temperature. Longer clips, or a batch whose decode fails, go
+    through model.transcribe() one by one.
+    """
+    import torch
+    from dataclasses import fields
+
+    decoding_fields = {field.name for field in fields(whisper.DecodingOptions)}
+    n_samples, n_frames = whisper.audio.N_SAMPLES, whisper.audio.N_FRAMES
+    results = [None] * len(jobs)
+    groups = {}
+    for index, job in enumerate(jobs):
+        started = time.perf_counter()
+        options = {'fp16': False, **job.get('options', {})}
+        try:
+            audio = whisper.load_audio(job['path'])
+        except Exception as e:
+            results[index] = {'error': str(e), 'seconds': time.perf_counter() - started}
+            continue
+        if len(audio) <= n_samples and set(options) <= decoding_fields:
+            mel = whisper.log_mel_spectrogram(audio, model.dims.n_mels, padding=n_samples)
+            segment = whisper.pad_or_trim(mel[:, :mel.shape[-1] - n_frames], n_frames)
+            groups.setdefault(json.dumps(options, sort_keys=True), []).append((index, segment, started))
+        else:
+            results[index] = transcribe_one(model, job['path'], options, started)
+
+    for key, items in groups.items():
+        options = json.loads(key)
+        decode_options = dict(options)
+        temperature = decode_options.pop('temperature', FALLBACK_TEMPERATURES)
+        temperatures = [temperature] if isinstance(temperature, (int, float)) else list(temperature)
+        try:
+            mel = torch.stack([segment for _, segment, _ in items]).to(model.device)
+            decoded = model.decode(mel, decoding_options(whisper, decode_options, temperatures[0]))
+        except Exception as e:
+            print(f"Batched decode failed, transcribing one by one: {str(e)}")
+            for index, _, loaded in items:
+                results[index] = transcribe_one(model, jobs[index]['path'], options, loaded)
+            continue
+
+        for (index, segment, loaded), result in zip(items, decoded):
+            try:
+                for temperature in temperatures[1:]:
+                    if not needs_fallback(result):
+                        break
+                    result = model.decode(segment.to(model.device), decoding_options(whisper, decode_options, temperature))
+            except Exception as e:
+                print(f"Fallback decode failed, transcribing the clip on its own: {str(e)}")
+                results[index] = transcribe_one(model, jobs[index]['path'], options, loaded)
+                continue
+            text = '' if is_silence(result) else result.text
+            results[index] = {'text': text, 'seconds': time.perf_counter() - loaded}
+    return results
+
+
+def transcribe_one(model, path, options, started):
+    try:
+        return {'text': model.transcribe(path, **options)['text'], 'seconds': time.perf_counter() - started}
+    except Exception as e:
+        return {'error': str(e), 'seconds': time.perf_counter() - started}
+
+
+def main(model_name):
+    """Worker process: load the model once, then answer one JSON line per batch of jobs."""
+    # The protocol gets a private copy of fd 1; fd 1 itself (and sys.stdout) now point at
+    # stderr, so neither Python nor native library output can corrupt the channel
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    import whisper
+    model = whisper.load_model(model_name)
+
+    def send(message):
+        protocol.write(json.dumps(message) + '\n')
+        protocol.flush()
+
+    send({'event': 'ready'})
+    for line in sys.stdin:
+        jobs = json.loads(line)['jobs']
+        try:
+            results = transcribe_batch(whisper, model, jobs)
+        except Exception as e:
+            print(f"Batch transcription failed, transcribing one by one: {str(e)}")
+            results = [transcribe_one(model, job['path'], {'fp16': False, **job.get('options', {})}, time.perf_counter())
+                       for job in jobs]
+        send({'results': results})
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'small')